@@ -1,22 +1,93 @@
 # Dj_Fitness_Asmt/__init__.py
 
 # ==============================
-# Import all functions from logics.py
+# Lazy public API
 # ==============================
-from . import logics
-from . import constants
-
-# Dynamically add all functions from logics to this namespace
-for attr_name in dir(logics):
-    if not attr_name.startswith("_"):
-        attr = getattr(logics, attr_name)
-        if callable(attr):
-            globals()[attr_name] = attr
-
-# Dynamically add all constants from constants.py to this namespace
-for attr_name in dir(constants):
-    if not attr_name.startswith("_"):
-        globals()[attr_name] = getattr(constants, attr_name)
-
-# Optional: define __all__ for safe wildcard imports
-__all__ = [name for name in globals() if not name.startswith("_")]
+# Names are resolved from their submodule on first access (PEP 562), so
+# `import Dj_Fitness_Asmt` stays cheap and matplotlib/numpy only load when a
+# chart is drawn or a cohort is batch-scored.
+import importlib
+
+_EXPORTS = {
+    # logics.py
+    "save_plot_png": "logics",
+    "save_plot_to_memory": "logics",
+    "calculate_bmi": "logics",
+    "calculate_whr": "logics",
+    "calculate_power": "logics",
+    "calculate_body_fat": "logics",
+    "bmi_chart_png": "logics",
+    "plot_bmi_curve": "logics",
+    "ramp_chart_png": "logics",
+    "plot_ramp_test": "logics",
+    "get_age_range": "logics",
+    "classify_metric": "logics",
+    "overall_balance": "logics",
+    "score_client": "logics",
+    "process_client_data": "logics",
+    "process_clients_batch": "logics",
+    "split_batch": "logics",
+    # constants.py
+    "BMIThreshold": "constants",
+    "BMI_CATEGORIES": "constants",
+    "WHR_RANGES": "constants",
+    "BODY_FAT_TABLE": "constants",
+    "EXPLOSIVE_POWER_TABLE": "constants",
+    "threshold_order": "constants",
+    "push_thresholds": "constants",
+    "squat_thresholds": "constants",
+    "plank_percentiles": "constants",
+    "OLS_THRESHOLDS": "constants",
+    "TOE_TOUCH_THRESHOLDS": "constants",
+    "TEST_UNITS": "constants",
+    # thresholds.py
+    "ThresholdIndex": "thresholds",
+    "table_fingerprint": "thresholds",
+    # cohort.py
+    "score_file": "cohort",
+    # metrics.py
+    "METRICS": "metrics",
+    "recompute": "metrics",
+    # norm_tables.py
+    "generate_threshold_tables": "norm_tables",
+    "get_norm_tables": "norm_tables",
+    # ramp.py
+    "analyze_ramp_batch": "ramp",
+    "ramp_thresholds": "ramp",
+    "ramp_zones": "ramp",
+    # streaming.py
+    "ScoreRecord": "streaming",
+    "score_stream": "streaming",
+    # svg_charts.py
+    "bmi_chart_svg": "svg_charts",
+    "ramp_chart_svg": "svg_charts",
+}
+
+_SUBMODULES = {
+    "chart_worker", "cohort", "constants", "figure_pool", "logics", "metrics", "norm_registry", "norm_tables",
+    "pdf_report", "percentiles", "plot_cache", "progress", "ramp", "streaming", "svg_charts", "thresholds", "timing",
+}
+
+# The norm tables in use. norm_registry swaps them in logics when other
+# tables are activated, so they are looked up there on every access and
+# never cached here; constants.TEST_CONSTANTS are the built-in ones.
+_ACTIVE_NORMS = {"TEST_CONSTANTS", "THRESHOLD_INDEX"}
+
+__all__ = sorted({*_EXPORTS, *_ACTIVE_NORMS})
+
+
+def __getattr__(name):
+    if name in _ACTIVE_NORMS:
+        return getattr(importlib.import_module(".logics", __name__), name)
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _ACTIVE_NORMS | _SUBMODULES)
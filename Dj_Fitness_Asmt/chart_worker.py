@@ -0,0 +1,31 @@
+# Dj_Fitness_Asmt/chart_worker.py
+"""
+Chart rendering entry points for worker processes.
+
+Kept free of Django so a freshly spawned worker only imports what drawing
+needs. Results are returned with their plot cache keys; the parent process
+stores them in its own cache.
+"""
+
+import importlib
+
+from .plot_cache import plot_key
+
+
+def warm_worker():
+    """Pool initializer: pays for the matplotlib import and BMI background up front."""
+    renderer("bmi", "png").uncached(70.0, 175.0)
+
+
+def renderer(chart, fmt):
+    """The cached plot function drawing `chart` ("bmi", "ramp") as `fmt` ("png", "svg")."""
+    return getattr(importlib.import_module(__package__), f"{chart}_chart_{fmt}")
+
+
+def render_charts(fmt, args):
+    """[(plot cache key, image)] for {chart name: arguments}, e.g. {"bmi": (w, h)}."""
+    rendered = []
+    for chart, chart_args in args.items():
+        func = renderer(chart, fmt)
+        rendered.append((plot_key(func.kind, *chart_args), func.uncached(*chart_args)))
+    return rendered
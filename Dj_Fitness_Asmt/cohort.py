@@ -0,0 +1,161 @@
+# Dj_Fitness_Asmt/cohort.py
+"""
+File-to-file cohort scoring in fixed-size chunks.
+
+Raw assessments (CSV, optionally compressed, or Parquet) are read one chunk
+at a time, scored with process_clients_batch and written out as flat
+columns: the kept identifier columns, then "calculations.<name>" and
+"classifications.<name>". At most `2 * workers` chunks are in flight, so
+memory stays flat whatever the file size. Scoring and CSV formatting run in
+worker processes; reading and writing stay in the parent so the output
+keeps the input's row order.
+
+Parquet needs pyarrow.
+"""
+
+import bz2
+import gzip
+import lzma
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .logics import process_clients_batch
+from .thresholds import ThresholdIndex
+
+REQUIRED_COLUMNS = ("gender", "age", "height_cm", "weight_kg")
+DEFAULT_KEEP = ("first_name", "last_name", "gender", "age", "assessed_at")
+COMPRESSED_OPEN = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def file_format(path):
+    suffixes = Path(path).suffixes
+    if suffixes and suffixes[-1] in (".parquet", ".pq"):
+        return "parquet"
+    if ".csv" in suffixes:
+        return "csv"
+    raise ValueError(f"{path}: expected a .csv[.gz|.bz2|.xz] or .parquet file")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet files need pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+# -----------------------------
+# Scoring
+# -----------------------------
+def score_frame(frame, keep=DEFAULT_KEEP, tables=None):
+    """
+    Kept input columns plus one column per calculation and classification,
+    classified with `tables` (TEST_CONSTANTS-style) or the tables in use.
+    """
+    import pandas as pd
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in frame]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    frame = frame.assign(gender=frame["gender"].fillna("").astype(str).str.lower())
+    result = process_clients_batch(frame, ThresholdIndex.from_tables(tables) if tables is not None else None)
+    columns = {name: frame[name].to_numpy() for name in keep if name in frame}
+    columns.update((f"calculations.{name}", values) for name, values in result["calculations"].items())
+    columns.update((f"classifications.{name}", values) for name, values in result["classifications"].items())
+    return pd.DataFrame(columns)
+
+
+def score_chunk(frame, keep, output_format, header, tables=None):
+    """Worker task: score one chunk, pre-formatted as CSV bytes when writing CSV."""
+    scored = score_frame(frame, keep, tables)
+    if output_format == "csv":
+        return len(scored), scored.to_csv(index=False, header=header).encode()
+    return len(scored), scored
+
+
+# -----------------------------
+# Reading and writing
+# -----------------------------
+def read_chunks(path, chunk_size):
+    if file_format(path) == "parquet":
+        for batch in _pyarrow().parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class CohortWriter:
+    def __init__(self, path):
+        self.path = path
+        self.format = file_format(path)
+        self._file = None
+        self._parquet = None
+
+    def __enter__(self):
+        if self.format == "csv":
+            self._file = COMPRESSED_OPEN.get(Path(self.path).suffix, open)(self.path, "wb")
+        return self
+
+    def write(self, chunk):
+        if self.format == "csv":
+            self._file.write(chunk)
+            return
+        pa = _pyarrow()
+        if self._parquet is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # Pin result types so a chunk with an all-empty column still matches
+            for i, field in enumerate(schema):
+                if field.name.startswith("calculations."):
+                    schema = schema.set(i, pa.field(field.name, pa.float64()))
+                elif field.name.startswith("classifications."):
+                    schema = schema.set(i, pa.field(field.name, pa.string()))
+            self._parquet = pa.parquet.ParquetWriter(self.path, schema)
+        self._parquet.write_table(pa.Table.from_pandas(chunk, schema=self._parquet.schema, preserve_index=False))
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+def score_file(source, destination, chunk_size=50_000, workers=0, keep=DEFAULT_KEEP, tables=None):
+    """
+    Score `source` into `destination`, yielding the running row count after
+    each chunk. workers=0 scores in this process. Worker processes start with
+    the built-in norm tables, so pass `tables` to score with others.
+    """
+    output_format = file_format(destination)
+    chunks = read_chunks(source, chunk_size)
+    total = 0
+    with CohortWriter(destination) as writer:
+        if workers <= 0:
+            for i, chunk in enumerate(chunks):
+                rows, scored = score_chunk(chunk, keep, output_format, i == 0, tables)
+                writer.write(scored)
+                total += rows
+                yield total
+            return
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            in_flight = deque()
+            for i, chunk in enumerate(chunks):
+                in_flight.append(pool.submit(score_chunk, chunk, keep, output_format, i == 0, tables))
+                if len(in_flight) >= 2 * workers:
+                    rows, scored = in_flight.popleft().result()
+                    writer.write(scored)
+                    total += rows
+                    yield total
+            while in_flight:
+                rows, scored = in_flight.popleft().result()
+                writer.write(scored)
+                total += rows
+                yield total
@@ -32,6 +32,14 @@ BMI_CATEGORIES = {
     "overweight": BMIThreshold(25, "Overweight (BMI 25)", "--", "red"),
 }
 
+# Reference curves of the BMI chart, shared by the PNG and SVG renderers:
+# (bmi, legend label, linestyle, color), drawn over these heights (cm).
+BMI_CHART_HEIGHTS = range(140, 200)
+BMI_CHART_LINES = tuple(
+    (category.bmi, f"{name.capitalize()} {category.bmi:g}", category.linestyle, category.color)
+    for name, category in BMI_CATEGORIES.items()
+)
+
 # -----------------------------
 # Waist-to-Hip Ratio (WHR) ranges
 # -----------------------------
@@ -189,13 +197,33 @@ TEST_UNITS = {
 # -----------------------------
 # Combined Test Constants for classification
 # -----------------------------
+# The built-in norm tables. Others can be loaded at runtime through
+# norm_registry; logics.TEST_CONSTANTS always holds the ones in use.
 TEST_CONSTANTS = {
+    "BMI": {"Male": [18.5, 25, 30], "Female": [18.5, 25, 30]},
+    "vertical_jump_power": EXPLOSIVE_POWER_TABLE,
+    "WHR": WHR_RANGES,
+    "BodyFat": BODY_FAT_TABLE,
     "PushUp": push_thresholds,
     "Squat": squat_thresholds,
     "Plank": plank_percentiles,
-    "OLS": OLS_THRESHOLDS,
+    "OLS": OLS_THRESHOLDS,  # expects nested dict by gender → age → {"open":val, "closed":val}
     "ToeTouch": TOE_TOUCH_THRESHOLDS,
-    "BMI": None,      # special handling in classify_metric
-    "BodyFat": BODY_FAT_TABLE,
-    "vertical_jump_power": EXPLOSIVE_POWER_TABLE  
 }
+
+
+def _age_bands(tables):
+    """Sorted (low, high) of every "low-high" age band key in `tables`."""
+    bands = set()
+    for key, value in tables.items():
+        low, _, high = str(key).partition("-")
+        if low.isdigit() and high.isdigit():
+            bands.add((int(low), int(high)))
+        if isinstance(value, dict):
+            bands.update(_age_bands(value))
+    return sorted(bands)
+
+
+# The age bands of the built-in tables, e.g. (15, 19), (20, 29), ... Stored
+# results are grouped into cohorts by these (see assessment.models.age_band).
+AGE_BANDS = tuple(_age_bands(TEST_CONSTANTS))
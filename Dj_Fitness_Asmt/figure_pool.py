@@ -0,0 +1,77 @@
+# Dj_Fitness_Asmt/figure_pool.py
+"""
+Reusable matplotlib figures, built without pyplot.
+
+plt.subplots registers every figure with pyplot's global state and builds
+a new Figure, canvas and figure manager, which plt.close tears down again.
+A FigurePool instead keeps a few idle Agg figures of one size: a render
+borrows one, draws on it and hands it back cleared.
+
+    with pooled_figure((6, 4)) as fig:
+        ax = fig.add_subplot()
+        ...
+
+The pool of each size is shared by the threads of the process; a figure is
+only ever used by the thread that borrowed it. When more threads draw at
+once than there are idle figures, extra ones are built and at most
+`max_idle` are kept afterwards.
+"""
+
+import threading
+from contextlib import contextmanager
+
+MAX_IDLE = 4
+
+
+class FigurePool:
+    def __init__(self, figsize, max_idle=MAX_IDLE):
+        self.figsize = figsize
+        self.max_idle = max_idle
+        self.created = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _new(self):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        fig.initial_subplotpars = dict(vars(fig.subplotpars))
+        self.created += 1
+        return fig
+
+    @contextmanager
+    def figure(self):
+        """Borrow an empty figure; it is cleared and returned to the pool afterwards."""
+        with self._lock:
+            fig = self._idle.pop() if self._idle else self._new()
+        try:
+            yield fig
+        finally:
+            fig.clear()
+            # tight_layout starts from the current margins; restart from the defaults
+            fig.subplotpars.update(**fig.initial_subplotpars)
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(fig)
+
+    def idle(self):
+        return len(self._idle)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def figure_pool(figsize):
+    """The process's pool of `figsize` figures."""
+    pool = _pools.get(figsize)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(figsize, FigurePool(figsize))
+    return pool
+
+
+def pooled_figure(figsize):
+    return figure_pool(figsize).figure()
@@ -1,28 +1,51 @@
 # Dj_Fitness_Asmt/logics.py
 
-import matplotlib
-matplotlib.use("Agg")  # prevent GUI backend errors in Django
 import io
 import base64
+import threading
 from io import BytesIO
-import matplotlib.pyplot as plt
-import numpy as np
 from .constants import (
-    BMI_CATEGORIES, WHR_RANGES, BODY_FAT_TABLE, EXPLOSIVE_POWER_TABLE,
+    BMI_CATEGORIES, BMI_CHART_HEIGHTS, BMI_CHART_LINES, WHR_RANGES, BODY_FAT_TABLE, EXPLOSIVE_POWER_TABLE,
     push_thresholds, squat_thresholds, plank_percentiles,
-    OLS_THRESHOLDS, TOE_TOUCH_THRESHOLDS, threshold_order, TEST_UNITS
+    OLS_THRESHOLDS, TOE_TOUCH_THRESHOLDS, threshold_order, TEST_UNITS,
+    TEST_CONSTANTS as BUILTIN_TEST_CONSTANTS,
 )
+from .thresholds import ThresholdIndex
+from .figure_pool import pooled_figure
+from .plot_cache import cached_plot
+from .timing import stage
+from .ramp import ZONE_COLORS, ramp_steps, ramp_zones
 
 # ----------------------
 # Helper functions
 # ----------------------
-def save_plot_to_memory(fig):
+# matplotlib and numpy are imported on first use, so workers and manage.py
+# commands that never draw or batch-score don't pay for them at startup.
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")  # prevent GUI backend errors in Django
+    import matplotlib.pyplot as plt
+    return plt
+
+def encode_png(fig):
     buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    base64_img = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close(fig)
-    return base64_img
+    with stage("png_encode"):
+        fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+def save_plot_png(fig):
+    """PNG of a pyplot figure, which is closed afterwards."""
+    try:
+        return encode_png(fig)
+    finally:
+        _pyplot().close(fig)
+
+def _b64(image):
+    with stage("base64"):
+        return base64.b64encode(image).decode("utf-8")
+
+def save_plot_to_memory(fig):
+    return _b64(save_plot_png(fig))
 
 # ----------------------
 # Calculations
@@ -49,73 +72,155 @@ def calculate_body_fat(gender, age, skinfolds):
 # ----------------------
 # Plotting functions
 # ----------------------
-def plot_bmi_curve(weight_kg, height_cm):
-    heights = list(range(140, 200))
-    heights_m = [h / 100 for h in heights]
-    under = [18.5*(h**2) for h in heights_m]
-    ideal = [22*(h**2) for h in heights_m]
-    over = [25*(h**2) for h in heights_m]
-    BMI = calculate_bmi(weight_kg, height_cm)
+def _draw_bmi_reference(ax):
+    import numpy as np
 
-    fig, ax = plt.subplots(figsize=(4,3))
-    ax.plot(under, heights, '--', color='blue', label='Underweight 18.5')
-    ax.plot(ideal, heights, '-', color='green', label='Ideal 22')
-    ax.plot(over, heights, '--', color='red', label='Overweight 25')
-    ax.scatter(weight_kg, height_cm, color='black', label=f"You - {BMI}")
+    heights = np.asarray(BMI_CHART_HEIGHTS)
+    heights_m = heights / 100
+    for bmi, label, linestyle, color in BMI_CHART_LINES:
+        ax.plot(bmi * heights_m**2, heights, linestyle, color=color, label=label)
     ax.set_xlabel("Weight (kg)")
     ax.set_ylabel("Height (cm)")
     ax.grid(True)
+
+
+class _BMIBackground:
+    """
+    The reference curves, axes, grid and legend drawn once per process. Each
+    client only restores the saved pixels and blits its marker and legend
+    label on top, so the per-request cost does not depend on the curve
+    resolution.
+    """
+
+    def __init__(self):
+        _pyplot()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(4,3))
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        _draw_bmi_reference(self.ax)
+        self.marker, = self.ax.plot([], [], 'o', color='black', markersize=6, label="You - 00.00")
+        legend = self.ax.legend(fontsize=6, loc='upper left')
+        self.fig.tight_layout()
+        self.ax.autoscale(False)
+
+        # "Underweight 18.5" sets the legend width, so only the client label changes
+        self.legend = legend
+        self.label = legend.get_texts()[-1]
+        self.label.set_visible(False)
+        self.canvas.draw()
+        self.pixels = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.legend_box = legend.get_window_extent().padded(self.marker.get_markersize())
+        self.label.set_visible(True)
+        self.lock = threading.Lock()
+
+    def contains(self, weight_kg, height_cm):
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        return x0 <= weight_kg <= x1 and y0 <= height_cm <= y1
+
+    def render(self, weight_kg, height_cm, bmi):
+        import matplotlib.image
+        import numpy as np
+
+        with self.lock, stage("figure"):
+            self.canvas.restore_region(self.pixels)
+            self.marker.set_data([weight_kg], [height_cm])
+            self.label.set_text(f"You - {bmi}")
+            if self.legend_box.contains(*self.ax.transData.transform((weight_kg, height_cm))):
+                # Under the fixed legend (low BMI, tall client): legend first, marker on top
+                self.ax.draw_artist(self.legend)
+            else:
+                self.ax.draw_artist(self.label)
+            self.ax.draw_artist(self.marker)
+            rgba = np.asarray(self.canvas.buffer_rgba()).copy()
+        buf = BytesIO()
+        with stage("png_encode"):
+            matplotlib.image.imsave(buf, rgba, format="png")
+        return buf.getvalue()
+
+
+_bmi_background = None
+_bmi_background_lock = threading.Lock()
+
+
+def _get_bmi_background():
+    global _bmi_background
+    if _bmi_background is None:
+        with _bmi_background_lock:
+            if _bmi_background is None:
+                with stage("bmi_background"):
+                    _bmi_background = _BMIBackground()
+    return _bmi_background
+
+
+@cached_plot("bmi")
+def bmi_chart_png(weight_kg, height_cm):
+    BMI = calculate_bmi(weight_kg, height_cm)
+
+    background = _get_bmi_background()
+    if background.contains(weight_kg, height_cm):
+        return background.render(weight_kg, height_cm, BMI)
+
+    # Off the reference chart: full render so the axes grow to include the client
+    with pooled_figure((4, 3)) as fig:
+        with stage("figure"):
+            draw_bmi_chart(fig.add_subplot(), weight_kg, height_cm)
+            fig.tight_layout()
+        return encode_png(fig)
+
+
+def draw_bmi_chart(ax, weight_kg, height_cm):
+    """The BMI reference curves and the client's marker on `ax`."""
+    _draw_bmi_reference(ax)
+    ax.scatter(weight_kg, height_cm, color='black', label=f"You - {calculate_bmi(weight_kg, height_cm)}")
     ax.legend(fontsize=6)
-    fig.tight_layout()
-    return save_plot_to_memory(fig)
 
 
-def plot_ramp_test(loads, rpe_values):
-    fig, ax = plt.subplots(figsize=(6,4))
+def plot_bmi_curve(weight_kg, height_cm):
+    return _b64(bmi_chart_png(weight_kg, height_cm))
+
+
+@cached_plot("ramp")
+def ramp_chart_png(loads, rpe_values):
+    with pooled_figure((6, 4)) as fig:
+        with stage("figure"):
+            draw_ramp_chart(fig.add_subplot(), loads, rpe_values)
+            fig.tight_layout()
+        return encode_png(fig)
+
+
+def draw_ramp_chart(ax, loads, rpe_values):
+    """The RPE curve over the training zones on `ax`."""
     ax.plot(loads, rpe_values, marker='o', color='black', label='RPE')
     ax.set_xlabel("Load")
     ax.set_ylabel("RPE")
     ax.set_ylim(0, 10)
 
-    loads_arr = np.array(loads)
-    rpes_arr = np.array(rpe_values)
-
-    aerobic_mask = (rpes_arr > 2) & (rpes_arr <= 6)
-    moderate_mask = (rpes_arr > 6) & (rpes_arr < 9)
-
-    aerobic_thres = loads_arr[aerobic_mask].mean() if np.any(aerobic_mask) else None
-    anaerobic_thres = loads_arr[moderate_mask].mean() if np.any(moderate_mask) else None
-
-    if aerobic_thres is not None and anaerobic_thres is not None:
-        ax.axvspan(min(loads), aerobic_thres, facecolor='lightgreen', alpha=0.3, label='Aerobic Zone')
-        ax.axvspan(aerobic_thres, anaerobic_thres, facecolor='khaki', alpha=0.3, label='Moderate Zone')
-        ax.axvspan(anaerobic_thres, max(loads), facecolor='lightcoral', alpha=0.3, label='Anaerobic Zone')
+    for (start, end, zone), color in zip(ramp_zones(loads, rpe_values), ZONE_COLORS):
+        ax.axvspan(start, end, facecolor=color, alpha=0.3, label=zone)
 
     # Force all load values as xticks
     ax.set_xticks(loads)
-    ax.set_xticklabels([str(int(l)) if l.is_integer() else str(l) for l in loads], rotation=45)
+    ax.set_xticklabels([str(int(l)) if float(l).is_integer() else str(l) for l in loads], rotation=45)
 
     ax.grid(True, linestyle='--', alpha=0.5)
     ax.legend(loc='upper left')
-    fig.tight_layout()
-    return save_plot_to_memory(fig)
+
+
+def plot_ramp_test(loads, rpe_values):
+    return _b64(ramp_chart_png(loads, rpe_values))
 
 
 
 # ----------------------
-# TEST_CONSTANTS
+# Norm tables in use
 # ----------------------
-TEST_CONSTANTS = {
-    "BMI": {"Male": [18.5, 25, 30], "Female": [18.5, 25, 30]},
-    "vertical_jump_power": EXPLOSIVE_POWER_TABLE,
-    "WHR": WHR_RANGES,
-    "BodyFat": BODY_FAT_TABLE,
-    "PushUp": push_thresholds,
-    "Squat": squat_thresholds,
-    "Plank": plank_percentiles,
-    "OLS": OLS_THRESHOLDS,  # expects nested dict by gender → age → {"open":val, "closed":val}
-    "ToeTouch": TOE_TOUCH_THRESHOLDS,
-}
+# Replaced together by norm_registry when other tables are activated, so read
+# them as logics.THRESHOLD_INDEX when needed instead of importing the names.
+TEST_CONSTANTS = BUILTIN_TEST_CONSTANTS
+THRESHOLD_INDEX = ThresholdIndex.from_tables(TEST_CONSTANTS)
 
 # ----------------------
 # Helpers
@@ -130,70 +235,13 @@ def get_age_range(age, thresholds_dict):
 # ----------------------
 # Classification
 # ----------------------
-def classify_metric(test_name, gender, age, value, condition=None):
-    gender_key = gender.capitalize()
-    thresholds_dict = TEST_CONSTANTS.get(test_name)
-    if not thresholds_dict:
-        return None
-
-    # OLS
+def classify_metric(test_name, gender, age, value, condition=None, index=None):
+    """`index` defaults to the tables in use (THRESHOLD_INDEX)."""
     if test_name == "OLS":
-        matched_range = get_age_range(age, thresholds_dict.get(gender_key, {}))
-        if not matched_range or not condition:
-            return None
-        threshold_value = thresholds_dict[gender_key][matched_range][condition]
-        return "Good" if value >= threshold_value else "Poor"
-
-    # ToeTouch
-    if test_name == "ToeTouch":
-        matched_range = get_age_range(age, thresholds_dict)
-        if not matched_range:
-            return None
-        values = thresholds_dict[matched_range]
-        if value <= values[1]: return "Excellent"
-        elif value <= values[2]: return "Good"
-        elif value <= values[3]: return "Average"
-        else: return "Poor"
-
-    # Plank
-    if test_name == "Plank":
-        perc = thresholds_dict.get(gender_key)
-        if not perc: return None
-        if value >= perc[7]: return "Excellent"
-        elif value >= perc[5]: return "Good"
-        elif value >= perc[3]: return "Average"
-        elif value >= perc[1]: return "Below Average"
-        return "Poor"
-
-    # BMI
-    if test_name == "BMI":
-        if value < 18.5: return "Underweight"
-        elif value < 25: return "Normal"
-        elif value < 30: return "Overweight"
-        else: return "Obese"
-    
-   
-    # Standard thresholds
-    age_ranges = thresholds_dict.get(gender_key)
-    if isinstance(age_ranges, dict):
-        matched_range = get_age_range(age, age_ranges)
-        if not matched_range:
+        if not condition:
             return None
-        values = age_ranges[matched_range]
-    elif isinstance(age_ranges, list):
-        values = age_ranges
-    else:
-        return None
-
-    order = threshold_order[1:] if test_name != "BodyFat" or test_name != "WHR"  else threshold_order
-    if test_name == "BodyFat":
-        for i, threshold in enumerate(values):
-            if value <= threshold: return order[i]
-        return order[-1]
-    else:
-        for i, threshold in enumerate(values):
-            if value >= threshold: return order[i]
-        return order[-1]
+        test_name = f"OLS_{condition}"
+    return (index or THRESHOLD_INDEX).classify(test_name, gender.capitalize(), age, value)
 
 # ----------------------
 # OLS Overall Balance
@@ -216,7 +264,9 @@ def overall_balance(ols_results: dict) -> str:
 # ----------------------
 # Master
 # ----------------------
-def process_client_data(data):
+def score_client(data, index=None):
+    # One index for the whole client, even if the tables are swapped meanwhile
+    index = index or THRESHOLD_INDEX
     gender_key = data.get("gender", "").capitalize()
 
     if not gender_key:
@@ -233,25 +283,22 @@ def process_client_data(data):
     body_fat = calculate_body_fat(data["gender"], data["age"], skinfolds)
     vertical_jump_power = calculate_power(data["weight_kg"], data["vertical_jump_height_cm"])
 
-    ramp_loads = [float(x.strip()) for x in data["ramp_test_loads"].split(",")]
-    ramp_rpe = [float(x.strip()) for x in data["ramp_test_rpes"].split(",")]
-
     classifications = {
-        "BMI": classify_metric("BMI", data["gender"], data["age"], bmi),
-        "WHR": classify_metric("WHR", data["gender"], data["age"], whr),
-        "Body Fat": classify_metric("BodyFat", data["gender"], data["age"], body_fat),
-        "vertical_jump_power": classify_metric("vertical_jump_power", data["gender"], data["age"], vertical_jump_power),
-        "PushUps": classify_metric("PushUp", data["gender"], data["age"], data["pushup_count"]),
-        "Squats": classify_metric("Squat", data["gender"], data["age"], data["squat_count"]),
-        "Plank": classify_metric("Plank", data["gender"], data["age"], data["plank_hold_seconds"]),
-        "ToeTouch": classify_metric("ToeTouch", data["gender"], data["age"], data["toe_touch_cm"]),
+        "BMI": classify_metric("BMI", data["gender"], data["age"], bmi, index=index),
+        "WHR": classify_metric("WHR", data["gender"], data["age"], whr, index=index),
+        "Body Fat": classify_metric("BodyFat", data["gender"], data["age"], body_fat, index=index),
+        "vertical_jump_power": classify_metric("vertical_jump_power", data["gender"], data["age"], vertical_jump_power, index=index),
+        "PushUps": classify_metric("PushUp", data["gender"], data["age"], data["pushup_count"], index=index),
+        "Squats": classify_metric("Squat", data["gender"], data["age"], data["squat_count"], index=index),
+        "Plank": classify_metric("Plank", data["gender"], data["age"], data["plank_hold_seconds"], index=index),
+        "ToeTouch": classify_metric("ToeTouch", data["gender"], data["age"], data["toe_touch_cm"], index=index),
     }
 
     ols_results = {
-        "OLS_Open_Right": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_right_eyes_open_sec"], condition="open"),
-        "OLS_Open_Left": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_left_eyes_open_sec"], condition="open"),
-        "OLS_Closed_Right": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_right_eyes_closed_sec"], condition="closed"),
-        "OLS_Closed_Left": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_left_eyes_closed_sec"], condition="closed"),
+        "OLS_Open_Right": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_right_eyes_open_sec"], condition="open", index=index),
+        "OLS_Open_Left": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_left_eyes_open_sec"], condition="open", index=index),
+        "OLS_Closed_Right": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_right_eyes_closed_sec"], condition="closed", index=index),
+        "OLS_Closed_Left": classify_metric("OLS", data["gender"], data["age"], data["one_leg_stance_left_eyes_closed_sec"], condition="closed", index=index),
     }
     classifications["Overall Balance"] = overall_balance(ols_results)
 
@@ -265,22 +312,163 @@ def process_client_data(data):
         "thigh_right_cm": data["thigh_rigth_cm"]
     }
 
-    plots = {
+    return {
+        "calculations": {"BMI": bmi, "WHR": whr, "BodyFat": body_fat, "vertical_jump_power": vertical_jump_power},
+        "classifications": classifications,
+        "circumferences": circumferences,
+    }
+
+
+def process_client_data(data):
+    with stage("score"):
+        result = score_client(data)
+    if not result:
+        return {}
+
+    ramp_loads = ramp_steps(data["ramp_test_loads"])
+    ramp_rpe = ramp_steps(data["ramp_test_rpes"])
+
+    result["plots"] = {
         "bmi_plot": plot_bmi_curve(data["weight_kg"], data["height_cm"]),
-        # plots
-plots = {
-    "bmi_plot": plot_bmi_curve(data["weight_kg"], data["height_cm"]),
-    "ramp_plot": plot_ramp_test(
-        [float(x.strip()) for x in data["ramp_test_loads"].split(",")],
-        [float(x.strip()) for x in data["ramp_test_rpes"].split(",")]
+        "ramp_plot": plot_ramp_test(ramp_loads, ramp_rpe),
+    }
+    return result
+
+
+# ----------------------
+# Batch scoring
+# ----------------------
+def _overall_balance_column(ols_columns):
+    import numpy as np
+
+    stacked = np.stack(ols_columns)
+    answered = (stacked != None).sum(axis=0)  # noqa: E711 - elementwise on object array
+    bad_count = (stacked == "Poor").sum(axis=0)
+    good_count = ((stacked == "Good") | (stacked == "Excellent")).sum(axis=0)
+    return np.select(
+        [good_count == answered, bad_count == 1, (bad_count >= 2) & (bad_count < 4), bad_count == 4],
+        ["Excellent", "Good", "Below Average", "Poor"],
+        default="Average",
+    ).astype(object)
+
+
+def _round2(values):
+    import numpy as np
+
+    # np.round scales by 100 before rounding, which can land on the other side
+    # of .5 from Python's correctly rounded round(); redo those few values in
+    # Python so results stay identical to the per-client path.
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(v, 2) for v in values[near_tie].tolist()]
+    return rounded
+
+
+def _float_column(data, name, size):
+    import numpy as np
+
+    column = data.get(name) if hasattr(data, "get") else None
+    if column is None:
+        return np.full(size, np.nan)
+    return np.asarray(column, dtype=float)
+
+
+def process_clients_batch(data, index=None):
+    """
+    Score a whole cohort at once.
+
+    `data` is a pandas DataFrame or a mapping of column name -> sequence using the
+    same keys as `process_client_data`. Returns the same "calculations",
+    "classifications" and "circumferences" structure with one NumPy array per
+    entry (row-aligned with the input); plots are not rendered. Rows without a
+    gender get NaN calculations and None classifications.
+    """
+    import numpy as np
+
+    genders = np.char.capitalize(np.asarray(data["gender"], dtype=str))
+    size = len(genders)
+    ages = np.asarray(data["age"], dtype=float)
+    weight = _float_column(data, "weight_kg", size)
+    height = _float_column(data, "height_cm", size)
+    waist = _float_column(data, "waist_cm", size)
+    hip = _float_column(data, "hip_cm", size)
+
+    male = genders == "Male"
+    valid = genders != ""
+
+    # Jackson-Pollock 3-site; missing folds count as zero like calculate_body_fat
+    folds = [np.nan_to_num(_float_column(data, name, size)) for name in ("chest", "abdomen", "thigh", "triceps", "suprailiac")]
+    chest, abdomen, thigh, triceps, suprailiac = folds
+    sum_folds = np.where(male, chest + abdomen + thigh, triceps + suprailiac + thigh)
+    density = np.where(
+        male,
+        1.10938 - 0.0008267 * sum_folds + 0.0000016 * sum_folds**2 - 0.0002574 * ages,
+        1.0994921 - 0.0009929 * sum_folds + 0.0000023 * sum_folds**2 - 0.0001392 * ages,
     )
-}
 
+    calculations = {
+        "BMI": _round2(weight / ((height / 100) ** 2)),
+        "WHR": _round2(waist / hip),
+        "BodyFat": _round2((495 / density) - 450),
+        "vertical_jump_power": _round2((_float_column(data, "vertical_jump_height_cm", size) * 60.7) + (45.3 * weight) - 2055),
+    }
+    for values in calculations.values():
+        values[~valid] = np.nan
+
+    index = index or THRESHOLD_INDEX
+
+    def classify(test_name, values):
+        return index.classify_column(test_name, genders, ages, values)
+
+    classifications = {
+        "BMI": classify("BMI", calculations["BMI"]),
+        "WHR": classify("WHR", calculations["WHR"]),
+        "Body Fat": classify("BodyFat", calculations["BodyFat"]),
+        "vertical_jump_power": classify("vertical_jump_power", calculations["vertical_jump_power"]),
+        "PushUps": classify("PushUp", _float_column(data, "pushup_count", size)),
+        "Squats": classify("Squat", _float_column(data, "squat_count", size)),
+        "Plank": classify("Plank", _float_column(data, "plank_hold_seconds", size)),
+        "ToeTouch": classify("ToeTouch", _float_column(data, "toe_touch_cm", size)),
+    }
+    ols_columns = [
+        classify("OLS_open", _float_column(data, "one_leg_stance_right_eyes_open_sec", size)),
+        classify("OLS_open", _float_column(data, "one_leg_stance_left_eyes_open_sec", size)),
+        classify("OLS_closed", _float_column(data, "one_leg_stance_right_eyes_closed_sec", size)),
+        classify("OLS_closed", _float_column(data, "one_leg_stance_left_eyes_closed_sec", size)),
+    ]
+    classifications["Overall Balance"] = _overall_balance_column(ols_columns)
+    for values in classifications.values():
+        values[~valid] = None
+
+    circumferences = {
+        "chest_cm": _float_column(data, "chest_cm", size),
+        "waist_cm": waist,
+        "hip_cm": hip,
+        "arm_left_cm": _float_column(data, "arms_left_cm", size),
+        "arm_right_cm": _float_column(data, "arms_rigth_cm", size),
+        "thigh_left_cm": _float_column(data, "thigh_left_cm", size),
+        "thigh_right_cm": _float_column(data, "thigh_rigth_cm", size),
     }
 
     return {
-        "calculations": {"BMI": bmi, "WHR": whr, "BodyFat": body_fat, "vertical_jump_power": vertical_jump_power},
+        "calculations": calculations,
         "classifications": classifications,
         "circumferences": circumferences,
-        "plots": plots
     }
+
+
+def split_batch(batch):
+    """
+    Per-row {"calculations": ..., "classifications": ...} dicts from
+    process_clients_batch output, with plain Python values (NaN -> None) so
+    they can be stored as JSON.
+    """
+    calculations = {name: values.tolist() for name, values in batch["calculations"].items()}
+    classifications = {name: values.tolist() for name, values in batch["classifications"].items()}
+    size = len(next(iter(calculations.values()), []))
+    for i in range(size):
+        yield {
+            "calculations": {name: (None if v[i] != v[i] else v[i]) for name, v in calculations.items()},
+            "classifications": {name: v[i] for name, v in classifications.items()},
+        }
@@ -0,0 +1,132 @@
+# Dj_Fitness_Asmt/metrics.py
+"""
+Dependency graph of the report metrics, for incremental recomputation.
+
+Each Metric names the inputs it reads: raw wizard fields ("weight_kg") or
+other metrics ("calculations.BMI"). When some fields change, recompute()
+re-evaluates only the metrics downstream of them, in dependency order, and
+reuses every other stored value. A metric whose inputs are not all known yet
+(an earlier wizard step is missing) is left out.
+
+The formulas are the ones score_client uses, so a full recompute gives the
+same calculations and classifications.
+"""
+
+from dataclasses import dataclass
+
+from .logics import (
+    calculate_bmi, calculate_body_fat, calculate_power, calculate_whr,
+    classify_metric, overall_balance,
+)
+
+OLS_FIELDS = {
+    "OLS_Open_Right": ("one_leg_stance_right_eyes_open_sec", "open"),
+    "OLS_Open_Left": ("one_leg_stance_left_eyes_open_sec", "open"),
+    "OLS_Closed_Right": ("one_leg_stance_right_eyes_closed_sec", "closed"),
+    "OLS_Closed_Left": ("one_leg_stance_left_eyes_closed_sec", "closed"),
+}
+
+
+@dataclass(frozen=True)
+class Metric:
+    section: str
+    name: str
+    inputs: tuple
+    compute: object  # callable(values) -> value
+
+    @property
+    def id(self):
+        return f"{self.section}.{self.name}"
+
+
+def _skinfolds(v):
+    if v["gender"].capitalize() == "Male":
+        return {"chest": v["chest"], "abdomen": v["abdomen"], "thigh": v["thigh"]}
+    return {"triceps": v["triceps"], "suprailiac": v["suprailiac"], "thigh": v["thigh"]}
+
+
+def _classification(name, test_name, value):
+    """Classification of `value` (a field or metric id) against `test_name`'s norms."""
+    return Metric(
+        "classifications", name, ("gender", "age", value),
+        lambda v: classify_metric(test_name, v["gender"], v["age"], v[value]),
+    )
+
+
+def _overall_balance(v):
+    return overall_balance({
+        name: classify_metric("OLS", v["gender"], v["age"], v[field], condition=condition)
+        for name, (field, condition) in OLS_FIELDS.items()
+    })
+
+
+# In dependency order; the section/name pairs and their order match score_client
+METRICS = (
+    Metric("calculations", "BMI", ("weight_kg", "height_cm"),
+           lambda v: calculate_bmi(v["weight_kg"], v["height_cm"])),
+    Metric("calculations", "WHR", ("waist_cm", "hip_cm"),
+           lambda v: calculate_whr(v["waist_cm"], v["hip_cm"])),
+    Metric("calculations", "BodyFat", ("gender", "age", "chest", "abdomen", "thigh", "triceps", "suprailiac"),
+           lambda v: calculate_body_fat(v["gender"], v["age"], _skinfolds(v))),
+    Metric("calculations", "vertical_jump_power", ("weight_kg", "vertical_jump_height_cm"),
+           lambda v: calculate_power(v["weight_kg"], v["vertical_jump_height_cm"])),
+    _classification("BMI", "BMI", "calculations.BMI"),
+    _classification("WHR", "WHR", "calculations.WHR"),
+    _classification("Body Fat", "BodyFat", "calculations.BodyFat"),
+    _classification("vertical_jump_power", "vertical_jump_power", "calculations.vertical_jump_power"),
+    _classification("PushUps", "PushUp", "pushup_count"),
+    _classification("Squats", "Squat", "squat_count"),
+    _classification("Plank", "Plank", "plank_hold_seconds"),
+    _classification("ToeTouch", "ToeTouch", "toe_touch_cm"),
+    Metric("classifications", "Overall Balance",
+           ("gender", "age", *(field for field, _ in OLS_FIELDS.values())), _overall_balance),
+)
+
+# Skinfolds of the other gender are never asked for, so they may be missing
+OPTIONAL_INPUTS = {"chest", "abdomen", "thigh", "triceps", "suprailiac"}
+
+
+def downstream(changed):
+    """Ids of the metrics that depend, directly or not, on any name in `changed`."""
+    dirty = set(changed)
+    affected = []
+    for metric in METRICS:
+        if dirty.intersection(metric.inputs):
+            dirty.add(metric.id)
+            affected.append(metric.id)
+    return affected
+
+
+def recompute(data, changed, results=None):
+    """
+    Update `results` ({metric id: value}) after the fields in `changed` were
+    set in `data`. Returns (new results, ids of the metrics recomputed).
+    Pass changed=None to compute everything from scratch.
+    """
+    results = dict(results or {})
+    affected = {metric.id for metric in METRICS} if changed is None else set(downstream(changed))
+    values = {**data, **results}
+    recomputed = []
+    for metric in METRICS:
+        if metric.id not in affected:
+            continue
+        known = all(
+            values.get(name) is not None or (name in OPTIONAL_INPUTS and name in values)
+            for name in metric.inputs
+        )
+        if known:
+            values[metric.id] = results[metric.id] = metric.compute(values)
+        else:
+            values.pop(metric.id, None)
+            results.pop(metric.id, None)
+        recomputed.append(metric.id)
+    return results, recomputed
+
+
+def as_report(results):
+    """{"calculations": {...}, "classifications": {...}} as score_client returns them."""
+    report = {"calculations": {}, "classifications": {}}
+    for metric in METRICS:
+        if metric.id in results:
+            report[metric.section][metric.name] = results[metric.id]
+    return report
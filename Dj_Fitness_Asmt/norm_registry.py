@@ -0,0 +1,167 @@
+# Dj_Fitness_Asmt/norm_registry.py
+"""
+Versioned norm tables, swappable while the process runs.
+
+A NormSet is one version of the classification tables: a label (e.g.
+"2026-10"), the TEST_CONSTANTS-style mapping and its compiled
+ThresholdIndex, whose fingerprint is what scored results store.
+
+The registry holds the NormSet in use. load() compiles and validates new
+tables first (invalid ones raise ValueError and change nothing), then swaps
+logics.TEST_CONSTANTS and logics.THRESHOLD_INDEX, so the next score and
+classify_metric call use them; a scoring run already going keeps the index
+it started with. Tables come from:
+
+- the built-in constants (label "builtin");
+- a JSON or YAML norm file, {"version": "...", "tables": {...}}, reloaded
+  by refresh_file() when its modification time changes;
+- anything else the caller has as a mapping (the Django app keeps them as
+  database rows).
+
+YAML files need PyYAML. JSON files may use Infinity for open-ended bounds;
+stores that only take strict JSON keep them as the strings "Infinity" and
+"-Infinity" (see portable_tables), which compile() reads back as floats.
+"""
+
+import json
+import math
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import logics
+from .constants import TEST_CONSTANTS as BUILTIN_TEST_CONSTANTS
+from .thresholds import ThresholdIndex
+
+BUILTIN = "builtin"
+
+
+@dataclass(frozen=True)
+class NormSet:
+    label: str
+    index: ThresholdIndex
+    source: str = BUILTIN  # where the tables came from, for display
+
+    @property
+    def tables(self):
+        return self.index.source
+
+    @property
+    def fingerprint(self):
+        return self.index.fingerprint
+
+
+# -----------------------------
+# Files
+# -----------------------------
+def load_norm_file(path):
+    """(version label, tables) of a .json, .yaml or .yml norm file."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML norm files need PyYAML (pip install pyyaml)") from None
+        document = yaml.safe_load(text)
+    elif path.suffix == ".json":
+        document = json.loads(text)
+    else:
+        raise ValueError(f"{path}: expected a .json, .yaml or .yml norm file")
+    if not isinstance(document, dict) or not isinstance(document.get("tables"), dict):
+        raise ValueError(f"{path}: expected a mapping with a \"tables\" mapping")
+    return str(document.get("version") or path.stem), document["tables"]
+
+
+def dump_norm_file(path, label, tables):
+    """Write `tables` as a JSON norm file that load_norm_file reads back unchanged."""
+    Path(path).write_text(json.dumps({"version": label, "tables": tables}, indent=2) + "\n")
+
+
+def portable_tables(tables):
+    """`tables` with infinite bounds as strings, so they are strict JSON."""
+    if isinstance(tables, dict):
+        return {key: portable_tables(value) for key, value in tables.items()}
+    if isinstance(tables, list):
+        return [portable_tables(value) for value in tables]
+    if isinstance(tables, float) and math.isinf(tables):
+        return "Infinity" if tables > 0 else "-Infinity"
+    return tables
+
+
+def restore_tables(tables):
+    """Inverse of portable_tables."""
+    if isinstance(tables, dict):
+        return {key: restore_tables(value) for key, value in tables.items()}
+    if isinstance(tables, list):
+        return [restore_tables(value) for value in tables]
+    if tables in ("Infinity", "-Infinity"):
+        return float(tables)
+    return tables
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class NormRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels = {}  # fingerprint -> label of every version activated here
+        self._file_mtime = None
+        self.current = self._builtin = NormSet(BUILTIN, logics.THRESHOLD_INDEX)
+        self._labels[self.current.fingerprint] = BUILTIN
+
+    def compile(self, label, tables, source=BUILTIN):
+        """A NormSet of `tables`; ValueError if they don't compile or validate."""
+        tables = restore_tables(tables)
+        missing = set(BUILTIN_TEST_CONSTANTS) - set(tables)
+        if missing:
+            raise ValueError(f"Norm tables {label!r} lack {', '.join(sorted(missing))}")
+        try:
+            index = ThresholdIndex.from_tables(tables)
+        except (KeyError, TypeError, AttributeError, IndexError) as exc:
+            raise ValueError(f"Invalid norm tables {label!r}: {exc!r}") from None
+        return NormSet(label, index, source)
+
+    def activate(self, norm_set):
+        """Put `norm_set` in use; returns the one it replaced."""
+        with self._lock:
+            previous = self.current
+            self._labels[norm_set.fingerprint] = norm_set.label
+            # Tables first: readers go by THRESHOLD_INDEX, which carries its own tables
+            logics.TEST_CONSTANTS = norm_set.tables
+            logics.THRESHOLD_INDEX = norm_set.index
+            self.current = norm_set
+        return previous
+
+    def load(self, label, tables, source=BUILTIN):
+        """Compile and activate `tables` unless they are the ones in use; returns the NormSet in use."""
+        norm_set = self.compile(label, tables, source)
+        if norm_set.fingerprint != self.current.fingerprint or norm_set.label != self.current.label:
+            self.activate(norm_set)
+        return self.current
+
+    def reset(self):
+        """Back to the built-in tables."""
+        if self.current is not self._builtin:
+            self.activate(self._builtin)
+            self._file_mtime = None
+        return self.current
+
+    def label(self, fingerprint):
+        """Label of the version with `fingerprint`, if it was activated in this process."""
+        return self._labels.get(fingerprint)
+
+    def refresh_file(self, path):
+        """Load the norm file at `path` if it changed since the last call; True if it did."""
+        mtime = os.stat(path).st_mtime_ns
+        if mtime == self._file_mtime:
+            return False
+        label, tables = load_norm_file(path)
+        self.load(label, tables, source=str(path))
+        self._file_mtime = mtime
+        return True
+
+
+registry = NormRegistry()
@@ -0,0 +1,148 @@
+# Dj_Fitness_Asmt/norm_tables.py
+"""
+Norm tables for coaches, materialized from the classification constants.
+
+generate_threshold_tables turns the nested gender -> age band -> thresholds
+dicts into one pandas DataFrame per test: a row per gender and age band, a
+column per rating holding the score that earns it ("at least" or "at most",
+see the frame's attrs). get_norm_tables builds them once per version of the
+tables and memoizes their HTML, CSV and JSON renderings, so serving a table
+is a dict lookup. A new version (new fingerprint of TEST_CONSTANTS, e.g.
+after norm_registry loads other tables) builds a fresh set on first use.
+
+Needs pandas.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from .constants import threshold_order
+
+
+@dataclass(frozen=True)
+class NormSpec:
+    title: str
+    source: str     # key in TEST_CONSTANTS
+    unit: str
+    rule: str       # "at least" or "at most"
+    ratings: tuple  # column names
+    pick: object = None  # callable(raw row) -> values per rating; default the row itself
+
+
+NORM_SPECS = {
+    "pushup": NormSpec("Push-ups", "PushUp", "reps", "at least", tuple(threshold_order[1:])),
+    "squat": NormSpec("Squats", "Squat", "reps", "at least", tuple(threshold_order[1:])),
+    "bodyfat": NormSpec("Body fat", "BodyFat", "%", "at most", tuple(threshold_order)),
+    "power": NormSpec("Vertical jump power", "vertical_jump_power", "Watts", "at least", tuple(threshold_order[1:])),
+    "plank": NormSpec(
+        "Plank", "Plank", "seconds", "at least", ("Excellent", "Good", "Average", "Below Average"),
+        pick=lambda row: (row[7], row[5], row[3], row[1]),
+    ),
+    "ols": NormSpec(
+        "One-leg stance, Good", "OLS", "seconds", "at least", ("Eyes open", "Eyes closed"),
+        pick=lambda row: (row["open"], row["closed"]),
+    ),
+    "toetouch": NormSpec(
+        "Toe touch", "ToeTouch", "cm", "at most", ("Excellent", "Good", "Average"),
+        pick=lambda row: row[1:4],
+    ),
+}
+FORMATS = {
+    "html": "text/html; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+def _age_key(band):
+    return int(band.split("-")[0]) if band[:1].isdigit() else -1
+
+
+def _rows(source):
+    """(gender, age band, raw row) for every row of one constants table."""
+    genders = source if set(source) <= {"Male", "Female"} else {"Any": source}
+    for gender, bands in genders.items():
+        if isinstance(bands, list):  # one row for all ages (Plank)
+            yield gender, "all", bands
+            continue
+        for band in sorted(bands, key=_age_key):
+            yield gender, band, bands[band]
+
+
+def generate_threshold_tables(test_constants=None):
+    """{table name: DataFrame} of every NORM_SPECS table, from `test_constants`."""
+    import pandas as pd
+
+    if test_constants is None:
+        from .logics import TEST_CONSTANTS as test_constants
+
+    tables = {}
+    for name, spec in NORM_SPECS.items():
+        pick = spec.pick or (lambda row: row)
+        frame = pd.DataFrame(
+            [(gender, band, *pick(row)) for gender, band, row in _rows(test_constants[spec.source])],
+            columns=["gender", "age_band", *spec.ratings],
+        )
+        frame.attrs.update(title=spec.title, unit=spec.unit, rule=spec.rule)
+        tables[name] = frame
+    return tables
+
+
+# -----------------------------
+# Cached renderings
+# -----------------------------
+class NormTables:
+    """One version of the tables, with each rendering built on first request."""
+
+    def __init__(self, frames, fingerprint):
+        self.frames = frames
+        self.fingerprint = fingerprint
+        self._renderings = {}
+        self._lock = threading.Lock()
+
+    def etag(self, name, fmt):
+        return f"{self.fingerprint[:16]}-{name}-{fmt}"
+
+    def render(self, name, fmt):
+        """The `fmt` rendering of table `name` as bytes; KeyError for unknown ones."""
+        key = (name, fmt)
+        rendering = self._renderings.get(key)
+        if rendering is None:
+            if fmt not in FORMATS:
+                raise KeyError(fmt)
+            frame = self.frames[name]
+            with self._lock:
+                rendering = self._renderings.get(key)
+                if rendering is None:
+                    rendering = self._renderings[key] = self._build(frame, fmt)
+        return rendering
+
+    @staticmethod
+    def _build(frame, fmt):
+        if fmt == "csv":
+            return frame.to_csv(index=False).encode()
+        if fmt == "json":
+            return frame.to_json(orient="records").encode()
+        caption = f"{frame.attrs['title']} ({frame.attrs['unit']}, {frame.attrs['rule']})"
+        return frame.to_html(index=False, classes="table table-sm table-striped", border=0).replace(
+            "<thead>", f"<caption>{caption}</caption>\n  <thead>", 1,
+        ).encode()
+
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def get_norm_tables():
+    """The NormTables of the classification tables currently in use."""
+    global _current
+    from . import logics
+
+    index = logics.THRESHOLD_INDEX
+    current = _current
+    if current is None or current.fingerprint != index.fingerprint:
+        with _current_lock:
+            if _current is None or _current.fingerprint != index.fingerprint:
+                _current = NormTables(generate_threshold_tables(index.source), index.fingerprint)
+            current = _current
+    return current
@@ -0,0 +1,171 @@
+# Dj_Fitness_Asmt/pdf_report.py
+"""
+Printable PDF of an assessment summary, drawn with matplotlib alone.
+
+A report is two A4 pages: the client, calculations, circumferences and
+classifications as text, then the BMI and ramp charts drawn with the same
+draw_bmi_chart/draw_ramp_chart as the PNG charts. Both pages are drawn on
+one pooled A4 figure (see figure_pool), cleared after each page, instead of
+building a figure per chart; it never enters pyplot's registry, so nothing
+is left open between reports.
+
+render_pdfs writes one PDF per report with a pool of worker processes: at
+most `2 * workers` reports are in flight, workers are replaced after
+MAX_TASKS_PER_WORKER reports, and a report without a result `timeout`
+seconds after it was submitted is reported as failed: its pool is
+terminated and the other reports in flight are resubmitted to a new one, so
+it does not hold up the batch. Kept free of Django, like chart_worker.
+"""
+
+import multiprocessing
+import time
+from collections import deque
+from io import BytesIO
+from pathlib import Path
+
+from .figure_pool import pooled_figure
+from .timing import stage
+
+A4 = (8.27, 11.69)  # inches
+MAX_TASKS_PER_WORKER = 200
+LINE = 0.022  # text line height as a fraction of the page
+
+
+def report_data(name, assessed_at, data, calculations, classifications, circumferences):
+    """The plain dict pdf_report draws, picklable for the batch workers."""
+    return {
+        "name": name,
+        "assessed_at": assessed_at,
+        "weight_kg": data["weight_kg"],
+        "height_cm": data["height_cm"],
+        "ramp_test_loads": list(data["ramp_test_loads"]),
+        "ramp_test_rpes": list(data["ramp_test_rpes"]),
+        "calculations": calculations,
+        "classifications": classifications,
+        "circumferences": circumferences,
+    }
+
+
+def _section(fig, top, title, items):
+    """Draw a titled list of (label, value) rows; returns the y below it."""
+    fig.text(0.08, top, title, fontsize=13, weight="bold")
+    y = top - 1.5 * LINE
+    for label, value in items:
+        fig.text(0.1, y, str(label).replace("_", " "), fontsize=10)
+        fig.text(0.55, y, "–" if value is None else str(value), fontsize=10)
+        y -= LINE
+    return y - LINE
+
+
+def _draw_summary(fig, report):
+    fig.text(0.08, 0.94, f"Fitness assessment – {report['name']}", fontsize=16, weight="bold")
+    fig.text(0.08, 0.915, report["assessed_at"], fontsize=10, color="dimgray")
+    y = _section(fig, 0.87, "Calculations", report["calculations"].items())
+    y = _section(fig, y, "Circumferences (cm)", report["circumferences"].items())
+    _section(fig, y, "Classifications", report["classifications"].items())
+
+
+def _draw_charts(fig, report):
+    from .logics import draw_bmi_chart, draw_ramp_chart
+
+    draw_bmi_chart(fig.add_subplot(2, 1, 1), report["weight_kg"], report["height_cm"])
+    draw_ramp_chart(fig.add_subplot(2, 1, 2), report["ramp_test_loads"], report["ramp_test_rpes"])
+    fig.tight_layout(pad=3)
+
+
+PAGES = (_draw_summary, _draw_charts)
+
+
+def pdf_report(report):
+    """PDF bytes of one report_data dict."""
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    buf = BytesIO()
+    metadata = {"Title": f"Assessment of {report['name']}"}
+    with pooled_figure(A4) as fig, stage("pdf"), PdfPages(buf, metadata=metadata) as pdf:
+        for draw in PAGES:
+            draw(fig, report)
+            pdf.savefig(fig)
+            fig.clear()
+    return buf.getvalue()
+
+
+# -----------------------------
+# Batch
+# -----------------------------
+def write_pdf(report, path):
+    """Worker task: render one report to `path`; returns the path."""
+    Path(path).write_bytes(pdf_report(report))
+    return path
+
+
+def render_pdfs(jobs, workers=0, timeout=60):
+    """
+    Render (report_data, path) jobs, yielding (path, error or None) as each
+    finishes, in job order. workers=0 renders in this process.
+    """
+    if workers <= 0:
+        for report, path in jobs:
+            try:
+                yield write_pdf(report, path), None
+            except Exception as exc:
+                yield path, exc
+        return
+    batch = _Batch(workers, timeout)
+    try:
+        for report, path in jobs:
+            batch.submit(report, path)
+            while len(batch.in_flight) >= 2 * workers:
+                yield batch.next_result()
+        while batch.in_flight:
+            yield batch.next_result()
+    finally:
+        batch.pool.terminate()
+        batch.pool.join()
+
+
+class _Batch:
+    """
+    The reports in flight in a multiprocessing pool, oldest first. Each has
+    `timeout` seconds from its submission; when one runs out, the pool is
+    terminated (its worker may never return) and the reports still in flight
+    go to a fresh pool with fresh deadlines, so a stuck report costs one
+    timeout rather than one per report queued behind it.
+    """
+
+    def __init__(self, workers, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.pool = self._new_pool()
+        self.in_flight = deque()  # (report, path, AsyncResult, deadline)
+
+    def _new_pool(self):
+        return self.context.Pool(self.workers, maxtasksperchild=MAX_TASKS_PER_WORKER)
+
+    def submit(self, report, path):
+        result = self.pool.apply_async(write_pdf, (report, path))
+        self.in_flight.append((report, path, result, time.monotonic() + self.timeout))
+
+    def next_result(self):
+        """(path, error or None) of the oldest report."""
+        report, path, result, deadline = self.in_flight.popleft()
+        try:
+            return result.get(timeout=max(deadline - time.monotonic(), 0)), None
+        except multiprocessing.TimeoutError:
+            self._restart()
+            return path, TimeoutError(f"no result after {self.timeout} s")
+        except Exception as exc:
+            return path, exc
+
+    def _restart(self):
+        pending = [(job, job[2].ready()) for job in self.in_flight]  # finished results outlive the pool
+        self.in_flight.clear()
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = self._new_pool()
+        for job, finished in pending:
+            if finished:
+                self.in_flight.append(job)
+            else:
+                self.submit(*job[:2])
@@ -0,0 +1,88 @@
+# Dj_Fitness_Asmt/percentiles.py
+"""
+Percentiles of a client within our own population.
+
+PercentileIndex keeps one sorted list of values per (metric, gender, age
+band), the same breakdown as the norm tables. Adding or removing an
+assessment is a bisect per metric, and a percentile is two bisects on one
+list, so nothing ever scans the assessment history after the index is built.
+
+The percentile of a value is the share of the cohort below it, counting ties
+as half (the mid-rank definition), in 0-100. It says where a client stands,
+not whether that is good: a low body fat percentile is a low body fat.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from .progress import PROGRESS_METRICS
+
+# Ramp thresholds need the steps of every assessment; the other progress
+# metrics come straight from the stored inputs and calculations.
+PERCENTILE_METRICS = tuple(name for name in PROGRESS_METRICS if not name.endswith("_threshold"))
+
+
+def percentile_point(data, calculations):
+    """{metric: value} of one assessment; missing values are None."""
+    return {name: PROGRESS_METRICS[name](data, calculations, (None, None)) for name in PERCENTILE_METRICS}
+
+
+def mid_rank(values, value):
+    """Percentile of `value` in the sorted list `values`; None if it is empty."""
+    if not values:
+        return None
+    below = bisect_left(values, value)
+    ties = bisect_right(values, value, lo=below) - below
+    return round(100 * (below + ties / 2) / len(values), 1)
+
+
+class PercentileIndex:
+    """Sorted values per (metric, gender, age band), safe to share between threads."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        self.last_id = 0  # highest assessment id added, for catching up
+
+    @classmethod
+    def from_points(cls, points):
+        """Index of (id, gender, age band, point) tuples, sorted once rather than inserted one by one."""
+        index = cls()
+        for assessment_id, gender, band, point in points:
+            for metric, value in point.items():
+                if value is not None:
+                    index._values.setdefault((metric, gender, band), []).append(value)
+            index.last_id = max(index.last_id, assessment_id)
+        for values in index._values.values():
+            values.sort()
+        return index
+
+    def add(self, assessment_id, gender, band, point):
+        with self._lock:
+            for metric, value in point.items():
+                if value is not None:
+                    insort(self._values.setdefault((metric, gender, band), []), value)
+            self.last_id = max(self.last_id, assessment_id)
+
+    def remove(self, gender, band, point):
+        with self._lock:
+            for metric, value in point.items():
+                values = self._values.get((metric, gender, band))
+                if value is None or not values:
+                    continue
+                i = bisect_left(values, value)
+                if i < len(values) and values[i] == value:
+                    del values[i]
+
+    def size(self, metric, gender, band):
+        return len(self._values.get((metric, gender, band), ()))
+
+    def percentile(self, metric, gender, band, value):
+        if value is None:
+            return None
+        with self._lock:
+            return mid_rank(self._values.get((metric, gender, band), ()), value)
+
+    def percentiles(self, gender, band, point):
+        """{metric: percentile} of one assessment's point within its cohort."""
+        return {metric: self.percentile(metric, gender, band, value) for metric, value in point.items()}
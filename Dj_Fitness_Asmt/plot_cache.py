@@ -0,0 +1,177 @@
+# Dj_Fitness_Asmt/plot_cache.py
+"""
+Content-addressed cache for rendered charts.
+
+A chart is fully determined by its inputs and by the plotting code, so the key
+is a hash of the normalized inputs plus PLOT_STYLE_VERSION. Bump the version
+whenever the look of a chart changes so stale images are never served.
+
+Backends:
+- LRUPlotCache: in-process, bounded by entry count and total bytes (default)
+- DjangoPlotCache: any Django cache alias, so gunicorn workers can share charts
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+PLOT_STYLE_VERSION = 2
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def _normalize(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if hasattr(value, "tolist"):  # NumPy arrays and scalars
+        return _normalize(value.tolist())
+    if isinstance(value, str):
+        return value
+    return float(value)
+
+
+def plot_key(kind, *args):
+    digest = hashlib.sha256(repr((PLOT_STYLE_VERSION, kind, _normalize(args))).encode()).hexdigest()
+    return f"plot:{kind}:v{PLOT_STYLE_VERSION}:{digest}"
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class LRUPlotCache:
+    """Thread-safe LRU bounded by `max_entries` and `max_bytes`."""
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    async def aget(self, key):
+        return self.get(key)  # in memory, nothing to wait for
+
+    def set(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = value
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+
+class DjangoPlotCache:
+    """
+    Stores charts in a Django cache alias (see CACHES in settings). Size limits
+    and eviction are the backend's; hit/miss counters are per process.
+    """
+
+    def __init__(self, alias="default", timeout=None):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key):
+        value = self._cache.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def aget(self, key):
+        value = await self._cache.aget(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._cache.set(key, value, self.timeout)
+
+    def clear(self):
+        self._cache.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "backend": self.alias}
+
+
+_plot_cache = LRUPlotCache()
+
+
+def get_plot_cache():
+    return _plot_cache
+
+
+def set_plot_cache(cache):
+    """Swap the process-wide backend; pass None to disable caching."""
+    global _plot_cache
+    _plot_cache = cache
+
+
+# -----------------------------
+# Decorator
+# -----------------------------
+def cached_plot(kind):
+    """Serve a plot function's return value from the cache, keyed on its arguments."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            cache = _plot_cache
+            if cache is None:
+                return func(*args)
+            key = plot_key(kind, *args)
+            value = cache.get(key)
+            if value is None:
+                value = func(*args)
+                cache.set(key, value)
+            return value
+        wrapper.uncached = func
+        wrapper.kind = kind
+        return wrapper
+    return decorator
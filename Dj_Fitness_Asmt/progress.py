@@ -0,0 +1,126 @@
+# Dj_Fitness_Asmt/progress.py
+"""
+Per-client progress series in a compact columnar form.
+
+A series holds one column per PROGRESS_METRICS entry plus the test times
+("t", epoch seconds) and assessment ids ("id"), all sorted by time:
+
+    {"t": [1704067200, 1711929600], "id": [12, 40], "BMI": [24.1, 23.6], ...}
+
+It is a plain dict of lists, so it stores as one JSON value per client and
+"last N tests" or "change since baseline" never touch the assessment history.
+downsample() thins long histories for trend charts with largest-triangle-
+three-buckets, which keeps the peaks and dips a plain stride would drop.
+"""
+
+from bisect import bisect_right
+
+from .ramp import ramp_thresholds
+
+
+def _mean(*values):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+# name -> callable(inputs, calculations, (aerobic, anaerobic)) -> value or None
+PROGRESS_METRICS = {
+    "BMI": lambda d, c, r: c.get("BMI"),
+    "BodyFat": lambda d, c, r: c.get("BodyFat"),
+    "WHR": lambda d, c, r: c.get("WHR"),
+    "vertical_jump_power": lambda d, c, r: c.get("vertical_jump_power"),
+    "pushup_count": lambda d, c, r: d.get("pushup_count"),
+    "squat_count": lambda d, c, r: d.get("squat_count"),
+    "plank_hold_seconds": lambda d, c, r: d.get("plank_hold_seconds"),
+    "toe_touch_cm": lambda d, c, r: d.get("toe_touch_cm"),
+    "OLS_open": lambda d, c, r: _mean(
+        d.get("one_leg_stance_right_eyes_open_sec"), d.get("one_leg_stance_left_eyes_open_sec"),
+    ),
+    "OLS_closed": lambda d, c, r: _mean(
+        d.get("one_leg_stance_right_eyes_closed_sec"), d.get("one_leg_stance_left_eyes_closed_sec"),
+    ),
+    "aerobic_threshold": lambda d, c, r: r[0],
+    "anaerobic_threshold": lambda d, c, r: r[1],
+}
+
+
+def progress_point(data, calculations):
+    """{metric: value} of one assessment from its inputs and calculations."""
+    ramp = ramp_thresholds(data.get("ramp_test_loads") or [], data.get("ramp_test_rpes") or [])
+    return {name: metric(data, calculations, ramp) for name, metric in PROGRESS_METRICS.items()}
+
+
+# -----------------------------
+# Series
+# -----------------------------
+def empty_series():
+    return {"t": [], "id": [], **{name: [] for name in PROGRESS_METRICS}}
+
+
+def insert_point(series, timestamp, assessment_id, point):
+    """Add one test in time order; a test already present is replaced."""
+    remove_point(series, assessment_id)
+    i = bisect_right(series["t"], timestamp)
+    series["t"].insert(i, timestamp)
+    series["id"].insert(i, assessment_id)
+    for name in PROGRESS_METRICS:
+        series.setdefault(name, [None] * (len(series["t"]) - 1)).insert(i, point.get(name))
+    return series
+
+
+def remove_point(series, assessment_id):
+    try:
+        i = series["id"].index(assessment_id)
+    except ValueError:
+        return series
+    for column in series.values():
+        del column[i]
+    return series
+
+
+def last_tests(series, n):
+    """The same columns restricted to the `n` most recent tests."""
+    return {name: column[-n:] if n > 0 else [] for name, column in series.items()}
+
+
+def change_since_baseline(series):
+    """{metric: latest - first recorded value}, None where fewer than two values exist."""
+    change = {}
+    for name in PROGRESS_METRICS:
+        values = [v for v in series.get(name, ()) if v is not None]
+        change[name] = round(values[-1] - values[0], 2) if len(values) > 1 else None
+    return change
+
+
+# -----------------------------
+# Downsampling
+# -----------------------------
+def downsample(times, values, max_points):
+    """
+    Largest-triangle-three-buckets: at most `max_points` (time, value) pairs
+    that keep the shape of the series. Missing values are skipped.
+    """
+    points = [(t, v) for t, v in zip(times, values) if v is not None]
+    if len(points) <= max_points:
+        return points
+    if max_points < 3:
+        return [points[0], points[-1]][:max_points]
+
+    sampled = [points[0]]
+    bucket = (len(points) - 2) / (max_points - 2)
+    previous = points[0]
+    for i in range(max_points - 2):
+        start, end = int(i * bucket) + 1, int((i + 1) * bucket) + 1
+        # Average of the next bucket (the last point for the final one)
+        following = points[end:min(int((i + 2) * bucket) + 1, len(points) - 1)] or [points[-1]]
+        avg_t = sum(t for t, _ in following) / len(following)
+        avg_v = sum(v for _, v in following) / len(following)
+        best, best_area = None, -1.0
+        for t, v in points[start:end]:
+            area = abs((previous[0] - avg_t) * (v - previous[1]) - (previous[0] - t) * (avg_v - previous[1]))
+            if area > best_area:
+                best, best_area = (t, v), area
+        sampled.append(best)
+        previous = best
+    sampled.append(points[-1])
+    return sampled
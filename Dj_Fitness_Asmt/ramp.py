@@ -0,0 +1,111 @@
+# Dj_Fitness_Asmt/ramp.py
+"""
+Ramp test analysis.
+
+The aerobic threshold is the mean load over steps rated RPE 3-6 and the
+anaerobic threshold the mean load over steps rated RPE 7-8 (strictly between
+6 and 9). Either is None when no step falls in its band. With both known the
+test splits into three zones: aerobic from the first load to the aerobic
+threshold, moderate up to the anaerobic threshold, anaerobic up to the last
+load.
+
+ramp_thresholds and ramp_zones analyze one test from plain sequences of
+numbers. analyze_ramp_batch does the same for a whole team at once, from 2-D
+arrays (athletes x steps, NaN-padded) or ragged lists of per-athlete steps.
+The charts draw ramp_zones; nothing here imports a plotting library.
+"""
+
+from itertools import chain
+
+AEROBIC_RPE = (2, 6)     # (exclusive low, inclusive high]
+ANAEROBIC_RPE = (6, 9)   # (exclusive low, exclusive high)
+ZONES = ("Aerobic Zone", "Moderate Zone", "Anaerobic Zone")
+ZONE_COLORS = ("lightgreen", "khaki", "lightcoral")  # shared by the PNG and SVG charts
+
+
+def ramp_steps(values):
+    """Floats from a sequence of numbers or a comma-separated string ("1, 2, 3")."""
+    if isinstance(values, str):
+        return [float(x) for x in values.split(",")]
+    return [float(x) for x in values]
+
+
+def ramp_thresholds(loads, rpe_values):
+    """(aerobic_threshold, anaerobic_threshold) loads for one ramp test."""
+    aerobic = [l for l, r in zip(loads, rpe_values) if AEROBIC_RPE[0] < r <= AEROBIC_RPE[1]]
+    anaerobic = [l for l, r in zip(loads, rpe_values) if ANAEROBIC_RPE[0] < r < ANAEROBIC_RPE[1]]
+    return (
+        sum(aerobic) / len(aerobic) if aerobic else None,
+        sum(anaerobic) / len(anaerobic) if anaerobic else None,
+    )
+
+
+def ramp_zones(loads, rpe_values):
+    """[(start load, end load, zone name), ...] or [] when a threshold is missing."""
+    aerobic, anaerobic = ramp_thresholds(loads, rpe_values)
+    if aerobic is None or anaerobic is None:
+        return []
+    bounds = (min(loads), aerobic, anaerobic, max(loads))
+    return list(zip(bounds, bounds[1:], ZONES))
+
+
+# ----------------------
+# Batch analysis
+# ----------------------
+def pad_steps(rows):
+    """
+    2-D float array from per-athlete step sequences of different lengths,
+    right-padded with NaN. A 2-D array is returned as floats unchanged.
+    """
+    import numpy as np
+
+    if isinstance(rows, np.ndarray) and rows.ndim == 2:
+        return rows.astype(float, copy=False)
+    rows = [ramp_steps(row) if isinstance(row, str) else row for row in rows]
+    lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+    padded = np.full((len(rows), lengths.max(initial=0)), np.nan)
+    # Row-major boolean assignment fills each row's leading cells in order
+    padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.fromiter(
+        chain.from_iterable(rows), dtype=float, count=lengths.sum(),
+    )
+    return padded
+
+
+def _band_mean(loads, mask):
+    import numpy as np
+
+    counts = mask.sum(axis=1)
+    totals = np.where(mask, loads, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def analyze_ramp_batch(loads, rpe_values):
+    """
+    Analyze many ramp tests in one pass.
+
+    `loads` and `rpe_values` are row-aligned: 2-D arrays padded with NaN, or
+    ragged sequences of per-athlete steps. Steps where either value is NaN
+    are ignored. Returns one NumPy array per entry, row-aligned with the
+    input: "aerobic_threshold" and "anaerobic_threshold" (NaN where no step
+    falls in the band) and the zone bounds "min_load" and "max_load" (NaN
+    for a test without steps).
+    """
+    import numpy as np
+
+    loads, rpe = pad_steps(loads), pad_steps(rpe_values)
+    if loads.shape != rpe.shape:
+        raise ValueError(f"loads {loads.shape} and RPE values {rpe.shape} do not line up")
+
+    valid = ~(np.isnan(loads) | np.isnan(rpe))
+    with np.errstate(invalid="ignore"):  # NaN padding never matches a band
+        aerobic = valid & (rpe > AEROBIC_RPE[0]) & (rpe <= AEROBIC_RPE[1])
+        anaerobic = valid & (rpe > ANAEROBIC_RPE[0]) & (rpe < ANAEROBIC_RPE[1])
+
+    has_steps = valid.any(axis=1)
+    return {
+        "aerobic_threshold": _band_mean(loads, aerobic),
+        "anaerobic_threshold": _band_mean(loads, anaerobic),
+        "min_load": np.where(has_steps, np.where(valid, loads, np.inf).min(axis=1, initial=np.inf), np.nan),
+        "max_load": np.where(has_steps, np.where(valid, loads, -np.inf).max(axis=1, initial=-np.inf), np.nan),
+    }
@@ -0,0 +1,188 @@
+# Dj_Fitness_Asmt/svg_charts.py
+"""
+Lightweight SVG renderer for the report charts.
+
+Draws the same BMI and ramp test charts as the matplotlib functions in
+logics.py, but builds the SVG text directly: no figure, no layout engine and
+no rasterizing. Matplotlib stays in charge of PNG/PDF output.
+"""
+
+import math
+from html import escape
+
+from .constants import BMI_CHART_HEIGHTS, BMI_CHART_LINES
+from .logics import calculate_bmi
+from .plot_cache import cached_plot
+from .ramp import ZONE_COLORS, ramp_zones
+from .timing import timed
+
+FONT = "DejaVu Sans, Arial, sans-serif"
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _fmt(value):
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _label(value):
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def nice_ticks(low, high, count=6):
+    """Round-numbered ticks covering [low, high], like matplotlib's MaxNLocator."""
+    if high <= low:
+        return [low]
+    raw = (high - low) / max(count - 1, 1)
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step - 1e-9) * step
+    ticks = []
+    tick = first
+    while tick <= high + 1e-9:
+        ticks.append(round(tick, 10))
+        tick += step
+    return ticks
+
+
+def _padded(values, fraction=0.05):
+    low, high = min(values), max(values)
+    pad = (high - low) * fraction or 1
+    return low - pad, high + pad
+
+
+class _Chart:
+    """A single plot area in a width x height SVG, y axis pointing up."""
+
+    def __init__(self, width, height, xlim, ylim, margins=(50, 15, 15, 45)):
+        self.width, self.height = width, height
+        self.left, self.right, self.top, self.bottom = margins
+        self.xlim, self.ylim = xlim, ylim
+        self.parts = [f'<rect width="{width}" height="{height}" fill="white"/>']
+
+    def x(self, value):
+        x0, x1 = self.xlim
+        return self.left + (value - x0) / (x1 - x0) * (self.width - self.left - self.right)
+
+    def y(self, value):
+        y0, y1 = self.ylim
+        return self.height - self.bottom - (value - y0) / (y1 - y0) * (self.height - self.top - self.bottom)
+
+    def add(self, element):
+        self.parts.append(element)
+
+    def grid(self, xticks, yticks, dashed=False, opacity=1.0):
+        dash = ' stroke-dasharray="3,3"' if dashed else ""
+        lines = [f'M{_fmt(self.x(t))} {self.top}V{self.height - self.bottom}' for t in xticks]
+        lines += [f'M{self.left} {_fmt(self.y(t))}H{self.width - self.right}' for t in yticks]
+        self.add(f'<path d="{"".join(lines)}" stroke="#b0b0b0" stroke-width="0.8" opacity="{opacity}"{dash} fill="none"/>')
+
+    def axes(self, xticks, yticks, xlabel, ylabel, xtick_labels=None, rotate_x=False):
+        w, h = self.width - self.left - self.right, self.height - self.top - self.bottom
+        self.add(f'<rect x="{self.left}" y="{self.top}" width="{w}" height="{h}" fill="none" stroke="black" stroke-width="0.8"/>')
+        base = self.height - self.bottom
+        labels = xtick_labels or [_label(t) for t in xticks]
+        for tick, label in zip(xticks, labels):
+            x = _fmt(self.x(tick))
+            self.add(f'<path d="M{x} {base}v4" stroke="black" stroke-width="0.8"/>')
+            if rotate_x:
+                self.add(f'<text x="{x}" y="{base + 14}" text-anchor="end" transform="rotate(-45 {x} {base + 14})">{escape(label)}</text>')
+            else:
+                self.add(f'<text x="{x}" y="{base + 15}" text-anchor="middle">{escape(label)}</text>')
+        for tick in yticks:
+            y = _fmt(self.y(tick))
+            self.add(f'<path d="M{self.left} {y}h-4" stroke="black" stroke-width="0.8"/>')
+            self.add(f'<text x="{self.left - 6}" y="{y}" text-anchor="end" dominant-baseline="middle">{_label(tick)}</text>')
+        self.add(f'<text x="{self.left + w / 2}" y="{self.height - 5}" text-anchor="middle" font-size="11">{escape(xlabel)}</text>')
+        cy = self.top + h / 2
+        self.add(f'<text x="12" y="{cy}" text-anchor="middle" font-size="11" transform="rotate(-90 12 {cy})">{escape(ylabel)}</text>')
+
+    def polyline(self, xs, ys, color, dashed=False, markers=False):
+        points = " ".join(f"{_fmt(self.x(x))},{_fmt(self.y(y))}" for x, y in zip(xs, ys))
+        dash = ' stroke-dasharray="6,3"' if dashed else ""
+        self.add(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.5"{dash}/>')
+        if markers:
+            for x, y in zip(xs, ys):
+                self.point(x, y, color)
+
+    def point(self, x, y, color, radius=3.5):
+        self.add(f'<circle cx="{_fmt(self.x(x))}" cy="{_fmt(self.y(y))}" r="{radius}" fill="{color}"/>')
+
+    def vspan(self, x0, x1, color, opacity=0.3):
+        left, right = self.x(x0), self.x(x1)
+        self.add(
+            f'<rect x="{_fmt(left)}" y="{self.top}" width="{_fmt(right - left)}" '
+            f'height="{self.height - self.top - self.bottom}" fill="{color}" opacity="{opacity}"/>'
+        )
+
+    def legend(self, entries, font_size=8):
+        """entries: [(label, kind, color, dashed)] with kind "line", "point" or "patch"."""
+        row = font_size + 5
+        width = 30 + max(len(label) for label, *_ in entries) * font_size * 0.6
+        x, y = self.left + 6, self.top + 6
+        self.add(
+            f'<rect x="{x}" y="{y}" width="{_fmt(width)}" height="{len(entries) * row + 6}" '
+            f'fill="white" opacity="0.8" stroke="#cccccc" rx="2"/>'
+        )
+        for i, (label, kind, color, dashed) in enumerate(entries):
+            cy = y + 3 + row * i + row / 2
+            if kind == "patch":
+                self.add(f'<rect x="{x + 5}" y="{_fmt(cy - 4)}" width="16" height="8" fill="{color}" opacity="0.3"/>')
+            elif kind == "point":
+                self.add(f'<circle cx="{x + 13}" cy="{_fmt(cy)}" r="3" fill="{color}"/>')
+            else:
+                dash = ' stroke-dasharray="4,2"' if dashed else ""
+                self.add(f'<path d="M{x + 5} {_fmt(cy)}h16" stroke="{color}" stroke-width="1.5"{dash}/>')
+            self.add(f'<text x="{x + 26}" y="{_fmt(cy)}" dominant-baseline="middle" font-size="{font_size}">{escape(label)}</text>')
+
+    def render(self):
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}" font-family="{FONT}" font-size="10">'
+            + "".join(self.parts) + "</svg>"
+        )
+
+
+# -----------------------------
+# Charts
+# -----------------------------
+@cached_plot("bmi_svg")
+@timed("svg")
+def bmi_chart_svg(weight_kg, height_cm):
+    heights = BMI_CHART_HEIGHTS
+    curves = [[bmi * (h / 100) ** 2 for h in heights] for bmi, *_ in BMI_CHART_LINES]
+
+    xs = [w for weights in curves for w in weights] + [weight_kg]
+    chart = _Chart(400, 300, _padded(xs), _padded([heights[0], heights[-1], height_cm]))
+    xticks = nice_ticks(*chart.xlim)
+    yticks = nice_ticks(*chart.ylim)
+    chart.grid(xticks, yticks)
+    for weights, (_, _, linestyle, color) in zip(curves, BMI_CHART_LINES):
+        chart.polyline(weights, heights, color, dashed=linestyle == "--")
+    chart.point(weight_kg, height_cm, "black")
+    chart.axes(xticks, yticks, "Weight (kg)", "Height (cm)")
+    chart.legend(
+        [(label, "line", color, linestyle == "--") for _, label, linestyle, color in BMI_CHART_LINES]
+        + [(f"You - {calculate_bmi(weight_kg, height_cm)}", "point", "black", False)],
+        font_size=6,
+    )
+    return chart.render()
+
+
+@cached_plot("ramp_svg")
+@timed("svg")
+def ramp_chart_svg(loads, rpe_values):
+    chart = _Chart(600, 400, _padded(loads), (0, 10), margins=(45, 15, 15, 60))
+    yticks = nice_ticks(0, 10)
+
+    entries = [("RPE", "line", "black", False)]
+    for (start, end, label), color in zip(ramp_zones(loads, rpe_values), ZONE_COLORS):
+        chart.vspan(start, end, color)
+        entries.append((label, "patch", color, False))
+
+    chart.grid(loads, yticks, dashed=True, opacity=0.5)
+    chart.polyline(loads, rpe_values, "black", markers=True)
+    chart.axes(loads, yticks, "Load", "RPE", xtick_labels=[_label(l) for l in loads], rotate_x=True)
+    chart.legend(entries, font_size=10)
+    return chart.render()
@@ -6,10 +6,10 @@ from PIL import Image
 import base64
 
 from Dj_Fitness_Asmt.logics import (
-    generate_threshold_tables,
     plot_bmi_curve,
     plot_ramp_test
 )
+from Dj_Fitness_Asmt.norm_tables import generate_threshold_tables
 from Dj_Fitness_Asmt.constants import (
     BODY_FAT_TABLE,
     EXPLOSIVE_POWER_TABLE,
@@ -42,13 +42,8 @@ def test_tables_and_plots():
 
     weight_kg = 75  # example weight
     height_cm = 175  # example height
-    bmi_plot_buf = plot_bmi_curve(weight_kg, height_cm)
-
-    # Save the plot
-    # Correct way to open the BytesIO buffer
-    bmi_plot_buf.seek(0)  # ensure buffer is at the start
-    img = Image.open(bmi_plot_buf)
-    img.save(output_dir / "bmi_plot.png")
+    bmi_plot_base64 = plot_bmi_curve(weight_kg, height_cm)
+    save_base64_image(bmi_plot_base64, output_dir / "bmi_plot.png")
 
     print("[OK] BMI plot saved.")
 
@@ -0,0 +1,265 @@
+# Dj_Fitness_Asmt/thresholds.py
+"""
+Precompiled lookup index over the classification tables.
+
+The nested gender -> "20-29" -> thresholds dicts are parsed once into sorted
+age bands and monotone threshold arrays, so a classification is two bisects
+instead of a dict walk plus string parsing. The same compiled rows back the
+scalar path (classify_metric) and the NumPy batch path.
+
+Index keys:
+- test name as used by classify_metric; OLS is split into "OLS_open"/"OLS_closed"
+- gender "Male"/"Female", or None for tables that ignore gender (BMI, ToeTouch)
+"""
+
+import hashlib
+import json
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+
+from .constants import threshold_order
+
+logger = logging.getLogger(__name__)
+
+ALL_AGES = (float("-inf"), float("inf"))
+
+
+# -----------------------------
+# Rules
+# -----------------------------
+@dataclass(frozen=True)
+class Rule:
+    """
+    labels[i] for the first threshold i where `value op thresholds[i]` holds,
+    else labels[-1].
+
+    `bounds` is a running min (">=") or max ("<=", "<") of the raw row, stored
+    ascending; its first match is the same as the raw row's, which is what
+    lets both bisect and np.searchsorted answer the lookup.
+    """
+    bounds: tuple
+    op: str
+    labels: tuple
+
+    @classmethod
+    def compile(cls, thresholds, op, labels):
+        if op == ">=":
+            running, bounds = float("inf"), []
+            for t in thresholds:
+                running = min(running, t)
+                bounds.append(running)
+            bounds.reverse()
+        else:
+            running, bounds = float("-inf"), []
+            for t in thresholds:
+                running = max(running, t)
+                bounds.append(running)
+        return cls(tuple(float(b) for b in bounds), op, tuple(labels))
+
+    def index(self, value):
+        if value != value:  # NaN never satisfies a comparison
+            return len(self.bounds)
+        if self.op == ">=":
+            return len(self.bounds) - bisect_right(self.bounds, value)
+        if self.op == "<=":
+            return bisect_left(self.bounds, value)
+        return bisect_right(self.bounds, value)
+
+    def classify(self, value):
+        return self.labels[self.index(value)]
+
+    @cached_property
+    def array(self):
+        """`bounds` as a read-only NumPy array, built on first batch use."""
+        import numpy as np
+
+        array = np.array(self.bounds, dtype=float)
+        array.flags.writeable = False
+        return array
+
+    def index_array(self, values):
+        import numpy as np
+
+        bounds = self.array
+        n = len(bounds)
+        if self.op == ">=":
+            idx = n - np.searchsorted(bounds, values, side="right")
+        elif self.op == "<=":
+            idx = np.searchsorted(bounds, values, side="left")
+        else:
+            idx = np.searchsorted(bounds, values, side="right")
+        idx[np.isnan(values)] = n
+        return idx
+
+
+def rule_for(test_name, values):
+    """Turn one raw table row into a Rule with classify_metric's semantics."""
+    if test_name == "BMI":
+        return Rule.compile((18.5, 25, 30), "<", ("Underweight", "Normal", "Overweight", "Obese"))
+    if test_name == "ToeTouch":
+        return Rule.compile(values[1:4], "<=", ("Excellent", "Good", "Average", "Poor"))
+    if test_name == "Plank":
+        return Rule.compile(
+            (values[7], values[5], values[3], values[1]), ">=",
+            ("Excellent", "Good", "Average", "Below Average", "Poor"),
+        )
+    if test_name in ("OLS_open", "OLS_closed"):
+        return Rule.compile((values[test_name.split("_")[1]],), ">=", ("Good", "Poor"))
+    if test_name == "BodyFat":
+        return Rule.compile(values, "<=", tuple(threshold_order) + (threshold_order[-1],))
+    return Rule.compile(values, ">=", tuple(threshold_order[1:]) + (threshold_order[-1],))
+
+
+# -----------------------------
+# Age bands
+# -----------------------------
+def parse_age_range(age_range):
+    if isinstance(age_range, tuple):
+        return age_range
+    low, high = map(int, age_range.split("-"))
+    return low, high
+
+
+@dataclass(frozen=True)
+class BandTable:
+    lows: tuple
+    highs: tuple
+    rules: tuple
+
+    @classmethod
+    def compile(cls, test_name, bands):
+        rows = sorted(
+            (parse_age_range(age_range) + (rule_for(test_name, values),) for age_range, values in bands.items()),
+            key=lambda row: row[0],
+        )
+        return cls(tuple(r[0] for r in rows), tuple(r[1] for r in rows), tuple(r[2] for r in rows))
+
+    def band(self, age):
+        """Position of the band containing `age`, or None."""
+        i = bisect_right(self.lows, age) - 1
+        if i >= 0 and age <= self.highs[i]:
+            return i
+        return None
+
+    def problems(self):
+        found = []
+        for i, (low, high) in enumerate(zip(self.lows, self.highs)):
+            if low > high:
+                found.append(("error", f"band {low}-{high} is empty"))
+            if i and low <= self.highs[i - 1]:
+                found.append(("error", f"band {low}-{high} overlaps {self.lows[i - 1]}-{self.highs[i - 1]}"))
+            elif i and low > self.highs[i - 1] + 1:
+                found.append(("warning", f"ages {self.highs[i - 1] + 1}-{low - 1} are not covered"))
+        return found
+
+
+# -----------------------------
+# Fingerprint
+# -----------------------------
+def table_fingerprint(test_constants):
+    """
+    SHA-256 of the tables and labels that drive classification. Stored next
+    to every scored result, so results from older tables can be found and
+    rescored.
+    """
+    payload = json.dumps([test_constants, threshold_order], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# -----------------------------
+# Index
+# -----------------------------
+class ThresholdIndex:
+    """
+    Immutable (test, gender, age) -> Rule index.
+
+    Built with `from_tables`, which validates every table and raises
+    ValueError on overlapping or empty age bands; gaps between bands are
+    logged as warnings.
+    """
+
+    def __init__(self, tables, fingerprint="", source=None):
+        self._tables = MappingProxyType(dict(tables))
+        self.fingerprint = fingerprint
+        self.source = source  # the TEST_CONSTANTS-style mapping compiled, if any
+
+    @classmethod
+    def from_tables(cls, test_constants):
+        """Compile a TEST_CONSTANTS-style mapping."""
+        tables = {}
+        for test_name, source in test_constants.items():
+            if test_name == "BMI":
+                tables[(test_name, None)] = BandTable.compile(test_name, {ALL_AGES: None})
+            elif test_name == "ToeTouch":
+                tables[(test_name, None)] = BandTable.compile(test_name, source)
+            elif test_name == "OLS":
+                for condition in ("open", "closed"):
+                    for gender_key, bands in source.items():
+                        tables[(f"OLS_{condition}", gender_key)] = BandTable.compile(f"OLS_{condition}", bands)
+            else:
+                for gender_key, bands in source.items():
+                    if isinstance(bands, list):
+                        bands = {ALL_AGES: bands}
+                    tables[(test_name, gender_key)] = BandTable.compile(test_name, bands)
+
+        index = cls(tables, table_fingerprint(test_constants), test_constants)
+        index.check()
+        return index
+
+    def validate(self):
+        """[(severity, test, gender, message)] for every age-band problem."""
+        return [
+            (severity, test_name, gender_key, message)
+            for (test_name, gender_key), table in self._tables.items()
+            for severity, message in table.problems()
+        ]
+
+    def check(self):
+        errors = []
+        for severity, test_name, gender_key, message in self.validate():
+            text = f"{test_name}/{gender_key or 'any'}: {message}"
+            if severity == "error":
+                errors.append(text)
+            else:
+                logger.warning("Threshold table gap in %s", text)
+        if errors:
+            raise ValueError("Invalid threshold tables: " + "; ".join(errors))
+
+    def keys(self):
+        return self._tables.keys()
+
+    def table(self, test_name, gender_key):
+        return self._tables.get((test_name, gender_key)) or self._tables.get((test_name, None))
+
+    def lookup(self, test_name, gender_key, age):
+        table = self.table(test_name, gender_key)
+        if table is None:
+            return None
+        i = table.band(age)
+        return None if i is None else table.rules[i]
+
+    def classify(self, test_name, gender_key, age, value):
+        rule = self.lookup(test_name, gender_key, age)
+        return None if rule is None else rule.classify(value)
+
+    def classify_column(self, test_name, genders, ages, values):
+        """
+        Vectorized classify: `genders` is an array of capitalized gender keys,
+        `ages` and `values` float arrays. Returns an object array of labels
+        (None where no table or band applies).
+        """
+        import numpy as np
+
+        result = np.full(len(values), None, dtype=object)
+        for (name, gender_key), table in self._tables.items():
+            if name != test_name:
+                continue
+            in_gender = genders == gender_key if gender_key else np.ones(len(values), dtype=bool)
+            for low, high, rule in zip(table.lows, table.highs, table.rules):
+                mask = in_gender & (ages >= low) & (ages <= high)
+                if mask.any():
+                    result[mask] = np.asarray(rule.labels, dtype=object)[rule.index_array(values[mask])]
+        return result
@@ -0,0 +1,149 @@
+# Dj_Fitness_Asmt/timing.py
+"""
+Per-stage timing: in-process histograms plus an optional per-request log.
+
+Wrap a stage of work in `with stage("png_encode"):` (or decorate a function
+with @timed("score")). Every run is added to a Prometheus-style histogram of
+that stage, and, while a request is being collected (collect_stages), also
+to that request's list so it can be sent back as a Server-Timing header.
+
+Histograms live in the process that ran the stage: with several server
+workers each exposes its own; charts rendered in the report pool are not
+counted. A stage costs about a microsecond.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_request_stages = ContextVar("request_stages", default=None)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed seconds."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Registry:
+    """Histograms by (metric name, label value)."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric, label, seconds):
+        with self._lock:
+            histogram = self._histograms.get((metric, label))
+            if histogram is None:
+                histogram = self._histograms[metric, label] = Histogram()
+            histogram.observe(seconds)
+
+    def get(self, metric, label):
+        return self._histograms.get((metric, label))
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self):
+        """Prometheus text exposition (format 0.0.4) of every histogram."""
+        with self._lock:
+            snapshot = sorted(
+                (metric, label, list(h.counts), h.sum, h.count)
+                for (metric, label), h in self._histograms.items()
+            )
+        lines, described = [], set()
+        for metric, label, counts, total, count in snapshot:
+            name, label_name = METRICS[metric]
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# HELP {name} {METRIC_HELP[metric]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket in zip((*map(repr, BUCKETS), "+Inf"), counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label_name}="{label}"}} {total!r}')
+            lines.append(f'{name}_count{{{label_name}="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# metric -> (exposed name, label name)
+METRICS = {
+    "stage": ("fitness_stage_seconds", "stage"),
+    "request": ("fitness_request_seconds", "view"),
+}
+METRIC_HELP = {
+    "stage": "Time spent in each stage of scoring, chart rendering and the views.",
+    "request": "Time to handle a request, by view.",
+}
+
+registry = Registry()
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+def record(name, seconds, metric="stage"):
+    registry.observe(metric, name, seconds)
+    if metric == "stage":
+        stages = _request_stages.get()
+        if stages is not None:
+            stages.append((name, seconds))
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator: time every call of the function as stage `name`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_stages():
+    """Collect the stages run in this context; yields the [(name, seconds)] list."""
+    stages = []
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+def server_timing(stages, total=None):
+    """Server-Timing header value, one entry per stage name with the times summed."""
+    durations = {}
+    for name, seconds in stages:
+        durations[name] = durations.get(name, 0.0) + seconds
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
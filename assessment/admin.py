@@ -1,3 +1,29 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Assessment, Client, NormTableVersion, RampStep
+
+
+class RampStepInline(admin.TabularInline):
+    model = RampStep
+    extra = 0
+
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    list_display = ("id", "first_name", "last_name", "gender", "reference", "created_at")
+    search_fields = ("first_name", "last_name", "reference")
+
+
+@admin.register(Assessment)
+class AssessmentAdmin(admin.ModelAdmin):
+    list_display = ("client", "assessed_at", "gender", "age_band", "norm_version")
+    list_filter = ("gender", "age_band", "norm_version")
+    date_hierarchy = "assessed_at"
+    raw_id_fields = ("client",)
+    inlines = [RampStepInline]
+
+
+@admin.register(NormTableVersion)
+class NormTableVersionAdmin(admin.ModelAdmin):
+    list_display = ("version", "is_active", "created_at", "fingerprint")
+    readonly_fields = ("fingerprint",)
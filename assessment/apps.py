@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AssessmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assessment'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .middleware import install_query_timer
+        connection_created.connect(install_query_timer, dispatch_uid="assessment.time_queries")
+
+        from django.db.models.signals import post_delete
+        from .percentiles import forget_assessment
+        post_delete.connect(forget_assessment, sender=self.get_model('Assessment'),
+                            dispatch_uid="assessment.forget_percentiles")
+
+        if settings.SESSION_ENGINE == 'assessment.sessions':
+            from .sessions import check_write_behind
+            check_write_behind()
+
+        from .reports import check_report_workers
+        check_report_workers()
+
+        alias = getattr(settings, 'PLOT_CACHE_ALIAS', None)
+        if alias:
+            from Dj_Fitness_Asmt.plot_cache import DjangoPlotCache, set_plot_cache
+            set_plot_cache(DjangoPlotCache(alias))
@@ -0,0 +1,164 @@
+# assessment/async_views.py
+# Async versions of the wizard, summary and chart views, served under ASGI
+# (see ASYNC_VIEWS in settings). Session and ORM access use the async APIs,
+# and chart rendering runs in the report pool, never on the event loop.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import redirect
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from .forms import Session1Form, Session2Form, Session4Form
+from .models import Assessment, record_assessment
+from .percentiles import cohort_percentiles
+from .reports import get_report_queue, is_pending
+from .views import (
+    CHART_CONTENT_TYPES, CHART_MAX_AGE, bmi_chart_args, chart_etag, pdf_response, ramp_chart_args,
+    ramp_from_post, render, session4_context, summary_context,
+)
+from .wizard import WizardState
+from Dj_Fitness_Asmt.chart_worker import renderer
+from Dj_Fitness_Asmt.pdf_report import pdf_report
+from Dj_Fitness_Asmt.plot_cache import get_plot_cache, plot_key
+
+
+# ----------------------
+# WIZARD
+# ----------------------
+async def prerender_charts(state, changed):
+    await get_report_queue().aprerender(state.as_client_data(), changed, settings.CHART_FORMAT)
+
+
+async def session1(request):
+    if request.method == "POST":
+        form = Session1Form(request.POST)
+        if form.is_valid():
+            state = await WizardState.aload(request.session)
+            await prerender_charts(state, state.update(1, form.cleaned_data))
+            await state.asave(request.session)
+            return redirect('session2')
+    else:
+        form = Session1Form()
+    return render(request, "assessment/session1.html", {"form": form})
+
+
+async def session2(request):
+    state = await WizardState.aload(request.session)
+    gender = state.get('gender')
+    if request.method == "POST":
+        form = Session2Form(request.POST, gender=gender)
+        if form.is_valid():
+            state.update(2, form.cleaned_data)
+            await state.asave(request.session)
+            return redirect('session3')
+    else:
+        form = Session2Form(gender=gender)
+    return render(request, "assessment/session2.html", {"form": form})
+
+
+async def session3(request):
+    if request.method == 'POST':
+        ramp = ramp_from_post(request.POST)
+        if ramp['ramp_test_rpes']:
+            state = await WizardState.aload(request.session)
+            await prerender_charts(state, state.update(3, ramp))
+            await state.asave(request.session)
+            return redirect('session4')
+
+    return render(request, 'assessment/session3.html')
+
+
+async def session4(request):
+    if request.method == 'POST':
+        form = Session4Form(request.POST)
+        if form.is_valid():
+            state = await WizardState.aload(request.session)
+            if not state.has_steps(1, 2, 3):
+                return redirect('session1')  # earlier steps missing or expired
+            state.update(4, form.cleaned_data)
+            data = state.as_client_data()
+            # Scored step by step already; the atomic insert needs the sync ORM
+            assessment = await sync_to_async(record_assessment)(data, state.report())
+            await get_report_queue().asubmit(assessment, data, settings.CHART_FORMAT)
+            await request.session.aset('assessment_id', assessment.pk)
+            await WizardState.aclear(request.session)
+            return redirect('summary')
+    else:
+        form = Session4Form()
+
+    return render(request, 'assessment/session4.html', session4_context(form))
+
+
+# ----------------------
+# SUMMARY
+# ----------------------
+async def _session_assessment(request):
+    return await (
+        Assessment.objects.select_related('client').prefetch_related('ramp_steps')
+        .filter(pk=await request.session.aget('assessment_id'))
+        .afirst()
+    )
+
+
+async def summary(request):
+    assessment = await _session_assessment(request)
+    if assessment is None:
+        return redirect('session1')
+    if is_pending(assessment):
+        return render(request, 'assessment/report_pending.html', {'client': assessment.client})
+    percentiles = await sync_to_async(cohort_percentiles)(assessment)
+    return render(request, 'assessment/summary.html', summary_context(request, assessment, percentiles))
+
+
+@require_GET
+async def summary_pdf(request):
+    assessment = await _session_assessment(request)
+    if assessment is None:
+        raise Http404("No assessment in this session")
+    # Drawn in a thread: the PDF pages are not plot-cached charts the pool serves
+    pdf = await sync_to_async(pdf_report, thread_sensitive=False)(assessment.report_data())
+    return pdf_response(assessment, pdf)
+
+
+@require_GET
+async def report_status(request):
+    assessment = await Assessment.objects.filter(pk=await request.session.aget('assessment_id')).afirst()
+    if assessment is None:
+        raise Http404("No assessment in this session")
+    return JsonResponse({'status': 'pending' if is_pending(assessment) else 'ready'})
+
+
+# ----------------------
+# CHARTS
+# ----------------------
+def _chart_view(chart, parse_args):
+    @require_GET
+    @cache_control(public=True, max_age=CHART_MAX_AGE, immutable=True)
+    @condition(etag_func=chart_etag(chart, parse_args))
+    async def view(request, fmt):
+        if fmt not in CHART_CONTENT_TYPES:
+            raise Http404("Unknown chart format")
+        try:
+            args = parse_args(request)
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest("Invalid chart parameters")
+
+        key = plot_key(renderer(chart, fmt).kind, *args)
+        cache = get_plot_cache()
+        image = await cache.aget(key) if cache is not None else None
+        if image is None:
+            images = await get_report_queue().arender(fmt, {chart: args})
+            image = images.get(key)
+        if image is None and cache is not None:
+            # Another request finished rendering it meanwhile
+            image = await cache.aget(key)
+        if image is None:
+            # ...and it was evicted again already
+            image = await sync_to_async(renderer(chart, fmt))(*args)
+        return HttpResponse(image, content_type=CHART_CONTENT_TYPES[fmt])
+
+    return view
+
+
+bmi_chart = _chart_view("bmi", bmi_chart_args)
+ramp_chart = _chart_view("ramp", ramp_chart_args)
@@ -1,10 +1,16 @@
 from django import forms
 
+from .models import Client
+
 
 # ----------------------
 # SESSION 1 – Client Info & Basic Vitals
 # ----------------------
 class Session1Form(forms.Form):
+    client_id = forms.IntegerField(
+        label="Existing Client No.", required=False, min_value=1,
+        help_text="Leave blank to register a new client",
+    )
     first_name = forms.CharField(label="First Name", max_length=50)
     last_name = forms.CharField(label="Last Name", max_length=50)
     age = forms.IntegerField(label="Age", min_value=0)
@@ -18,6 +24,12 @@ class Session1Form(forms.Form):
     systolic_bp = forms.IntegerField(label="Systolic BP (mmHg)", min_value=0)
     diastolic_bp = forms.IntegerField(label="Diastolic BP (mmHg)", min_value=0)
 
+    def clean_client_id(self):
+        client_id = self.cleaned_data["client_id"]
+        if client_id is not None and not Client.objects.filter(pk=client_id).exists():
+            raise forms.ValidationError("No client with this number")
+        return client_id
+
 
 # ----------------------
 # SESSION 2 – Body Composition & Anthropometrics
@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+from django.utils.text import slugify
+
+from assessment.models import Assessment
+from Dj_Fitness_Asmt.pdf_report import render_pdfs
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the PDF summary of each client's latest assessment into a directory, "
+        "optionally for one gender and/or age band only. Reports are read in chunks "
+        "and rendered by a pool of worker processes, so memory stays flat; a report "
+        "that takes longer than --timeout seconds is skipped and listed as failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory")
+        parser.add_argument("--gender", choices=["male", "female"])
+        parser.add_argument("--age-band", help='e.g. "30-39"')
+        parser.add_argument(
+            "--workers", type=int, default=max((os.cpu_count() or 1) - 1, 0),
+            help="rendering processes; 0 renders in this process (default: one per CPU beyond the first)",
+        )
+        parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per report")
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        directory.mkdir(parents=True, exist_ok=True)
+
+        latest = Assessment.objects.filter(client=OuterRef("client")).order_by("-assessed_at").values("pk")[:1]
+        cohort = Assessment.objects.filter(pk=Subquery(latest))
+        if options["gender"]:
+            cohort = cohort.filter(gender=options["gender"])
+        if options["age_band"]:
+            cohort = cohort.filter(age_band=options["age_band"])
+        cohort = cohort.select_related("client").prefetch_related("ramp_steps").order_by("pk")
+
+        jobs = (
+            (assessment.report_data(), directory / self.filename(assessment))
+            for assessment in cohort.iterator(chunk_size=500)
+        )
+        written, failed = 0, []
+        for path, error in render_pdfs(jobs, workers=options["workers"], timeout=options["timeout"]):
+            if error is None:
+                written += 1
+                if written % 100 == 0:
+                    self.stdout.write(f"Wrote {written} reports")
+            else:
+                failed.append(path)
+                self.stderr.write(f"{path.name}: {error}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {written} reports written to {directory}"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{len(failed)} reports failed"))
+
+    @staticmethod
+    def filename(assessment):
+        client = assessment.client
+        return f"{slugify(f'{client.last_name} {client.first_name}')}-{client.pk}-{assessment.assessed_at:%Y%m%d}.pdf"
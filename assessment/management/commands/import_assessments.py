@@ -0,0 +1,136 @@
+import math
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from assessment.models import (
+    GENDER_CHOICES, Assessment, Client, RampStep, age_band, progress_entry, record_progress,
+)
+from assessment.norms import refresh_norms
+from Dj_Fitness_Asmt.logics import process_clients_batch, split_batch
+
+
+REQUIRED_COLUMNS = {"first_name", "last_name", "gender", "age", "height_cm", "weight_kg"}
+GENDERS = [value for value, _ in GENDER_CHOICES]
+
+RAMP_STEP_INSERT = "INSERT INTO {table} ({columns}) VALUES (%s, %s, %s, %s)".format(
+    table=RampStep._meta.db_table,
+    columns=", ".join(RampStep._meta.get_field(name).column for name in ("assessment", "step", "load", "rpe")),
+)
+
+
+def _clean(value):
+    """NaN/NaT from pandas -> None, NumPy scalars -> Python."""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def _reference(value):
+    value = _clean(value)
+    return (str(value).strip() or None) if value is not None else None
+
+
+def _split(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return []
+    return [float(x) for x in str(value).split(",") if x.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load historical assessments from a CSV file with one row per assessment. "
+        "Columns use the wizard field names; ramp_test_loads/ramp_test_rpes hold "
+        "comma-separated values and assessed_at is optional. client_ref, the client's "
+        "id in your own records, ties a client's rows together and to clients imported "
+        "before; a row without one registers a new client. Rows are scored in "
+        "vectorized chunks and written with bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        norms = refresh_norms(force=True)
+        total = skipped = 0
+        for chunk in pd.read_csv(options["path"], chunksize=options["chunk_size"], dtype={"client_ref": str}):
+            missing = REQUIRED_COLUMNS - set(chunk.columns)
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+            chunk["gender"] = chunk["gender"].fillna("").astype(str).str.strip().str.lower()
+            invalid = ~chunk["gender"].isin(GENDERS)
+            if invalid.any():
+                lines = ", ".join(str(i + 2) for i in chunk.index[invalid])  # 1-based, after the header
+                self.stderr.write(f"Skipped rows without a valid gender (male/female) on lines {lines}")
+                skipped += int(invalid.sum())
+                chunk = chunk[~invalid]
+            if not chunk.empty:
+                with transaction.atomic():
+                    total += self.import_chunk(chunk, norms)
+            self.stdout.write(f"Imported {total} assessments")
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} assessments"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} rows skipped"))
+
+    def import_chunk(self, chunk, norms):
+        rows = chunk.to_dict("records")
+        client_ids = self.client_ids(rows)
+
+        scores = split_batch(process_clients_batch(chunk, norms.index))
+        assessed_at = (
+            pd.to_datetime(chunk["assessed_at"], utc=True) if "assessed_at" in chunk else None
+        )
+
+        assessments = []
+        for i, (row, result) in enumerate(zip(rows, scores)):
+            assessment = Assessment(
+                client_id=client_ids[i],
+                **{name: _clean(row.get(name)) for name in Assessment.INPUT_FIELDS},
+                **result,
+                thresholds_hash=norms.fingerprint,
+                norm_version=norms.label,
+            )
+            assessment.age_band = age_band(assessment.age)
+            when = _clean(assessed_at.iloc[i]) if assessed_at is not None else None
+            assessment.assessed_at = when.to_pydatetime() if when is not None else timezone.now()
+            assessments.append(assessment)
+        assessments = Assessment.objects.bulk_create(assessments)
+
+        # Ramp steps outnumber assessments ~10:1; a plain executemany skips
+        # building a model instance per step.
+        steps, progress = [], []
+        for assessment, row in zip(assessments, rows):
+            loads, rpes = _split(row.get("ramp_test_loads")), _split(row.get("ramp_test_rpes"))
+            steps.extend(
+                (assessment.pk, n, load, rpe)
+                for n, (load, rpe) in enumerate(zip(loads, rpes), start=1)
+            )
+            data = {name: getattr(assessment, name) for name in Assessment.INPUT_FIELDS}
+            progress.append(progress_entry(assessment, {**data, "ramp_test_loads": loads, "ramp_test_rpes": rpes}))
+        with connection.cursor() as cursor:
+            cursor.executemany(RAMP_STEP_INSERT, steps)
+        record_progress(progress)
+        return len(assessments)
+
+    @staticmethod
+    def client_ids(rows):
+        """Client pk of each row: matched on client_ref, created when new."""
+        refs = [_reference(row.get("client_ref")) for row in rows]
+        new = {}
+        for row, ref in zip(rows, refs):
+            if ref is not None and ref not in new:
+                new[ref] = Client(first_name=row["first_name"], last_name=row["last_name"],
+                                  gender=row["gender"], reference=ref)
+        # Existing references, including ones a concurrent import just added, are kept
+        Client.objects.bulk_create(new.values(), ignore_conflicts=True)
+        by_ref = dict(Client.objects.filter(reference__in=list(new)).values_list("reference", "pk"))
+
+        unreferenced = Client.objects.bulk_create(
+            Client(first_name=row["first_name"], last_name=row["last_name"], gender=row["gender"])
+            for row, ref in zip(rows, refs) if ref is None
+        )
+        unreferenced = iter(client.pk for client in unreferenced)
+        return [by_ref[ref] if ref is not None else next(unreferenced) for ref in refs]
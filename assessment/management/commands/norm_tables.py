@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.models import NormTableVersion
+from Dj_Fitness_Asmt.constants import TEST_CONSTANTS
+from Dj_Fitness_Asmt.norm_registry import BUILTIN, dump_norm_file, load_norm_file, registry, restore_tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage the norm table versions kept in the database (NORM_TABLES = \"db\"): "
+        "list them, load a JSON/YAML norm file as a new version, activate one, or "
+        "export a version (or the built-in tables) as a norm file to edit. Server "
+        "processes pick up an activated version within NORM_RELOAD_INTERVAL seconds; "
+        "run recompute_assessments to rescore stored results with it."
+    )
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest="action", required=True)
+        actions.add_parser("list", help="list the stored versions")
+        load = actions.add_parser("load", help="store a norm file as a new version")
+        load.add_argument("path")
+        load.add_argument("--version", help="label to store it under (default: the file's)")
+        load.add_argument("--activate", action="store_true")
+        activate = actions.add_parser("activate", help="put a stored version in use")
+        activate.add_argument("version")
+        export = actions.add_parser("export", help="write a version as a JSON norm file")
+        export.add_argument("path")
+        export.add_argument("--version", default=BUILTIN)
+
+    def handle(self, *args, **options):
+        getattr(self, f"{options['action']}_version")(options)
+
+    def list_version(self, options):
+        for row in NormTableVersion.objects.all():
+            active = "*" if row.is_active else " "
+            self.stdout.write(f"{active} {row.version:<20} {row.created_at:%Y-%m-%d %H:%M}  {row.fingerprint[:16]}")
+
+    def load_version(self, options):
+        try:
+            label, tables = load_norm_file(options["path"])
+            label = options["version"] or label
+            registry.compile(label, tables)  # validate before storing
+        except (OSError, ValueError, ImportError) as exc:
+            raise CommandError(str(exc))
+        if label == BUILTIN or NormTableVersion.objects.filter(version=label).exists():
+            raise CommandError(f"Version {label!r} exists already; pass another --version")
+        row = NormTableVersion.objects.create(version=label, tables=tables)
+        if options["activate"]:
+            row.activate()
+        self.stdout.write(self.style.SUCCESS(f"Stored {label}{' (active)' if row.is_active else ''}"))
+
+    def activate_version(self, options):
+        row = NormTableVersion.objects.filter(version=options["version"]).first()
+        if row is None:
+            raise CommandError(f"No version {options['version']!r}")
+        row.activate()
+        self.stdout.write(self.style.SUCCESS(f"Activated {row.version}"))
+
+    def export_version(self, options):
+        if options["version"] == BUILTIN:
+            tables = TEST_CONSTANTS
+        else:
+            row = NormTableVersion.objects.filter(version=options["version"]).first()
+            if row is None:
+                raise CommandError(f"No version {options['version']!r}")
+            tables = restore_tables(row.tables)
+        dump_norm_file(options["path"], options["version"], tables)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['version']} to {options['path']}"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from assessment.models import Assessment
+from assessment.norms import refresh_norms
+from Dj_Fitness_Asmt.logics import process_clients_batch, split_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Rescore stored assessments whose results were computed with other "
+        "norm tables than the ones in use (see NORM_TABLES)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--all", action="store_true", help="rescore every assessment, stale or not")
+
+    def handle(self, *args, **options):
+        norms = refresh_norms(force=True)
+        current = norms.fingerprint
+        stale = Assessment.objects.all() if options["all"] else Assessment.objects.exclude(thresholds_hash=current)
+        stale = stale.order_by("pk")
+        fields = ("pk",) + Assessment.INPUT_FIELDS
+
+        total, last_pk = 0, 0
+        while True:
+            rows = list(stale.filter(pk__gt=last_pk).values(*fields)[:options["batch_size"]])
+            if not rows:
+                break
+            columns = {name: [row[name] for row in rows] for name in fields}
+            updated = [
+                Assessment(pk=row["pk"], thresholds_hash=current, norm_version=norms.label, **result)
+                for row, result in zip(rows, split_batch(process_clients_batch(columns, norms.index)))
+            ]
+            with transaction.atomic():
+                Assessment.objects.bulk_update(updated, ["calculations", "classifications", "thresholds_hash", "norm_version"])
+            total += len(updated)
+            last_pk = rows[-1]["pk"]
+            self.stdout.write(f"Rescored {total} assessments")
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} assessments rescored"))
@@ -0,0 +1,44 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.norms import refresh_norms
+from Dj_Fitness_Asmt.cohort import DEFAULT_KEEP, score_file
+
+
+class Command(BaseCommand):
+    help = (
+        "Score a CSV or Parquet file of raw assessments into a new CSV/Parquet file "
+        "(format from the extension; .gz/.bz2/.xz CSV is fine, Parquet needs pyarrow). "
+        "Input columns use the wizard field names. Rows stream through in chunks, so "
+        "memory does not grow with the file; nothing is stored in the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input")
+        parser.add_argument("output")
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        parser.add_argument(
+            "--workers", type=int, default=max((os.cpu_count() or 1) - 1, 0),
+            help="scoring processes; 0 scores in this process (default: one per CPU beyond the first)",
+        )
+        parser.add_argument(
+            "--keep", default=",".join(DEFAULT_KEEP),
+            help="input columns copied to the output, comma-separated (default: %(default)s)",
+        )
+
+    def handle(self, *args, **options):
+        keep = tuple(name for name in options["keep"].split(",") if name)
+        norms = refresh_norms(force=True)
+        total = 0
+        try:
+            for total in score_file(
+                options["input"], options["output"],
+                chunk_size=options["chunk_size"], workers=options["workers"], keep=keep, tables=norms.tables,
+            ):
+                self.stdout.write(f"Scored {total} rows")
+        except (ImportError, ValueError, FileNotFoundError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {total} rows written to {options['output']} (norm tables {norms.label})"
+        ))
@@ -0,0 +1,83 @@
+# assessment/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from Dj_Fitness_Asmt.timing import collect_stages, record, server_timing, stage
+
+from .norms import refresh_due, refresh_norms
+
+
+class TimingMiddleware:
+    """
+    Time each request into the per-view histogram and collect the stages it
+    ran (session load, scoring, figure, PNG encode, base64, template, db).
+    With SERVER_TIMING on, the breakdown is sent back as a Server-Timing
+    header for the browser's network panel.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with collect_stages() as stages:
+            start = time.perf_counter()
+            response = self.get_response(request)
+            return self.finish(request, response, stages, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        with collect_stages() as stages:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+            return self.finish(request, response, stages, time.perf_counter() - start)
+
+    def finish(self, request, response, stages, elapsed):
+        match = request.resolver_match
+        record(match.url_name if match and match.url_name else "unmatched", elapsed, metric="request")
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = server_timing(stages, elapsed)
+        return response
+
+
+class NormReloadMiddleware:
+    """Follow NORM_TABLES: pick up edited or newly activated norm tables (see assessment.norms)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if refresh_due():
+            refresh_norms()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if refresh_due():
+            await sync_to_async(refresh_norms)()
+        return await self.get_response(request)
+
+
+def time_queries(execute, sql, params, many, context):
+    """Connection execute wrapper timing every query as the "db" stage."""
+    with stage("db"):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver: time the queries of every new connection."""
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
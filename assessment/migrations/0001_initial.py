@@ -0,0 +1,100 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Client',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=50)),
+                ('last_name', models.CharField(max_length=50)),
+                ('gender', models.CharField(choices=[('male', 'Male'), ('female', 'Female')], max_length=6)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_name', 'first_name'], name='assessment__last_na_9a708c_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Assessment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assessed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('age', models.PositiveSmallIntegerField()),
+                ('gender', models.CharField(choices=[('male', 'Male'), ('female', 'Female')], max_length=6)),
+                ('age_band', models.CharField(editable=False, max_length=7)),
+                ('height_cm', models.FloatField()),
+                ('weight_kg', models.FloatField()),
+                ('resting_hr', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('systolic_bp', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('diastolic_bp', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('chest', models.FloatField(blank=True, null=True)),
+                ('abdomen', models.FloatField(blank=True, null=True)),
+                ('thigh', models.FloatField(blank=True, null=True)),
+                ('triceps', models.FloatField(blank=True, null=True)),
+                ('suprailiac', models.FloatField(blank=True, null=True)),
+                ('arms_rigth_cm', models.FloatField()),
+                ('arms_left_cm', models.FloatField()),
+                ('chest_cm', models.FloatField()),
+                ('waist_cm', models.FloatField()),
+                ('hip_cm', models.FloatField()),
+                ('thigh_rigth_cm', models.FloatField()),
+                ('thigh_left_cm', models.FloatField()),
+                ('vertical_jump_height_cm', models.FloatField()),
+                ('pushup_count', models.PositiveIntegerField()),
+                ('squat_count', models.PositiveIntegerField()),
+                ('plank_hold_seconds', models.PositiveIntegerField()),
+                ('one_leg_stance_right_eyes_open_sec', models.FloatField()),
+                ('one_leg_stance_left_eyes_open_sec', models.FloatField()),
+                ('one_leg_stance_right_eyes_closed_sec', models.FloatField()),
+                ('one_leg_stance_left_eyes_closed_sec', models.FloatField()),
+                ('toe_touch_cm', models.FloatField()),
+                ('calculations', models.JSONField(default=dict)),
+                ('classifications', models.JSONField(default=dict)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessments', to='assessment.client')),
+            ],
+            options={
+                'ordering': ['-assessed_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RampStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.PositiveSmallIntegerField()),
+                ('load', models.FloatField()),
+                ('rpe', models.FloatField()),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ramp_steps', to='assessment.assessment')),
+            ],
+            options={
+                'ordering': ['assessment', 'step'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['client', '-assessed_at'], name='assessment__client__975530_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['assessed_at'], name='assessment__assesse_0fe2df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['gender', 'age_band'], name='assessment__gender_a71789_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='rampstep',
+            constraint=models.UniqueConstraint(fields=('assessment', 'step'), name='unique_ramp_step'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='thresholds_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0002_assessment_thresholds_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='report_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=7),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:37
+
+import Dj_Fitness_Asmt.progress
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    """Build the progress series of every client from their stored assessments."""
+    from Dj_Fitness_Asmt.progress import empty_series, insert_point, progress_point
+
+    Assessment = apps.get_model('assessment', 'Assessment')
+    RampStep = apps.get_model('assessment', 'RampStep')
+    ClientProgress = apps.get_model('assessment', 'ClientProgress')
+
+    steps = {}
+    for assessment_id, load, rpe in RampStep.objects.order_by('assessment', 'step').values_list(
+        'assessment', 'load', 'rpe',
+    ).iterator():
+        loads, rpes = steps.setdefault(assessment_id, ([], []))
+        loads.append(load)
+        rpes.append(rpe)
+
+    series = {}
+    for assessment in Assessment.objects.order_by('assessed_at').iterator():
+        loads, rpes = steps.get(assessment.pk, ([], []))
+        data = {
+            'pushup_count': assessment.pushup_count,
+            'squat_count': assessment.squat_count,
+            'plank_hold_seconds': assessment.plank_hold_seconds,
+            'toe_touch_cm': assessment.toe_touch_cm,
+            'one_leg_stance_right_eyes_open_sec': assessment.one_leg_stance_right_eyes_open_sec,
+            'one_leg_stance_left_eyes_open_sec': assessment.one_leg_stance_left_eyes_open_sec,
+            'one_leg_stance_right_eyes_closed_sec': assessment.one_leg_stance_right_eyes_closed_sec,
+            'one_leg_stance_left_eyes_closed_sec': assessment.one_leg_stance_left_eyes_closed_sec,
+            'ramp_test_loads': loads,
+            'ramp_test_rpes': rpes,
+        }
+        insert_point(
+            series.setdefault(assessment.client_id, empty_series()),
+            int(assessment.assessed_at.timestamp()), assessment.pk,
+            progress_point(data, assessment.calculations),
+        )
+    ClientProgress.objects.bulk_create(
+        [ClientProgress(client_id=client_id, series=s) for client_id, s in series.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0003_assessment_report_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientProgress',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='assessment.client')),
+                ('series', models.JSONField(default=Dj_Fitness_Asmt.progress.empty_series)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def label_builtin(apps, schema_editor):
+    """Results scored with the built-in tables so far get their label."""
+    from Dj_Fitness_Asmt.constants import TEST_CONSTANTS
+    from Dj_Fitness_Asmt.thresholds import table_fingerprint
+
+    Assessment = apps.get_model('assessment', 'Assessment')
+    Assessment.objects.filter(thresholds_hash=table_fingerprint(TEST_CONSTANTS)).update(norm_version='builtin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0004_client_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='norm_version',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='NormTableVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=40, unique=True)),
+                ('tables', models.JSONField()),
+                ('fingerprint', models.CharField(editable=False, max_length=64)),
+                ('is_active', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='one_active_norm_version')],
+            },
+        ),
+        migrations.RunPython(label_builtin, migrations.RunPython.noop),
+    ]
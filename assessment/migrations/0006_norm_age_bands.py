@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def rebuild_age_bands(apps, schema_editor):
+    """Decade bands ("10-19", "80-89") -> the norm tables' bands ("15-19", "80+")."""
+    from assessment.models import age_band
+
+    Assessment = apps.get_model('assessment', 'Assessment')
+    for age in Assessment.objects.order_by().values_list('age', flat=True).distinct():
+        Assessment.objects.filter(age=age).update(age_band=age_band(age))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0005_norm_table_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_age_bands, migrations.RunPython.noop),
+    ]
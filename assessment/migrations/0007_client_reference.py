@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0006_norm_age_bands'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='reference',
+            field=models.CharField(blank=True, help_text="The client's id in the gym's own records; import_assessments matches rows on it.", max_length=50, null=True, unique=True),
+        ),
+    ]
@@ -1,3 +1,335 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 
-# Create your models here.
+from Dj_Fitness_Asmt.constants import AGE_BANDS
+from Dj_Fitness_Asmt.logics import score_client
+from Dj_Fitness_Asmt.norm_registry import portable_tables, registry as norm_registry, restore_tables
+from Dj_Fitness_Asmt.pdf_report import report_data
+from Dj_Fitness_Asmt.progress import empty_series, insert_point, progress_point, remove_point
+from Dj_Fitness_Asmt.thresholds import table_fingerprint
+from Dj_Fitness_Asmt.timing import stage
+
+
+GENDER_CHOICES = [("male", "Male"), ("female", "Female")]
+REPORT_PENDING, REPORT_READY, REPORT_FAILED = "pending", "ready", "failed"
+REPORT_STATUS_CHOICES = [(REPORT_PENDING, "Pending"), (REPORT_READY, "Ready"), (REPORT_FAILED, "Failed")]
+
+
+def age_band(age):
+    """
+    The norm tables' age band of `age`, e.g. 17 -> "15-19", 34 -> "30-39";
+    "0-14" and "80+" below and above the bands the tables cover.
+    """
+    age = int(age)
+    for low, high in AGE_BANDS:
+        if low <= age <= high:
+            return f"{low}-{high}"
+    if age < AGE_BANDS[0][0]:
+        return f"0-{AGE_BANDS[0][0] - 1}"
+    return f"{AGE_BANDS[-1][1] + 1}+"
+
+
+# ----------------------
+# CLIENT
+# ----------------------
+class Client(models.Model):
+    """
+    A person assessed. Names are not unique, so clients are never matched by
+    name: the wizard picks an existing client by id or registers a new one,
+    and imports match on `reference`.
+    """
+    first_name = models.CharField(max_length=50)
+    last_name = models.CharField(max_length=50)
+    gender = models.CharField(max_length=6, choices=GENDER_CHOICES)
+    reference = models.CharField(
+        max_length=50, unique=True, null=True, blank=True,
+        help_text="The client's id in the gym's own records; import_assessments matches rows on it.",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["last_name", "first_name"])]
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+# ----------------------
+# ASSESSMENT
+# ----------------------
+class Assessment(models.Model):
+    """
+    One completed wizard run: the raw inputs of sessions 1, 2 and 4 (field
+    names match the forms), the ramp steps of session 3 in RampStep, and the
+    scored calculations/classifications as produced by score_client.
+    """
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="assessments")
+    assessed_at = models.DateTimeField(default=timezone.now)
+
+    # Session 1 – Client Info & Basic Vitals
+    age = models.PositiveSmallIntegerField()
+    gender = models.CharField(max_length=6, choices=GENDER_CHOICES)
+    age_band = models.CharField(max_length=7, editable=False)
+    height_cm = models.FloatField()
+    weight_kg = models.FloatField()
+    resting_hr = models.PositiveSmallIntegerField(null=True, blank=True)
+    systolic_bp = models.PositiveSmallIntegerField(null=True, blank=True)
+    diastolic_bp = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    # Session 2 – Skinfolds (mm) & Anthropometrics (cm)
+    chest = models.FloatField(null=True, blank=True)
+    abdomen = models.FloatField(null=True, blank=True)
+    thigh = models.FloatField(null=True, blank=True)
+    triceps = models.FloatField(null=True, blank=True)
+    suprailiac = models.FloatField(null=True, blank=True)
+    arms_rigth_cm = models.FloatField()
+    arms_left_cm = models.FloatField()
+    chest_cm = models.FloatField()
+    waist_cm = models.FloatField()
+    hip_cm = models.FloatField()
+    thigh_rigth_cm = models.FloatField()
+    thigh_left_cm = models.FloatField()
+
+    # Session 4 – Power, Strength, Balance, Flexibility
+    vertical_jump_height_cm = models.FloatField()
+    pushup_count = models.PositiveIntegerField()
+    squat_count = models.PositiveIntegerField()
+    plank_hold_seconds = models.PositiveIntegerField()
+    one_leg_stance_right_eyes_open_sec = models.FloatField()
+    one_leg_stance_left_eyes_open_sec = models.FloatField()
+    one_leg_stance_right_eyes_closed_sec = models.FloatField()
+    one_leg_stance_left_eyes_closed_sec = models.FloatField()
+    toe_touch_cm = models.FloatField()
+
+    # Results, materialized when the assessment is stored
+    calculations = models.JSONField(default=dict)
+    classifications = models.JSONField(default=dict)
+    thresholds_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    norm_version = models.CharField(max_length=40, blank=True)  # label of the tables behind thresholds_hash
+    # Chart pre-rendering after the wizard; blank for imported assessments
+    report_status = models.CharField(max_length=7, choices=REPORT_STATUS_CHOICES, blank=True)
+
+    class Meta:
+        ordering = ["-assessed_at"]
+        indexes = [
+            models.Index(fields=["client", "-assessed_at"]),
+            models.Index(fields=["assessed_at"]),
+            models.Index(fields=["gender", "age_band"]),
+        ]
+
+    INPUT_FIELDS = (
+        "age", "gender", "height_cm", "weight_kg", "resting_hr", "systolic_bp", "diastolic_bp",
+        "chest", "abdomen", "thigh", "triceps", "suprailiac",
+        "arms_rigth_cm", "arms_left_cm", "chest_cm", "waist_cm", "hip_cm", "thigh_rigth_cm", "thigh_left_cm",
+        "vertical_jump_height_cm", "pushup_count", "squat_count", "plank_hold_seconds",
+        "one_leg_stance_right_eyes_open_sec", "one_leg_stance_left_eyes_open_sec",
+        "one_leg_stance_right_eyes_closed_sec", "one_leg_stance_left_eyes_closed_sec",
+        "toe_touch_cm",
+    )
+
+    def __str__(self):
+        return f"{self.client} – {self.assessed_at:%Y-%m-%d}"
+
+    def save(self, *args, **kwargs):
+        self.age_band = age_band(self.age)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_client_data(cls, client, data):
+        """Unsaved Assessment (with age band set) from a merged wizard/session dict."""
+        assessment = cls(client=client, **{name: data.get(name) for name in cls.INPUT_FIELDS})
+        assessment.age_band = age_band(assessment.age)
+        return assessment
+
+    def ramp_steps_from(self, data):
+        """Unsaved RampStep rows from the ramp_test_loads/ramp_test_rpes lists."""
+        return [
+            RampStep(assessment=self, step=i, load=load, rpe=rpe)
+            for i, (load, rpe) in enumerate(zip(data["ramp_test_loads"], data["ramp_test_rpes"]), start=1)
+        ]
+
+    def to_client_data(self):
+        """The merged dict process_client_data/score_client expect."""
+        steps = list(self.ramp_steps.all())
+        return {
+            "client_id": self.client_id,
+            "first_name": self.client.first_name,
+            "last_name": self.client.last_name,
+            **{name: getattr(self, name) for name in self.INPUT_FIELDS},
+            "ramp_test_loads": [s.load for s in steps],
+            "ramp_test_rpes": [s.rpe for s in steps],
+        }
+
+    def score(self, data=None, report=None):
+        """Store the scores; `report` is a score_client result computed already."""
+        norms = norm_registry.current
+        if report is None:
+            with stage("score"):
+                report = score_client(data or self.to_client_data(), norms.index)
+        self.calculations = report["calculations"]
+        self.classifications = report["classifications"]
+        self.thresholds_hash = norms.fingerprint
+        self.norm_version = norms.label
+        return report
+
+    def report_data(self, data=None):
+        """The plain dict Dj_Fitness_Asmt.pdf_report draws."""
+        return report_data(
+            str(self.client), f"{self.assessed_at:%Y-%m-%d}", data or self.to_client_data(),
+            self.calculations, self.classifications, self.circumferences,
+        )
+
+    @property
+    def circumferences(self):
+        return {
+            "chest_cm": self.chest_cm,
+            "waist_cm": self.waist_cm,
+            "hip_cm": self.hip_cm,
+            "arm_left_cm": self.arms_left_cm,
+            "arm_right_cm": self.arms_rigth_cm,
+            "thigh_left_cm": self.thigh_left_cm,
+            "thigh_right_cm": self.thigh_rigth_cm,
+        }
+
+
+# ----------------------
+# RAMP TEST
+# ----------------------
+class RampStep(models.Model):
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name="ramp_steps")
+    step = models.PositiveSmallIntegerField()
+    load = models.FloatField()
+    rpe = models.FloatField()
+
+    class Meta:
+        ordering = ["assessment", "step"]
+        constraints = [
+            models.UniqueConstraint(fields=["assessment", "step"], name="unique_ramp_step"),
+        ]
+
+
+# ----------------------
+# NORM TABLES
+# ----------------------
+class NormTableVersion(models.Model):
+    """
+    One version of the norm tables, TEST_CONSTANTS-shaped. With NORM_TABLES =
+    "db" the active one is in use, and every server process picks up a newly
+    activated version within NORM_RELOAD_INTERVAL seconds.
+    """
+    version = models.CharField(max_length=40, unique=True)
+    tables = models.JSONField()
+    fingerprint = models.CharField(max_length=64, editable=False)
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["is_active"], condition=models.Q(is_active=True), name="one_active_norm_version",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.version}{' (active)' if self.is_active else ''}"
+
+    def clean(self):
+        try:
+            norm_registry.compile(self.version, self.tables)
+        except ValueError as exc:
+            raise ValidationError({"tables": str(exc)})
+
+    def save(self, *args, **kwargs):
+        # JSON columns reject Infinity, which open-ended bounds use
+        self.tables = portable_tables(self.tables)
+        self.fingerprint = table_fingerprint(restore_tables(self.tables))
+        super().save(*args, **kwargs)
+
+    def activate(self):
+        with transaction.atomic():
+            NormTableVersion.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+            self.is_active = True
+            self.save(update_fields=["is_active", "fingerprint"])
+
+
+# ----------------------
+# PROGRESS
+# ----------------------
+class ClientProgress(models.Model):
+    """
+    A client's test history as one columnar series (see
+    Dj_Fitness_Asmt.progress), kept in step with their assessments so
+    dashboards read one row per client instead of the history.
+    """
+    client = models.OneToOneField(Client, on_delete=models.CASCADE, primary_key=True, related_name="progress")
+    series = models.JSONField(default=empty_series)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Progress of {self.client_id} ({len(self.series['t'])} tests)"
+
+
+def progress_entry(assessment, data):
+    """(client id, time, assessment id, point) of a saved assessment and its inputs."""
+    return (
+        assessment.client_id, int(assessment.assessed_at.timestamp()), assessment.pk,
+        progress_point(data, assessment.calculations),
+    )
+
+
+def record_progress(entries):
+    """Insert progress_entry tuples into their clients' series, one query per kind."""
+    by_client = {}
+    for client_id, *point in entries:
+        by_client.setdefault(client_id, []).append(point)
+    with transaction.atomic():
+        # Rows are created empty first, so every series is updated under a row
+        # lock and concurrent assessments of a client can't drop each other's points
+        ClientProgress.objects.bulk_create(
+            [ClientProgress(client_id=client_id) for client_id in by_client], ignore_conflicts=True,
+        )
+        rows = ClientProgress.objects.select_for_update().in_bulk(list(by_client))
+        for client_id, points in by_client.items():
+            for timestamp, assessment_id, point in points:
+                insert_point(rows[client_id].series, timestamp, assessment_id, point)
+        now = timezone.now()  # bulk_update skips auto_now
+        for progress in rows.values():
+            progress.updated_at = now
+        ClientProgress.objects.bulk_update(rows.values(), ["series", "updated_at"])
+
+
+@receiver(post_delete, sender=Assessment)
+def _forget_progress(sender, instance, **kwargs):
+    with transaction.atomic():
+        progress = ClientProgress.objects.select_for_update().filter(client_id=instance.client_id).first()
+        if progress is not None:
+            remove_point(progress.series, instance.pk)
+            progress.save(update_fields=["series", "updated_at"])
+
+
+# ----------------------
+# RECORDING
+# ----------------------
+def client_for(data):
+    """The client chosen in the wizard (`client_id`), or a newly registered one."""
+    if data.get("client_id"):
+        return Client.objects.get(pk=data["client_id"])
+    return Client.objects.create(first_name=data["first_name"], last_name=data["last_name"], gender=data["gender"])
+
+
+def record_assessment(data, report=None):
+    """
+    Score and store one merged wizard dict; returns the saved Assessment.
+    Pass the wizard's incrementally computed `report` to skip scoring.
+    """
+    with transaction.atomic():
+        assessment = Assessment.from_client_data(client_for(data), data)
+        assessment.score(data, report)
+        assessment.save()
+        RampStep.objects.bulk_create(assessment.ramp_steps_from(data))
+        record_progress([progress_entry(assessment, data)])
+    return assessment
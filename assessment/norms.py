@@ -0,0 +1,71 @@
+"""
+Which norm tables this process scores with.
+
+settings.NORM_TABLES names the source:
+
+- None: the built-in tables in Dj_Fitness_Asmt.constants;
+- "db": the active NormTableVersion row;
+- a path to a JSON/YAML norm file (see Dj_Fitness_Asmt.norm_registry).
+
+refresh_norms() brings the process's registry in line with that source. The
+NormReloadMiddleware calls it before requests, at most once every
+NORM_RELOAD_INTERVAL seconds, so editing the file or activating another
+version reaches every worker without a restart; management commands call
+it once with force=True. A source that fails to load is logged and the
+tables in use stay.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from Dj_Fitness_Asmt.norm_registry import registry
+
+from .models import NormTableVersion
+
+logger = logging.getLogger(__name__)
+
+_checked_at = None
+_check_lock = threading.Lock()
+
+
+def refresh_due():
+    interval = getattr(settings, "NORM_RELOAD_INTERVAL", 30)
+    return _checked_at is None or time.monotonic() - _checked_at >= interval
+
+
+def refresh_norms(force=False):
+    """Load the configured norm tables if they changed; returns the NormSet in use."""
+    global _checked_at
+    if not force and not refresh_due():
+        return registry.current
+    if not _check_lock.acquire(blocking=force):
+        return registry.current  # another thread is checking
+    try:
+        _checked_at = time.monotonic()
+        source = getattr(settings, "NORM_TABLES", None)
+        try:
+            if source is None:
+                registry.reset()
+            elif source == "db":
+                _refresh_from_db()
+            else:
+                registry.refresh_file(source)
+        except (OSError, ValueError, ImportError):
+            if force:
+                raise
+            logger.exception("Could not load the norm tables from %s; still using %s", source, registry.current.label)
+    finally:
+        _check_lock.release()
+    return registry.current
+
+
+def _refresh_from_db():
+    active = NormTableVersion.objects.filter(is_active=True).values_list("version", "fingerprint").first()
+    if active is None:
+        registry.reset()
+    elif active != (registry.current.label, registry.current.fingerprint):
+        row = NormTableVersion.objects.get(version=active[0])
+        registry.load(row.version, row.tables, source="db")
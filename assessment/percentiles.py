@@ -0,0 +1,99 @@
+"""
+Cohort percentiles of stored assessments.
+
+The process keeps one PercentileIndex. Building it scans the assessment
+table, so that happens in a background thread started when the server loads
+(fitness_project.wsgi/asgi call start_percentile_index; with gunicorn's
+--preload call it from a post_fork hook instead), never inside a request;
+until it is ready, summaries show no percentiles. Each lookup then
+only adds the assessments stored since (by id, so rows saved by other server
+processes or the CSV importer are picked up too), and deletions in this
+process are removed by a post_delete receiver. Rescored assessments keep
+their values: calculations do not depend on the threshold tables.
+"""
+
+import logging
+import os
+import threading
+
+from Dj_Fitness_Asmt.percentiles import PercentileIndex, percentile_point
+
+from .models import Assessment
+
+_FIELDS = ("pk", "gender", "age_band", "calculations", *Assessment.INPUT_FIELDS)
+
+logger = logging.getLogger(__name__)
+
+_index = None
+_index_lock = threading.Lock()
+_builder_pid = None  # process whose background build is running or done; threads don't survive fork
+
+
+def _points(rows):
+    for row in rows:
+        yield row["pk"], row["gender"], row["age_band"], percentile_point(row, row["calculations"])
+
+
+def build_percentile_index():
+    """Build the process-wide index from the whole assessment table."""
+    global _index
+    with _index_lock:
+        _index = PercentileIndex.from_points(_points(Assessment.objects.values(*_FIELDS).iterator()))
+        return _index
+
+
+def _build_in_background():
+    from django.db import connection
+
+    try:
+        build_percentile_index()
+    except Exception:
+        logger.exception("Building the percentile index failed")
+    finally:
+        connection.close()
+
+
+def start_percentile_index():
+    """Start building the index in a background thread, once per process."""
+    global _builder_pid
+    with _index_lock:
+        if _index is not None or _builder_pid == os.getpid():
+            return
+        _builder_pid = os.getpid()  # a forked worker starts its own
+    threading.Thread(target=_build_in_background, name="percentile-index", daemon=True).start()
+
+
+def get_percentile_index():
+    """The process-wide index caught up with the assessments stored so far; None while it is built."""
+    if _index is None:
+        return None
+    with _index_lock:
+        for point in _points(Assessment.objects.filter(pk__gt=_index.last_id).values(*_FIELDS)):
+            _index.add(*point)
+        return _index
+
+
+def reset_percentile_index():
+    global _index, _builder_pid
+    with _index_lock:
+        _index = _builder_pid = None
+
+
+def assessment_point(assessment):
+    data = {name: getattr(assessment, name) for name in Assessment.INPUT_FIELDS}
+    return percentile_point(data, assessment.calculations)
+
+
+def cohort_percentiles(assessment):
+    """{metric: percentile} of an assessment among those of the same gender and age band; {} while the index is built."""
+    index = get_percentile_index()
+    if index is None:
+        return {}
+    return index.percentiles(assessment.gender, assessment.age_band, assessment_point(assessment))
+
+
+def forget_assessment(sender, instance, **kwargs):
+    """post_delete receiver: drop a deleted assessment from the index."""
+    with _index_lock:  # a build under way includes the row or not, never half
+        if _index is not None and instance.pk is not None and instance.pk <= _index.last_id:
+            _index.remove(instance.gender, instance.age_band, assessment_point(instance))
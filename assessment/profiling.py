@@ -0,0 +1,153 @@
+"""
+Opt-in profiling of slow requests.
+
+ProfilingMiddleware picks PROFILE_SAMPLE_RATE of the requests to the views
+in PROFILE_VIEWS and runs them under cProfile plus a stack sampler. When a
+picked request takes PROFILE_THRESHOLD_MS or longer, two files are written
+to PROFILE_DIR:
+
+- <name>.prof, cProfile stats (python -m pstats, snakeviz);
+- <name>.folded, sampled stacks in the collapsed format read by
+  flamegraph.pl, speedscope and inferno.
+
+A warning naming the files goes to the "assessment.profiling" logger. With
+PROFILE_SAMPLE_RATE = 0 (the default) the middleware removes itself from the
+stack at startup, so requests pay nothing.
+
+Async views run on the event loop among other requests, so for them only the
+sampler runs, over every thread, and there is no .prof file.
+"""
+
+import cProfile
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of some threads (all but itself when
+    `thread_ids` is None) every `interval` seconds from a daemon thread.
+    """
+
+    def __init__(self, thread_ids=None, interval=0.005):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if self.thread_ids is None:
+                    stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        """Collapsed stacks, one "frame;frame;frame count" line each."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+        if self.rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = set(settings.PROFILE_VIEWS)
+        self.threshold = settings.PROFILE_THRESHOLD_MS / 1000
+        self.directory = Path(settings.PROFILE_DIR)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def picked(self, request):
+        """URL name of the request's view if this request is to be profiled."""
+        if random.random() >= self.rate:
+            return None
+        try:
+            name = resolve(request.path_info).url_name
+        except Resolver404:
+            return None
+        return name if name in self.views else None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        view = self.picked(request)
+        if view is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        with StackSampler({threading.get_ident()}) as sampler:
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - start
+        if elapsed >= self.threshold:
+            self.save(request, view, elapsed, sampler, profiler)
+        return response
+
+    async def __acall__(self, request):
+        view = self.picked(request)
+        if view is None:
+            return await self.get_response(request)
+
+        with StackSampler() as sampler:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+        elapsed = time.perf_counter() - start
+        if elapsed >= self.threshold:
+            self.save(request, view, elapsed, sampler)
+        return response
+
+    def save(self, request, view, elapsed, sampler, profiler=None):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{view}-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:6]}"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / f"{name}.folded").write_text(sampler.folded())
+            if profiler is not None:
+                profiler.dump_stats(self.directory / f"{name}.prof")
+        except OSError:
+            logger.exception("Could not write the profile of %s %s", request.method, request.path)
+            return
+        logger.warning(
+            "%s %s took %.0f ms; profile saved as %s", request.method, request.path, elapsed * 1000,
+            self.directory / name,
+        )
@@ -0,0 +1,247 @@
+"""
+Background rendering of report charts.
+
+Each chart is handed to a process pool as soon as the wizard step holding
+its inputs is posted (BMI after step 1, ramp after step 3), so matplotlib
+never runs in a request thread. The pool workers import matplotlib and build
+the BMI background once, when they start. The rendered images go into the
+plot cache under the keys the chart endpoints use. When step 4 is submitted
+Assessment.report_status becomes the job record the summary page polls,
+covering whatever charts are still being drawn.
+
+REPORT_WORKERS = 0, the default, renders in the calling thread instead.
+A pool only pays off when every server process sees the images it renders:
+each server process starts its own REPORT_WORKERS processes (all importing
+matplotlib), and the images land in the plot cache of the process that
+submitted the job, so with the per-process cache another worker answering
+the poll or chart request would draw the chart again. check_report_workers()
+therefore requires PLOT_CACHE_ALIAS to name a shared cache when
+REPORT_WORKERS > 0.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils import timezone
+
+from Dj_Fitness_Asmt.chart_worker import render_charts, renderer, warm_worker
+from Dj_Fitness_Asmt.plot_cache import get_plot_cache, plot_key
+
+from .models import REPORT_FAILED, REPORT_PENDING, REPORT_READY, Assessment
+from .sessions import PROCESS_LOCAL_CACHES
+
+logger = logging.getLogger(__name__)
+
+# A job still pending after this long is given up on; the summary then shows
+# and the chart endpoints render on demand.
+REPORT_TIMEOUT = timedelta(seconds=60)
+
+
+# Wizard fields each chart is drawn from
+CHART_INPUTS = {
+    "bmi": ("weight_kg", "height_cm"),
+    "ramp": ("ramp_test_loads", "ramp_test_rpes"),
+}
+
+
+def chart_args(data, charts=CHART_INPUTS):
+    """Arguments of `charts`, normalized the way the chart endpoints parse them."""
+    args = {}
+    if "bmi" in charts:
+        args["bmi"] = (float(data["weight_kg"]), float(data["height_cm"]))
+    if "ramp" in charts:
+        args["ramp"] = (
+            [float(x) for x in data["ramp_test_loads"]],
+            [float(x) for x in data["ramp_test_rpes"]],
+        )
+    return args
+
+
+# ----------------------
+# QUEUE
+# ----------------------
+class ReportQueue:
+    """
+    Renders charts into the plot cache. A chart already cached is skipped
+    and one already being rendered is shared, so the wizard can start a
+    chart as soon as its step is posted and step 4 only waits for the rest.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._rendering = {}  # plot cache key -> Future
+        self._rendering_lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_worker,
+                )
+            return self._executor
+
+    def render(self, fmt, args):
+        """
+        Start rendering the charts in `args` that are neither cached nor in
+        flight; returns a future per chart still to come. Without a pool the
+        charts are rendered right here and the futures are already done.
+        """
+        cache = get_plot_cache()
+        futures = []
+        for chart, chart_args in args.items():
+            key = plot_key(renderer(chart, fmt).kind, *chart_args)
+            if cache is not None and cache.get(key) is not None:
+                continue
+            with self._rendering_lock:
+                future = self._rendering.get(key)
+                started = future is None
+                if started:
+                    future = self._rendering[key] = self._start(fmt, {chart: chart_args})
+            if started:
+                # Outside the lock: runs at once if the future is already done
+                future.add_done_callback(partial(self._store, key))
+            futures.append(future)
+        return futures
+
+    def _start(self, fmt, args):
+        if self.workers > 0:
+            return self.executor.submit(render_charts, fmt, args)
+        future = Future()
+        try:
+            future.set_result(render_charts(fmt, args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def _store(self, key, future):
+        with self._rendering_lock:
+            self._rendering.pop(key, None)
+        cache = get_plot_cache()
+        if cache is not None and future.exception() is None:
+            for rendered_key, image in future.result():
+                cache.set(rendered_key, image)
+
+    def prerender(self, data, changed, fmt):
+        """Start the charts whose inputs are among `changed` and all known in `data`."""
+        charts = [
+            chart for chart, inputs in CHART_INPUTS.items()
+            if changed.intersection(inputs) and all(data.get(name) for name in inputs)
+        ]
+        if charts:
+            self.render(fmt, chart_args(data, charts))
+
+    async def aprerender(self, data, changed, fmt):
+        if self.workers > 0:
+            self.prerender(data, changed, fmt)
+        else:
+            await sync_to_async(self.prerender)(data, changed, fmt)
+
+    def submit(self, assessment, data, fmt):
+        """Make sure a freshly recorded assessment's charts get rendered."""
+        futures = self.render(fmt, chart_args(data))
+        if not futures:
+            Assessment.objects.filter(pk=assessment.pk).update(report_status=REPORT_READY)
+            return
+        Assessment.objects.filter(pk=assessment.pk).update(report_status=REPORT_PENDING)
+        self._when_done(assessment.pk, futures)
+
+    async def asubmit(self, assessment, data, fmt):
+        if self.workers <= 0:
+            await sync_to_async(self.submit)(assessment, data, fmt)
+            return
+        futures = self.render(fmt, chart_args(data))
+        status = REPORT_PENDING if futures else REPORT_READY
+        await Assessment.objects.filter(pk=assessment.pk).aupdate(report_status=status)
+        if futures:
+            self._when_done(assessment.pk, futures)
+
+    async def arender(self, fmt, args):
+        """
+        Render charts without blocking the event loop: in the pool, or with
+        no pool on Django's single sync thread (pyplot is not thread-safe).
+        Returns {plot cache key: image} for the charts that were not cached.
+        """
+        if self.workers > 0:
+            futures = self.render(fmt, args)
+        else:
+            futures = await sync_to_async(self.render)(fmt, args)
+        images = {}
+        for future in futures:
+            images.update(await asyncio.wrap_future(future))
+        return images
+
+    def _when_done(self, pk, futures):
+        """Record the job's outcome once every future has finished."""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            failed = [f.exception() for f in futures if f.exception() is not None]
+            for exc in failed:
+                logger.error("Rendering charts for assessment %s failed", pk, exc_info=exc)
+            try:
+                Assessment.objects.filter(pk=pk).update(report_status=REPORT_FAILED if failed else REPORT_READY)
+            finally:
+                if self.workers > 0:
+                    connections.close_all()  # executor management thread
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_queue = None
+
+
+def check_report_workers():
+    """ImproperlyConfigured if REPORT_WORKERS > 0 without a shared plot cache."""
+    if getattr(settings, "REPORT_WORKERS", 0) <= 0:
+        return
+    alias = getattr(settings, "PLOT_CACHE_ALIAS", None)
+    backend = settings.CACHES.get(alias, {}).get("BACKEND") if alias else None
+    if backend is None or backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            "REPORT_WORKERS needs PLOT_CACHE_ALIAS to name a cache shared by all server processes, "
+            "or the charts rendered in the background only reach the process that asked for them. "
+            "Set REPORT_WORKERS to 0 to render on demand."
+        )
+
+
+def get_report_queue():
+    global _queue
+    workers = getattr(settings, "REPORT_WORKERS", 0)
+    if _queue is None or _queue.workers != workers:
+        if _queue is not None:
+            _queue.shutdown()
+        _queue = ReportQueue(workers)
+    return _queue
+
+
+def is_pending(assessment):
+    return (
+        assessment.report_status == REPORT_PENDING
+        and timezone.now() - assessment.assessed_at < REPORT_TIMEOUT
+    )
@@ -0,0 +1,195 @@
+"""
+Cache-first session engine with write-behind to the database.
+
+Reads and writes go to the session cache (SESSION_CACHE_ALIAS) like Django's
+cached_db engine, but saving an existing session only queues the database
+row; a background thread upserts the queued rows in one statement every
+SESSION_WRITE_BEHIND_DELAY seconds. Step transitions of the wizard therefore
+never wait on SQLite. New sessions are still inserted synchronously, so key
+uniqueness is enforced by the database as before.
+
+Sessions saved in the last SESSION_WRITE_BEHIND_DELAY seconds live only in
+the cache and this process's queue, so write-behind needs a cache shared by
+all workers (Redis, Memcached, database or file cache): with a per-process
+cache a worker that did not write a session would not see it, and a worker
+that dies before flushing would lose it. check_write_behind() refuses that
+configuration at startup. The default delay of 0 writes through, exactly
+like cached_db.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from Dj_Fitness_Asmt.timing import stage, timed
+
+logger = logging.getLogger("django.contrib.sessions")
+
+
+class WriteBehindQueue:
+    """Latest encoded data per session key, waiting to be upserted."""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def put(self, session_key, session_data, expire_date, delay):
+        with self._lock:
+            self._pending[session_key] = (session_data, expire_date)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, args=(delay,), name="session-write-behind", daemon=True,
+                )
+                self._thread.start()
+
+    def get(self, session_key):
+        with self._lock:
+            return self._pending.get(session_key)
+
+    def discard(self, session_key):
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self):
+        """Upsert every queued session now; returns how many were written."""
+        from django.contrib.sessions.models import Session
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            Session.objects.bulk_create(
+                [Session(session_key=key, session_data=data, expire_date=expires)
+                 for key, (data, expires) in pending.items()],
+                update_conflicts=True,
+                unique_fields=["session_key"],
+                update_fields=["session_data", "expire_date"],
+            )
+        except Exception:
+            logger.exception("Error writing %d queued sessions", len(pending))
+            with self._lock:
+                # Keep anything saved again meanwhile; retry the rest next round
+                self._pending = {**pending, **self._pending}
+            return 0
+        return len(pending)
+
+    def _run(self, delay):
+        while True:
+            time.sleep(delay)
+            self.flush()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    break
+        connections.close_all()
+
+
+write_behind = WriteBehindQueue()
+atexit.register(write_behind.flush)
+
+# Backends whose entries only the process that wrote them can see
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def check_write_behind():
+    """ImproperlyConfigured if write-behind is on without a shared session cache."""
+    if getattr(settings, "SESSION_WRITE_BEHIND_DELAY", 0) <= 0:
+        return
+    alias = settings.SESSION_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"SESSION_WRITE_BEHIND_DELAY needs SESSION_CACHE_ALIAS to name a cache shared by all "
+            f"workers; {alias!r} is a {backend.rsplit('.', 1)[-1]}. Set the delay to 0 to write through."
+        )
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = "fitness_project.sessions"
+
+    @property
+    def write_behind_delay(self):
+        return getattr(settings, "SESSION_WRITE_BEHIND_DELAY", 0)
+
+    def load(self):
+        with stage("session_load"):
+            data = super().load()
+        if not data and self.session_key is not None:
+            # Evicted from the cache before its row was written
+            queued = write_behind.get(self.session_key)
+            if queued is not None:
+                return self.decode(queued[0])
+        return data
+
+    def exists(self, session_key):
+        return write_behind.get(session_key) is not None or super().exists(session_key)
+
+    @timed("session_save")
+    def save(self, must_create=False):
+        if must_create or self.session_key is None or self.write_behind_delay <= 0:
+            super().save(must_create)
+            if self.session_key is not None:
+                write_behind.discard(self.session_key)
+            return
+        data = self._get_session()
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+        write_behind.put(self.session_key, self.encode(data), self.get_expiry_date(), self.write_behind_delay)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            write_behind.discard(key)
+        super().delete(session_key)
+
+    # Async counterparts, for the ASGI views
+
+    async def aload(self):
+        with stage("session_load"):
+            data = await super().aload()
+        if not data and self.session_key is not None:
+            queued = write_behind.get(self.session_key)
+            if queued is not None:
+                return self.decode(queued[0])
+        return data
+
+    async def aexists(self, session_key):
+        return write_behind.get(session_key) is not None or await super().aexists(session_key)
+
+    async def asave(self, must_create=False):
+        with stage("session_save"):
+            await self._asave(must_create)
+
+    async def _asave(self, must_create):
+        if must_create or self.session_key is None or self.write_behind_delay <= 0:
+            await super().asave(must_create)
+            if self.session_key is not None:
+                write_behind.discard(self.session_key)
+            return
+        data = await self._aget_session()
+        try:
+            await self._cache.aset(self.cache_key, data, await self.aget_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+        write_behind.put(
+            self.session_key, self.encode(data), await self.aget_expiry_date(), self.write_behind_delay,
+        )
+
+    async def adelete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            write_behind.discard(key)
+        await super().adelete(session_key)
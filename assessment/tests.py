@@ -1,3 +1,709 @@
-from django.test import TestCase
+import copy
+import csv
+import gzip
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import async_views
+from . import norms as norm_loading
+from .models import Assessment, Client, ClientProgress, NormTableVersion, age_band, record_assessment
+from .percentiles import build_percentile_index, cohort_percentiles, get_percentile_index, reset_percentile_index
+from .reports import check_report_workers
+from .sessions import check_write_behind, write_behind
+from .urls import wizard_patterns
+from .wizard import STEP_FIELDS, WizardState
+
+import Dj_Fitness_Asmt
+from Dj_Fitness_Asmt import logics
+from Dj_Fitness_Asmt.constants import TEST_CONSTANTS
+from Dj_Fitness_Asmt.figure_pool import FigurePool
+from Dj_Fitness_Asmt.logics import (
+    THRESHOLD_INDEX, plot_bmi_curve, process_clients_batch, ramp_chart_png, score_client,
+)
+from Dj_Fitness_Asmt.metrics import recompute
+from Dj_Fitness_Asmt.norm_registry import dump_norm_file, registry
+from Dj_Fitness_Asmt.pdf_report import render_pdfs
+from Dj_Fitness_Asmt.norm_tables import generate_threshold_tables, get_norm_tables
+from Dj_Fitness_Asmt.plot_cache import LRUPlotCache, get_plot_cache, plot_key, set_plot_cache
+from Dj_Fitness_Asmt.progress import downsample
+from Dj_Fitness_Asmt.ramp import analyze_ramp_batch, pad_steps, ramp_steps, ramp_thresholds, ramp_zones
+from Dj_Fitness_Asmt.streaming import score_stream
+from Dj_Fitness_Asmt.thresholds import ThresholdIndex
+
+
+def make_client(**overrides):
+    client = {
+        "first_name": "Test", "last_name": "Client",
+        "gender": "male", "age": 34, "weight_kg": 82.0, "height_cm": 178.0,
+        "waist_cm": 86.0, "hip_cm": 98.0,
+        "chest": 12.0, "abdomen": 20.0, "thigh": 15.0, "triceps": None, "suprailiac": None,
+        "vertical_jump_height_cm": 45.0, "pushup_count": 24, "squat_count": 35, "plank_hold_seconds": 95,
+        "toe_touch_cm": 6.0,
+        "one_leg_stance_right_eyes_open_sec": 45.0, "one_leg_stance_left_eyes_open_sec": 40.0,
+        "one_leg_stance_right_eyes_closed_sec": 10.0, "one_leg_stance_left_eyes_closed_sec": 18.0,
+        "chest_cm": 100.0, "arms_left_cm": 33.0, "arms_rigth_cm": 34.0,
+        "thigh_left_cm": 55.0, "thigh_rigth_cm": 56.0,
+        "ramp_test_loads": "1,2,3,4", "ramp_test_rpes": "3,5,7,10",
+    }
+    client.update(overrides)
+    return client
+
+
+# ----------------------
+# Batch scoring
+# ----------------------
+class BatchScoringTests(TestCase):
+    def test_batch_matches_per_client(self):
+        clients = [
+            make_client(),
+            make_client(gender="female", age=27, chest=None, abdomen=None, triceps=18.0, suprailiac=14.0, thigh=22.0),
+            make_client(age=72, pushup_count=0, toe_touch_cm=20.0),  # outside most age bands
+            make_client(age=15, squat_count=60, plank_hold_seconds=150, hip_cm=86.0),
+            make_client(gender="female", age=55, triceps=30.0, suprailiac=30.0, thigh=35.0, chest=None, abdomen=None),
+        ]
+        columns = {key: [client[key] for client in clients] for key in clients[0]}
+        batch = process_clients_batch(columns)
+
+        for row, client in enumerate(clients):
+            expected = score_client(client)
+            for section in ("calculations", "classifications"):
+                for name, value in expected[section].items():
+                    self.assertEqual(batch[section][name][row], value, f"row {row} {section}[{name}]")
+
+    def test_stream_matches_per_client_and_reads_lazily(self):
+        clients = [make_client(age=18 + 9 * i, pushup_count=4 * i) for i in range(6)]
+        clients[2] = make_client(gender="")
+        for batch_size in (1, 4):
+            pulled = []
+            source = (pulled.append(client) or client for client in clients)
+            stream = score_stream(source, batch_size=batch_size)
+            first = next(stream)
+            self.assertEqual(len(pulled), batch_size)  # nothing read beyond the current batch
+            for client, result in zip(clients, [first, *stream]):
+                expected = score_client(client)
+                self.assertEqual(result.calculations, expected.get("calculations", {}))
+                self.assertEqual(result.classifications, expected.get("classifications", {}))
+
+    def test_stream_reads_csv_text(self):
+        clients = [make_client(), make_client(gender="female", chest=None, triceps=14.0, suprailiac=11.0)]
+        text = StringIO()
+        writer = csv.DictWriter(text, fieldnames=list(clients[0]))
+        writer.writeheader()
+        writer.writerows(clients)
+        text.seek(0)
+        for client, result in zip(clients, score_stream(csv.DictReader(text))):
+            self.assertEqual(result.classifications, score_client(client)["classifications"])
+
+    def test_ramp_batch_matches_per_test(self):
+        loads = [[25, 50, 75, 100, 125], [1, 2, 3], "10, 20, 30, 40", []]
+        rpes = [[3, 5, 7, 8, 10], [9, 10, 10], "2, 4, 7, 9", []]
+        ragged = analyze_ramp_batch(loads, rpes)
+        padded = analyze_ramp_batch(pad_steps(loads), pad_steps(rpes))
+        for row, (row_loads, row_rpes) in enumerate(zip(loads, rpes)):
+            expected = ramp_thresholds(ramp_steps(row_loads), ramp_steps(row_rpes))
+            for result in (ragged, padded):
+                got = (result["aerobic_threshold"][row], result["anaerobic_threshold"][row])
+                self.assertEqual([None if math.isnan(x) else x for x in got], list(expected))
+        self.assertEqual(ramp_zones(loads[0], rpes[0])[1], (37.5, 87.5, "Moderate Zone"))
+        self.assertEqual((ragged["min_load"][2], ragged["max_load"][2]), (10.0, 40.0))
+        self.assertTrue(math.isnan(ragged["min_load"][3]))
+
+
+# ----------------------
+# Threshold index
+# ----------------------
+class ThresholdIndexTests(TestCase):
+    def test_overlapping_age_bands_fail_at_load(self):
+        tables = {"PushUp": {"Male": {"20-29": [36, 29, 22, 17, 0], "25-39": [30, 22, 17, 12, 0]}}}
+        with self.assertRaises(ValueError):
+            ThresholdIndex.from_tables(tables)
+
+    def test_gaps_are_reported(self):
+        tables = {"PushUp": {"Male": {"20-29": [36, 29, 22, 17, 0], "40-49": [25, 17, 13, 10, 0]}}}
+        with self.assertLogs("Dj_Fitness_Asmt.thresholds", "WARNING"):
+            index = ThresholdIndex.from_tables(tables)
+        self.assertEqual(index.validate(), [("warning", "PushUp", "Male", "ages 30-39 are not covered")])
+        self.assertIsNone(index.classify("PushUp", "Male", 35, 20))
+        self.assertEqual(index.classify("PushUp", "Male", 45, 20), "Good")
+
+
+# ----------------------
+# Plot cache
+# ----------------------
+class PlotCacheTests(TestCase):
+    def test_lru_evicts_least_recently_used(self):
+        cache = LRUPlotCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_repeat_render_is_served_from_cache(self):
+        cache = LRUPlotCache()
+        self.addCleanup(set_plot_cache, get_plot_cache())
+        set_plot_cache(cache)
+        first = plot_bmi_curve(70, 175)
+        self.assertEqual(plot_bmi_curve(70.0, 175.0), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertNotEqual(plot_key("bmi", 70, 175), plot_key("bmi", 70, 176))
+
+    def test_bmi_marker_is_drawn_over_the_legend(self):
+        import matplotlib.image
+        from Dj_Fitness_Asmt.logics import _get_bmi_background, bmi_chart_png
+
+        image = matplotlib.image.imread(BytesIO(bmi_chart_png.uncached(45, 195)), format="png")
+        x, y = _get_bmi_background().ax.transData.transform((45, 195))
+        self.assertEqual(tuple(image[image.shape[0] - round(y), round(x), :3]), (0, 0, 0))
+
+    def test_pooled_figures_are_reused_across_threads(self):
+        pool = FigurePool((6, 4), max_idle=2)
+        charts = [([1, 2, 3, 4], [3, 5, 7, 10]), ([50, 100, 150, 200, 250], [2, 4, 5, 8, 10])] * 4
+        expected = [ramp_chart_png.uncached(*chart) for chart in charts]
+        with mock.patch("Dj_Fitness_Asmt.logics.pooled_figure", lambda figsize: pool.figure()):
+            with ThreadPoolExecutor(4) as executor:
+                rendered = list(executor.map(lambda chart: ramp_chart_png.uncached(*chart), charts))
+        self.assertEqual(rendered, expected)
+        self.assertLessEqual(pool.created, 4)
+        self.assertEqual(pool.idle(), 2)
+        from matplotlib import pyplot
+        self.assertEqual(pyplot.get_fignums(), [])
+
+
+# ----------------------
+# Views
+# ----------------------
+SESSION1_POST = {
+    "first_name": "Ana", "last_name": "Silva", "age": 31, "gender": "female",
+    "height_cm": 165, "weight_kg": 60, "resting_hr": 62, "systolic_bp": 115, "diastolic_bp": 75,
+}
+SESSION2_POST = {
+    "thigh": 20, "triceps": 15, "suprailiac": 12,
+    "arms_rigth_cm": 28, "arms_left_cm": 27.5, "chest_cm": 88, "waist_cm": 70,
+    "hip_cm": 96, "thigh_rigth_cm": 54, "thigh_left_cm": 53,
+}
+SESSION3_POST = {"rpe_1": 2, "rpe_2": 4, "rpe_3": 6, "rpe_4": 8, "rpe_5": 10}
+SESSION4_POST = {
+    "vertical_jump_height_cm": 35, "pushup_count": 18, "squat_count": 30, "plank_hold_seconds": 80,
+    "one_leg_stance_right_eyes_open_sec": 45, "one_leg_stance_left_eyes_open_sec": 44,
+    "one_leg_stance_right_eyes_closed_sec": 14, "one_leg_stance_left_eyes_closed_sec": 12,
+    "toe_touch_cm": 5,
+}
+
+
+class WizardFlowMixin:
+    def complete_wizard(self):
+        # Write sessions through and render charts inline, so no background
+        # thread touches the test database
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=0, REPORT_WORKERS=0):
+            for step, data in (("session1", SESSION1_POST), ("session2", SESSION2_POST),
+                               ("session3", SESSION3_POST), ("session4", SESSION4_POST)):
+                response = self.client.post(reverse(step), data)
+                self.assertEqual(response.status_code, 302, step)
+        return self.client.get(reverse("summary"))
+
+
+class WizardStateTests(WizardFlowMixin, TestCase):
+    def test_state_is_one_compact_session_entry(self):
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=0):
+            self.client.post(reverse("session1"), SESSION1_POST)
+            self.client.post(reverse("session2"), SESSION2_POST)
+        session = self.client.session
+        self.assertEqual(list(session.keys()), [WizardState.SESSION_KEY])
+
+        state = WizardState.load(session)
+        self.assertTrue(state.has_steps(1, 2))
+        self.assertFalse(state.has_steps(3))
+        self.assertEqual((state.get("gender"), state.get("hip_cm")), ("female", 96))
+        self.assertIsNone(state.get("chest"))  # not asked for women
+
+    def test_missing_steps_restart_the_wizard(self):
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=0):
+            self.client.post(reverse("session1"), SESSION1_POST)
+            response = self.client.post(reverse("session4"), SESSION4_POST)
+        self.assertRedirects(response, reverse("session1"))
+        self.assertFalse(Assessment.objects.exists())
+
+    def test_clients_are_chosen_by_number_not_name(self):
+        self.complete_wizard()
+        self.complete_wizard()  # another Ana Silva
+        self.assertEqual(Client.objects.filter(first_name="Ana", last_name="Silva").count(), 2)
+
+        ana = Client.objects.first()
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=0):
+            response = self.client.post(reverse("session1"), {**SESSION1_POST, "client_id": 999})
+            self.assertContains(response, "No client with this number")
+        with mock.patch.dict(SESSION1_POST, client_id=ana.pk):
+            self.complete_wizard()
+        self.assertEqual(ana.assessments.count(), 2)
+
+    def test_step_saves_are_written_behind(self):
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=0):
+            self.client.post(reverse("session1"), SESSION1_POST)
+        key = self.client.session.session_key
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=3600):
+            self.client.post(reverse("session2"), SESSION2_POST)
+            self.assertFalse(WizardState.load(Session.objects.get(pk=key).get_decoded()).has_steps(2))
+            self.assertTrue(WizardState.load(self.client.session).has_steps(2))  # served from the cache
+            self.assertEqual(write_behind.flush(), 1)
+        self.assertTrue(WizardState.load(Session.objects.get(pk=key).get_decoded()).has_steps(2))
+
+    def test_write_behind_needs_a_shared_cache(self):
+        with self.settings(SESSION_WRITE_BEHIND_DELAY=2):
+            with self.assertRaises(ImproperlyConfigured):
+                check_write_behind()
+            shared = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "sessions"}}
+            with self.settings(CACHES=shared):
+                check_write_behind()
+
+    def test_report_workers_need_a_shared_plot_cache(self):
+        with self.settings(REPORT_WORKERS=2):
+            with self.assertRaises(ImproperlyConfigured):
+                check_report_workers()
+            shared = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "charts"}}
+            with self.settings(PLOT_CACHE_ALIAS="default", CACHES=shared):
+                check_report_workers()
+
+    def test_metrics_are_recomputed_incrementally(self):
+        client = make_client(ramp_test_loads=[1, 2, 3, 4], ramp_test_rpes=[3, 5, 7, 10])
+        state = WizardState()
+        for step in STEP_FIELDS:
+            state.update(step, client)
+        expected = score_client(client)
+        self.assertEqual(state.report(), {key: expected[key] for key in ("calculations", "classifications")})
+
+        # Correcting the waist only touches WHR and its classification
+        _, recomputed = recompute(state.as_client_data(), {"waist_cm"}, state.results)
+        self.assertEqual(recomputed, ["calculations.WHR", "classifications.WHR"])
+        self.assertEqual(state.update(2, {**client, "waist_cm": 120.0}), {"waist_cm"})
+        self.assertEqual(state.report()["classifications"]["WHR"],
+                         score_client({**client, "waist_cm": 120.0})["classifications"]["WHR"])
+        self.assertEqual(WizardState.from_stored(state.stored()).results, state.results)
+
+
+class SummaryViewTests(WizardFlowMixin, TestCase):
+    def test_summary_links_charts_instead_of_inlining(self):
+        response = self.complete_wizard()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "data:image/png;base64")
+        self.assertContains(response, reverse("bmi_chart", kwargs={"fmt": "png"}))
+        self.assertContains(response, reverse("ramp_chart", kwargs={"fmt": "png"}))
+        self.assertEqual(response.context["classifications"]["BMI"], "Normal")
+
+    def test_summary_reads_the_stored_assessment(self):
+        self.complete_wizard()
+        assessment = Assessment.objects.get()
+        self.assertEqual((assessment.client.last_name, assessment.age_band), ("Silva", "30-39"))
+        self.assertEqual(list(assessment.ramp_steps.values_list("load", "rpe")), [(1, 2), (2, 4), (3, 6), (4, 8), (5, 10)])
+
+        Assessment.objects.update(classifications={"BMI": "Stored"})
+        self.assertEqual(self.client.get(reverse("summary")).context["classifications"], {"BMI": "Stored"})
+
+    def test_pending_report_is_polled(self):
+        self.complete_wizard()
+        self.assertEqual(Assessment.objects.get().report_status, "ready")
+        self.assertIsNotNone(get_plot_cache().get(plot_key("bmi", 60.0, 165.0)))  # pre-rendered
+
+        Assessment.objects.update(report_status="pending")
+        response = self.client.get(reverse("summary"))
+        self.assertTemplateUsed(response, "assessment/report_pending.html")
+        self.assertEqual(self.client.get(reverse("report_status")).json(), {"status": "pending"})
+
+        Assessment.objects.update(report_status="ready")
+        self.assertEqual(self.client.get(reverse("report_status")).json(), {"status": "ready"})
+        self.assertTemplateUsed(self.client.get(reverse("summary")), "assessment/summary.html")
+
+    def test_summary_exports_as_pdf(self):
+        self.complete_wizard()
+        response = self.client.get(reverse("summary_pdf"))
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response.content.startswith(b"%PDF"))
+        self.assertEqual(response.content.count(b"/Type /Page /"), 2)
+
+    def test_pdf_filename_is_encoded(self):
+        with mock.patch.dict(SESSION1_POST, last_name='O"Brien; Müller'):
+            self.complete_wizard()
+        response = self.client.get(reverse("summary_pdf"))
+        disposition = response["Content-Disposition"]
+        self.assertTrue(disposition.startswith("inline; filename*=utf-8''O%22Brien%3B%20M%C3%BCller-"), disposition)
+
+
+class AsyncURLConf:
+    urlpatterns = wizard_patterns(async_views)
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf, SESSION_WRITE_BEHIND_DELAY=0, REPORT_WORKERS=0)
+class AsyncViewTests(TestCase):
+    async def test_async_wizard_produces_the_same_report(self):
+        for step, data in (("session1", SESSION1_POST), ("session2", SESSION2_POST),
+                           ("session3", SESSION3_POST), ("session4", SESSION4_POST)):
+            response = await self.async_client.post(reverse(step), data)
+            self.assertEqual(response.status_code, 302, step)
+        response = await self.async_client.get(reverse("summary"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["classifications"]["BMI"], "Normal")
+
+        chart = await self.async_client.get(
+            reverse("ramp_chart", kwargs={"fmt": "png"}) + "?loads=1,2,3&rpes=3,6,8"
+        )
+        self.assertEqual((chart.status_code, chart["Content-Type"]), (200, "image/png"))
+
+    async def test_charts_render_with_the_plot_cache_disabled(self):
+        self.addCleanup(set_plot_cache, get_plot_cache())
+        set_plot_cache(None)
+        url = reverse("bmi_chart", kwargs={"fmt": "svg"}) + "?weight=70&height=175"
+        self.assertContains(await self.async_client.get(url), "You - 22.86")
+
+        # Rendered by a request that finished first: nothing comes back and nothing was cached
+        with mock.patch("assessment.reports.ReportQueue.arender", mock.AsyncMock(return_value={})):
+            self.assertContains(await self.async_client.get(url), "You - 22.86")
+
+
+class ChartViewTests(WizardFlowMixin, TestCase):
+    def test_chart_is_cacheable_and_supports_conditional_get(self):
+        url = reverse("ramp_chart", kwargs={"fmt": "png"}) + "?loads=1,2,3,4&rpes=3,5,7,10"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/charts/bmi.png?weight=abc&height=170").status_code, 400)
+        self.assertEqual(self.client.get("/charts/ramp.png?loads=1,2&rpes=3").status_code, 400)
+        self.assertEqual(self.client.get("/charts/bmi.gif?weight=70&height=170").status_code, 404)
+
+    def test_out_of_range_parameters_are_refused(self):
+        for query in ("weight=70&height=0", "weight=nan&height=170", "weight=inf&height=170"):
+            self.assertEqual(self.client.get(f"/charts/bmi.png?{query}").status_code, 400, query)
+            self.assertEqual(self.client.get(f"/charts/bmi.svg?{query}").status_code, 400, query)
+        steps = ",".join(["5"] * 1500)
+        self.assertEqual(self.client.get(f"/charts/ramp.png?loads={steps}&rpes={steps}").status_code, 400)
+        self.assertEqual(self.client.get("/charts/ramp.png?loads=1,2&rpes=3,11").status_code, 400)
+
+    def test_svg_format(self):
+        response = self.client.get("/charts/bmi.svg?weight=70&height=175")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertContains(response, "You - 22.86")
+
+    def test_summary_can_request_svg_charts(self):
+        response = self.complete_wizard()
+        self.assertNotContains(response, "bmi.svg")
+        response = self.client.get(reverse("summary") + "?chart_format=svg")
+        self.assertContains(response, "/charts/bmi.svg?")
+
+    @override_settings(SERVER_TIMING=True)
+    def test_stage_timings_are_exposed(self):
+        response = self.client.get("/charts/ramp.png?loads=1,2,3,4,5,6&rpes=2,3,5,6,7,9")
+        stages = dict(entry.split(";dur=") for entry in response["Server-Timing"].split(", "))
+        self.assertLessEqual({"figure", "png_encode", "total"}, set(stages))
+        self.assertLess(float(stages["png_encode"]), float(stages["total"]))
+
+        metrics = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('fitness_stage_seconds_bucket{stage="png_encode",le="+Inf"}', metrics)
+        self.assertIn('fitness_request_seconds_count{view="ramp_chart"}', metrics)
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.8").status_code, 404)
+
+    def test_slow_requests_leave_a_profile(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(PROFILE_SAMPLE_RATE=1, PROFILE_THRESHOLD_MS=0, PROFILE_DIR=directory), \
+                self.assertLogs("assessment.profiling", "WARNING"):
+            self.client.get(reverse("session1"))
+            self.client.get("/charts/bmi.svg?weight=70&height=175")  # not a profiled view
+        files = sorted(os.listdir(directory))
+        self.assertEqual([os.path.splitext(name)[1] for name in files], [".folded", ".prof"])
+        self.assertIn("-session1-", files[0])
+
+
+class NormTableTests(TestCase):
+    def test_tables_follow_the_constants(self):
+        tables = generate_threshold_tables()
+        pushups = tables["pushup"].set_index(["gender", "age_band"])
+        self.assertEqual(pushups.loc[("Male", "15-19"), "Excellent"], 39)
+        self.assertEqual(list(tables["ols"].columns), ["gender", "age_band", "Eyes open", "Eyes closed"])
+
+    def test_norm_views_are_cached_by_table_version(self):
+        page = self.client.get(reverse("norms"))
+        self.assertContains(page, "Push-ups (reps, at least)")
+
+        response = self.client.get(reverse("norm_table", kwargs={"name": "bodyfat", "fmt": "csv"}))
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertTrue(response.content.startswith(b"gender,age_band,Essential"))
+        self.assertIn(THRESHOLD_INDEX.fingerprint[:16], response["ETag"])
+        self.assertEqual(get_norm_tables().render("bodyfat", "csv"), response.content)
+        self.assertEqual(self.client.get(response.wsgi_request.path, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(self.client.get("/norms/bodyfat.xml").status_code, 404)
+        self.assertEqual(self.client.get("/norms/bench.json").status_code, 404)
+
+
+class ProgressTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("coach", is_staff=True))
+
+    def test_progress_is_staff_only(self):
+        first = record_assessment(make_client(ramp_test_loads=[1, 2, 3, 4], ramp_test_rpes=[3, 5, 7, 10]))
+        urls = [
+            reverse("progress") + f"?clients={first.client_id}",
+            reverse("progress_trend", args=[first.client_id, "BMI"]),
+        ]
+        self.client.logout()
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user("client"))
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_retests_are_tracked_per_client(self):
+        ramp = {"ramp_test_loads": [1, 2, 3, 4], "ramp_test_rpes": [3, 5, 7, 10]}
+        first = record_assessment(make_client(pushup_count=20, **ramp))
+        retest = record_assessment(make_client(client_id=first.client_id, pushup_count=28, weight_kg=78.0, **ramp))
+        Assessment.objects.filter(pk=retest.pk).update(assessed_at=first.assessed_at.replace(year=2030))
+        other = record_assessment(make_client(first_name="Ana", **ramp))
+        ids = f"{first.client_id},{other.client_id},999"
+
+        with self.assertNumQueries(2):  # the staff user, then every client's series at once
+            response = self.client.get(reverse("progress"), {"clients": ids, "last": 1})
+        clients = response.json()["clients"]
+        self.assertEqual(set(clients), {str(first.client_id), str(other.client_id)})
+        mine = clients[str(first.client_id)]
+        self.assertEqual(mine["last"]["id"], [retest.pk])
+        self.assertEqual(mine["last"]["pushup_count"], [28])
+        self.assertEqual(mine["change"]["pushup_count"], 8)
+        self.assertLess(mine["change"]["BMI"], 0)
+        self.assertIsNone(clients[str(other.client_id)]["change"]["BMI"])
+
+        trend = self.client.get(reverse("progress_trend", args=[first.client_id, "BMI"])).json()
+        self.assertEqual(trend["tests"], 2)
+        self.assertEqual(self.client.get(reverse("progress_trend", args=[first.client_id, "nope"])).status_code, 404)
+
+        retest.delete()
+        self.assertEqual(ClientProgress.objects.get(pk=first.client_id).series["id"], [first.pk])
+
+    def test_downsample_keeps_extremes(self):
+        times = list(range(1000))
+        values = [50.0] * 1000
+        values[437], values[712] = 90.0, 10.0
+        points = downsample(times, values, 50)
+        self.assertEqual(len(points), 50)
+        self.assertIn((437, 90.0), points)
+        self.assertIn((712, 10.0), points)
+        self.assertEqual((points[0], points[-1]), ((0, 50.0), (999, 50.0)))
+
+
+class PercentileTests(TestCase):
+    def setUp(self):
+        reset_percentile_index()
+        self.addCleanup(reset_percentile_index)
+
+    def test_percentiles_are_within_gender_and_age_band(self):
+        ramp = {"ramp_test_loads": [1, 2, 3, 4], "ramp_test_rpes": [3, 5, 7, 10]}
+        for i, pushups in enumerate((10, 20, 30)):
+            record_assessment(make_client(first_name=f"M{i}", pushup_count=pushups, **ramp))
+        record_assessment(make_client(first_name="Old", age=64, pushup_count=99, **ramp))
+        index = build_percentile_index()
+        self.assertEqual(index.size("pushup_count", "male", "30-39"), 3)
+
+        # Stored after the index was built: picked up by the next lookup
+        newest = record_assessment(make_client(first_name="M3", pushup_count=40, **ramp))
+        self.assertEqual(cohort_percentiles(newest)["pushup_count"], 87.5)
+        self.assertEqual(index.percentile("pushup_count", "male", "30-39", 20), 37.5)
+        self.assertEqual(index.percentile("pushup_count", "male", "60-69", 20), 0.0)
+        self.assertIsNone(index.percentile("pushup_count", "female", "30-39", 20))
+
+        newest.delete()
+        self.assertEqual(index.size("pushup_count", "male", "30-39"), 3)
+
+    def test_cohorts_use_the_norm_table_age_bands(self):
+        self.assertEqual([age_band(age) for age in (14, 17, 34, 85)], ["0-14", "15-19", "30-39", "80+"])
+
+    def test_requests_never_build_the_index(self):
+        assessment = record_assessment(make_client(ramp_test_loads=[1, 2, 3, 4], ramp_test_rpes=[3, 5, 7, 10]))
+        with self.assertNumQueries(0):
+            self.assertEqual(cohort_percentiles(assessment), {})
+        build_percentile_index()
+        with self.assertNumQueries(1):  # the catch-up by id
+            self.assertEqual(get_percentile_index().size("pushup_count", "male", "30-39"), 1)
+
+
+class NormRegistryTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, norm_loading, "_checked_at", None)
+        self.addCleanup(registry.reset)
+        self.tables = copy.deepcopy(TEST_CONSTANTS)
+        self.tables["PushUp"]["Male"]["30-39"] = [20, 15, 10, 5, 0]
+
+    def test_norm_file_is_loaded_and_recorded_on_results(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "norms.json")
+        dump_norm_file(path, "2026-10", self.tables)
+        builtin = score_client(make_client())["classifications"]["PushUps"]
+
+        with override_settings(NORM_TABLES=path):
+            norms = norm_loading.refresh_norms(force=True)
+        assessment = record_assessment(make_client(ramp_test_loads=[1, 2, 3, 4], ramp_test_rpes=[3, 5, 7, 10]))
+
+        self.assertEqual(norms.label, "2026-10")
+        self.assertIs(logics.THRESHOLD_INDEX, norms.index)
+        self.assertNotEqual(assessment.classifications["PushUps"], builtin)
+        self.assertEqual((assessment.norm_version, assessment.thresholds_hash), ("2026-10", norms.fingerprint))
+
+    def test_active_db_version_is_used_and_invalid_tables_are_refused(self):
+        self.assertIs(Dj_Fitness_Asmt.THRESHOLD_INDEX, registry.current.index)  # read before the switch
+        NormTableVersion.objects.create(version="v2", tables=self.tables).activate()
+        with override_settings(NORM_TABLES="db"):
+            self.assertEqual(norm_loading.refresh_norms(force=True).label, "v2")
+
+        self.assertIs(Dj_Fitness_Asmt.THRESHOLD_INDEX, registry.current.index)
+        self.assertEqual(Dj_Fitness_Asmt.TEST_CONSTANTS["PushUp"]["Male"]["30-39"], [20, 15, 10, 5, 0])
+
+        del self.tables["Plank"]
+        with self.assertRaises(ValueError):
+            registry.load("broken", self.tables)
+        self.assertEqual(registry.current.label, "v2")
+
+        registry.reset()
+        self.assertIs(Dj_Fitness_Asmt.THRESHOLD_INDEX, logics.THRESHOLD_INDEX)
+        self.assertIs(Dj_Fitness_Asmt.TEST_CONSTANTS, TEST_CONSTANTS)
+
+
+# ----------------------
+# Bulk import
+# ----------------------
+class ImportAssessmentsTests(TestCase):
+    def test_import_scores_and_stores_rows(self):
+        clients = [
+            make_client(first_name="Rui", last_name="Costa", client_ref="R-7"),
+            make_client(first_name="Rui", last_name="Costa", age=35, client_ref="R-7"),
+            make_client(first_name="Eva", last_name="Lima", gender="female", chest=None, abdomen=None,
+                        triceps=14.0, suprailiac=11.0, client_ref="E-1"),
+            make_client(first_name="Eva", last_name="Lima", gender="female", chest=None, abdomen=None,
+                        triceps=14.0, suprailiac=11.0, client_ref="E-2"),  # another Eva Lima
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+            writer = csv.DictWriter(f, fieldnames=list(clients[0]) + ["assessed_at"])
+            writer.writeheader()
+            for client in clients:
+                writer.writerow({**client, "assessed_at": "2024-03-01 09:30"})
+        self.addCleanup(os.unlink, f.name)
+
+        call_command("import_assessments", f.name, stdout=StringIO())
+
+        self.assertEqual(Client.objects.count(), 3)
+        self.assertEqual(Assessment.objects.count(), 4)
+        for client, assessment in zip(clients, Assessment.objects.order_by("pk")):
+            expected = score_client(client)
+            self.assertEqual(assessment.calculations, expected["calculations"])
+            self.assertEqual(assessment.classifications, expected["classifications"])
+            self.assertEqual(assessment.ramp_steps.count(), 4)
+            self.assertEqual(assessment.assessed_at.year, 2024)
+        self.assertEqual(len(ClientProgress.objects.get(client__reference="R-7").series["t"]), 2)
+
+        call_command("import_assessments", f.name, stdout=StringIO())  # references match the clients stored
+        self.assertEqual(Client.objects.count(), 3)
+
+    def test_rows_without_a_valid_gender_are_skipped(self):
+        clients = [make_client(), make_client(first_name="Blank", gender=""), make_client(first_name="X", gender="other")]
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+            writer = csv.DictWriter(f, fieldnames=list(clients[0]))
+            writer.writeheader()
+            writer.writerows(clients)
+        self.addCleanup(os.unlink, f.name)
+        err = StringIO()
+
+        call_command("import_assessments", f.name, stdout=StringIO(), stderr=err)
+
+        self.assertEqual(list(Assessment.objects.values_list("gender", flat=True)), ["male"])
+        self.assertIn("lines 3, 4", err.getvalue())
+
+
+class RecomputeAssessmentsTests(TestCase):
+    def test_only_stale_assessments_are_rescored(self):
+        ramp = {"ramp_test_loads": [1, 2, 3, 4], "ramp_test_rpes": [3, 5, 7, 10]}
+        current = record_assessment(make_client(**ramp))
+        stale = record_assessment(make_client(first_name="Ana", pushup_count=5, **ramp))
+        Assessment.objects.filter(pk=stale.pk).update(thresholds_hash="old", classifications={})
+        self.assertEqual(current.thresholds_hash, THRESHOLD_INDEX.fingerprint)
+
+        out = StringIO()
+        call_command("recompute_assessments", stdout=out)
+
+        self.assertIn("1 assessments rescored", out.getvalue())
+        stale.refresh_from_db()
+        self.assertEqual(stale.thresholds_hash, THRESHOLD_INDEX.fingerprint)
+        self.assertEqual(stale.classifications, score_client(stale.to_client_data())["classifications"])
+
+
+class ExportPdfsTests(TestCase):
+    def test_latest_assessment_of_each_client_in_the_cohort(self):
+        ramp = {"ramp_test_loads": [1, 2, 3, 4], "ramp_test_rpes": [3, 5, 7, 10]}
+        first = record_assessment(make_client(**ramp))
+        record_assessment(make_client(client_id=first.client_id, pushup_count=30, **ramp))
+        record_assessment(make_client(first_name="Eva", gender="female", triceps=14.0, suprailiac=11.0, **ramp))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        call_command("export_pdfs", directory, "--gender", "male", "--workers", "0", stdout=StringIO())
+
+        files = os.listdir(directory)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith("client-test-"))
+
+    def test_a_hanging_report_costs_one_timeout(self):
+        report = record_assessment(make_client(ramp_test_loads=[1, 2, 3, 4], ramp_test_rpes=[3, 5, 7, 10])).report_data()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        paths = [os.path.join(directory, f"{i}.pdf") for i in range(4)]
+        os.mkfifo(paths[1])  # opening it for writing blocks: no reader ever comes
+
+        started = time.monotonic()
+        results = list(render_pdfs([(report, path) for path in paths], workers=1, timeout=8))
+
+        self.assertEqual([path for path, _ in results], paths)
+        self.assertEqual([type(error) for _, error in results], [type(None), TimeoutError, type(None), type(None)])
+        self.assertLess(time.monotonic() - started, 2 * 8)
+        self.assertTrue(open(paths[3], "rb").read().startswith(b"%PDF"))
+
+
+class ScoreCohortTests(TestCase):
+    def test_scores_csv_in_chunks(self):
+        clients = [make_client(first_name=f"C{i}", age=20 + 7 * i, pushup_count=5 * i) for i in range(5)]
+        clients[3].update(gender="female", chest=None, abdomen=None, triceps=14.0, suprailiac=11.0)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        source, output = os.path.join(tmp, "in.csv"), os.path.join(tmp, "out.csv.gz")
+        with open(source, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(clients[0]))
+            writer.writeheader()
+            writer.writerows(clients)
+
+        call_command("score_cohort", source, output, "--chunk-size", "2", "--workers", "0", stdout=StringIO())
+
+        with gzip.open(output, "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row["first_name"] for row in rows], [c["first_name"] for c in clients])
+        for client, row in zip(clients, rows):
+            expected = score_client(client)
+            self.assertEqual(float(row["calculations.BodyFat"]), expected["calculations"]["BodyFat"])
+            for name, label in expected["classifications"].items():
+                self.assertEqual(row[f"classifications.{name}"], label)
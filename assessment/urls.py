@@ -1,11 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-
-urlpatterns = [
-    path('', views.session1, name='session_form'),  # root redirects to session1
-    path('session1/', views.session1, name='session1'),
-    path('session2/', views.session2, name='session2'),
-    path('session3/', views.session3, name='session3'),\
-    path('session4/', views.session4, name='session4'),
-    path('summary/', views.summary, name='summary'),
+from . import async_views, views
+
+
+def wizard_patterns(views):
+    return [
+        path('', views.session1, name='session_form'),  # root redirects to session1
+        path('session1/', views.session1, name='session1'),
+        path('session2/', views.session2, name='session2'),
+        path('session3/', views.session3, name='session3'),
+        path('session4/', views.session4, name='session4'),
+        path('summary/', views.summary, name='summary'),
+        path('summary/status/', views.report_status, name='report_status'),
+        path('summary/report.pdf', views.summary_pdf, name='summary_pdf'),
+        path('charts/bmi.<str:fmt>', views.bmi_chart, name='bmi_chart'),
+        path('charts/ramp.<str:fmt>', views.ramp_chart, name='ramp_chart'),
+    ]
+
+
+urlpatterns = wizard_patterns(async_views if settings.ASYNC_VIEWS else views) + [
+    path('norms/', views.norms, name='norms'),
+    path('norms/<str:name>.<str:fmt>', views.norm_table, name='norm_table'),
+    path('progress/', views.progress, name='progress'),
+    path('progress/<int:client_id>/<str:metric>/', views.progress_trend, name='progress_trend'),
+    path('metrics', views.metrics, name='metrics'),
 ]
@@ -1,16 +1,51 @@
 # assessment/views.py
-from django.shortcuts import render, redirect
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django import shortcuts
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+from django.utils.safestring import mark_safe
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 from .forms import Session1Form, Session2Form, Session3Form, Session4Form
-from Dj_Fitness_Asmt.logics import process_client_data   # master function
+from .models import Assessment, ClientProgress, record_assessment
+from .percentiles import cohort_percentiles
+from .reports import get_report_queue, is_pending
+from .wizard import WizardState
+from Dj_Fitness_Asmt.logics import bmi_chart_png, ramp_chart_png
+from Dj_Fitness_Asmt.norm_registry import registry as norm_registry
+from Dj_Fitness_Asmt.norm_tables import FORMATS as NORM_CONTENT_TYPES, NORM_SPECS, get_norm_tables
+from Dj_Fitness_Asmt.pdf_report import pdf_report
+from Dj_Fitness_Asmt.plot_cache import PLOT_STYLE_VERSION, plot_key
+from Dj_Fitness_Asmt.progress import PROGRESS_METRICS, change_since_baseline, downsample, last_tests
+from Dj_Fitness_Asmt.svg_charts import bmi_chart_svg, ramp_chart_svg
+from Dj_Fitness_Asmt.timing import registry, stage
+
+
+def render(request, template_name, context=None):
+    with stage("template"):
+        return shortcuts.render(request, template_name, context)
+
 
 # ----------------------
 # SESSION 1 
 # ----------------------
+def prerender_charts(state, changed):
+    """Start drawing the charts whose inputs this step changed."""
+    get_report_queue().prerender(state.as_client_data(), changed, settings.CHART_FORMAT)
+
+
 def session1(request):
     if request.method == "POST":
         form = Session1Form(request.POST)
         if form.is_valid():
-            request.session['session1_data'] = form.cleaned_data
+            state = WizardState.load(request.session)
+            prerender_charts(state, state.update(1, form.cleaned_data))
+            state.save(request.session)
             return redirect('session2')
     else:
         form = Session1Form()
@@ -21,11 +56,13 @@ def session1(request):
 # SESSION 2 
 # ----------------------
 def session2(request):
-    gender = request.session.get('session1_data', {}).get('gender', None)
+    state = WizardState.load(request.session)
+    gender = state.get('gender')
     if request.method == "POST":
         form = Session2Form(request.POST, gender=gender)
         if form.is_valid():
-            request.session['session2_data'] = form.cleaned_data
+            state.update(2, form.cleaned_data)
+            state.save(request.session)
             return redirect('session3')
     else:
         form = Session2Form(gender=gender)
@@ -35,22 +72,25 @@ def session2(request):
 # ----------------------
 # SESSION 3  (Ramp Test Only)
 # ----------------------
+def ramp_from_post(post):
+    ramp_rpes, ramp_loads = [], []
+    for key in post:
+        if key.startswith("rpe_"):
+            try:
+                ramp_rpes.append(float(post[key]))
+                ramp_loads.append(int(key.split("_")[1]))  # load index from field name
+            except ValueError:
+                pass
+    return {'ramp_test_rpes': ramp_rpes, 'ramp_test_loads': ramp_loads}
+
+
 def session3(request):
     if request.method == 'POST':
-        ramp_rpes, ramp_loads = [], []
-        for key in request.POST:
-            if key.startswith("rpe_"):
-                try:
-                    ramp_rpes.append(float(request.POST[key]))
-                    ramp_loads.append(int(key.split("_")[1]))  # load index from field name
-                except ValueError:
-                    pass
-
-        if ramp_rpes:
-            request.session['session3_data'] = {
-                'ramp_test_rpes': ramp_rpes,
-                'ramp_test_loads': ramp_loads,
-            }
+        ramp = ramp_from_post(request.POST)
+        if ramp['ramp_test_rpes']:
+            state = WizardState.load(request.session)
+            prerender_charts(state, state.update(3, ramp))
+            state.save(request.session)
             return redirect('session4')
 
     return render(request, 'assessment/session3.html')
@@ -63,12 +103,24 @@ def session4(request):
     if request.method == 'POST':
         form = Session4Form(request.POST)
         if form.is_valid():
-            request.session['session4_data'] = form.cleaned_data
+            state = WizardState.load(request.session)
+            if not state.has_steps(1, 2, 3):
+                return redirect('session1')  # earlier steps missing or expired
+            state.update(4, form.cleaned_data)
+            data = state.as_client_data()
+            assessment = record_assessment(data, state.report())
+            get_report_queue().submit(assessment, data, settings.CHART_FORMAT)
+            request.session['assessment_id'] = assessment.pk
+            WizardState.clear(request.session)
             return redirect('summary')
     else:
         form = Session4Form()
 
-    return render(request, 'assessment/session4.html', {
+    return render(request, 'assessment/session4.html', session4_context(form))
+
+
+def session4_context(form):
+    return {
         'form': form,
         'jump_fields': [form['vertical_jump_height_cm']],
         'endurance_fields_row1': [
@@ -83,37 +135,256 @@ def session4(request):
             form['one_leg_stance_right_eyes_closed_sec'],
             form['one_leg_stance_left_eyes_closed_sec'],
         ],
-    })
+    }
 
 
 # ----------------------
 # SUMMARY (Final Report)
 # ----------------------
 def summary(request):
-    # Collect all session data
-    session1_data = request.session.get('session1_data', {})
-    session2_data = request.session.get('session2_data', {})
-    session3_data = request.session.get('session3_data', {})
-    session4_data = request.session.get('session4_data', {})
-
-    # Combine data for processing
-    combined_data = {**session1_data, **session2_data, **session3_data, **session4_data}
-
-    # Add ramp_test_loads/rpes if not strings yet
-    if 'ramp_test_loads' in session3_data and isinstance(session3_data['ramp_test_loads'], list):
-        combined_data['ramp_test_loads'] = ",".join(map(str, session3_data['ramp_test_loads']))
-    if 'ramp_test_rpes' in session3_data and isinstance(session3_data['ramp_test_rpes'], list):
-        combined_data['ramp_test_rpes'] = ",".join(map(str, session3_data['ramp_test_rpes']))
-
-    # Process client data to get classifications, plots, circumferences
-    processed = process_client_data(combined_data)
-
-    return render(request, 'assessment/summary.html', {
-        'session1_data': session1_data,
-        'session2_data': session2_data,
-        'session3_data': processed['plots'],  # ramp_plot
-        'session4_data': processed['plots'],  # bmi_plot
-        'calculations': processed['calculations'],
-        'classifications': processed['classifications'],
-        'circumferences': processed['circumferences'],
+    # Report straight from the stored assessment; nothing is rescored here
+    assessment = (
+        Assessment.objects.select_related('client')
+        .filter(pk=request.session.get('assessment_id'))
+        .first()
+    )
+    if assessment is None:
+        return redirect('session1')
+    if is_pending(assessment):
+        return render(request, 'assessment/report_pending.html', {'client': assessment.client})
+    return render(request, 'assessment/summary.html', summary_context(request, assessment))
+
+
+def summary_context(request, assessment, percentiles=None):
+    data = assessment.to_client_data()
+    return {
+        'session1_data': data,
+        'session2_data': data,
+        'charts': chart_urls(data, request.GET.get('chart_format', settings.CHART_FORMAT)),
+        'calculations': assessment.calculations,
+        'classifications': assessment.classifications,
+        'circumferences': assessment.circumferences,
+        'percentiles': cohort_percentiles(assessment) if percentiles is None else percentiles,
+    }
+
+
+@require_GET
+def summary_pdf(request):
+    """The summary as a printable two-page PDF."""
+    assessment = (
+        Assessment.objects.select_related('client')
+        .filter(pk=request.session.get('assessment_id'))
+        .first()
+    )
+    if assessment is None:
+        raise Http404("No assessment in this session")
+    return pdf_response(assessment, pdf_report(assessment.report_data()))
+
+
+def pdf_response(assessment, pdf):
+    response = HttpResponse(pdf, content_type='application/pdf')
+    name = f"{assessment.client.last_name}-{assessment.assessed_at:%Y%m%d}.pdf"
+    response['Content-Disposition'] = content_disposition_header(False, name)
+    return response
+
+
+@require_GET
+def report_status(request):
+    """Polled by the pending report page until the charts are rendered."""
+    assessment = Assessment.objects.filter(pk=request.session.get('assessment_id')).first()
+    if assessment is None:
+        raise Http404("No assessment in this session")
+    return JsonResponse({'status': 'pending' if is_pending(assessment) else 'ready'})
+
+
+# ----------------------
+# CHARTS
+# ----------------------
+# Chart URLs carry every input plus the plot style version, so a URL always
+# names the same image and browsers/CDNs may cache it for good.
+CHART_MAX_AGE = 60 * 60 * 24 * 365
+CHART_CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def chart_urls(data, fmt='png'):
+    if fmt not in CHART_CONTENT_TYPES:
+        fmt = 'png'
+
+    def url(name, **params):
+        return f"{reverse(name, kwargs={'fmt': fmt})}?{urlencode({**params, 'v': PLOT_STYLE_VERSION})}"
+
+    return {
+        'bmi': url('bmi_chart', weight=data['weight_kg'], height=data['height_cm']),
+        'ramp': url(
+            'ramp_chart',
+            loads=",".join(map(str, data['ramp_test_loads'])),
+            rpes=",".join(map(str, data['ramp_test_rpes'])),
+        ),
+    }
+
+
+# The URLs are public, so their inputs are held to what a real assessment
+# could produce: anything else would only cost renders and plot cache space.
+CHART_RANGES = {
+    'weight': (1, 500),     # kg
+    'height': (50, 300),    # cm
+    'loads': (0, 2000),     # W
+    'rpes': (0, 10),
+}
+CHART_MAX_STEPS = 100
+
+
+def _chart_value(text, name):
+    value = float(text)
+    low, high = CHART_RANGES[name]
+    if not low <= value <= high:  # also false for NaN; infinities are out of range
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def _chart_series(request, name):
+    values = request.GET[name].split(",")
+    if len(values) > CHART_MAX_STEPS:
+        raise ValueError(f"At most {CHART_MAX_STEPS} {name}")
+    return [_chart_value(x, name) for x in values]
+
+
+def bmi_chart_args(request):
+    return _chart_value(request.GET['weight'], 'weight'), _chart_value(request.GET['height'], 'height')
+
+
+def ramp_chart_args(request):
+    loads = _chart_series(request, 'loads')
+    rpes = _chart_series(request, 'rpes')
+    if len(loads) != len(rpes):
+        raise ValueError("loads and rpes must have the same length")
+    return loads, rpes
+
+
+def chart_etag(kind, parse_args):
+    def etag(request, fmt):
+        try:
+            return plot_key(f"{kind}_{fmt}", *parse_args(request)).rsplit(":", 1)[-1]
+        except (KeyError, ValueError):
+            return None
+    return etag
+
+
+def _chart_view(kind, parse_args, renderers):
+    """`renderers` maps a format ("png", "svg") to the function drawing it."""
+    etag = chart_etag(kind, parse_args)
+
+    @require_GET
+    @cache_control(public=True, max_age=CHART_MAX_AGE, immutable=True)
+    @condition(etag_func=etag)
+    def view(request, fmt):
+        if fmt not in renderers:
+            raise Http404("Unknown chart format")
+        try:
+            args = parse_args(request)
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest("Invalid chart parameters")
+        return HttpResponse(renderers[fmt](*args), content_type=CHART_CONTENT_TYPES[fmt])
+
+    return view
+
+
+bmi_chart = _chart_view("bmi", bmi_chart_args, {'png': bmi_chart_png, 'svg': bmi_chart_svg})
+ramp_chart = _chart_view("ramp", ramp_chart_args, {'png': ramp_chart_png, 'svg': ramp_chart_svg})
+
+
+# ----------------------
+# NORM TABLES
+# ----------------------
+# Revalidated hourly; the ETag names the table version, so a 304 costs
+# nothing and a reload of the tables shows up at the next revalidation.
+NORM_MAX_AGE = 60 * 60
+
+
+@require_GET
+@cache_control(public=True, max_age=NORM_MAX_AGE)
+@condition(etag_func=lambda request: get_norm_tables().etag("all", "html"))
+def norms(request):
+    tables = get_norm_tables()
+    return render(request, 'assessment/norms.html', {
+        'version': norm_registry.label(tables.fingerprint),
+        'tables': [(name, mark_safe(tables.render(name, 'html').decode())) for name in NORM_SPECS],
     })
+
+
+@require_GET
+@cache_control(public=True, max_age=NORM_MAX_AGE)
+@condition(etag_func=lambda request, name, fmt: get_norm_tables().etag(name, fmt))
+def norm_table(request, name, fmt):
+    try:
+        body = get_norm_tables().render(name, fmt)
+    except KeyError:
+        raise Http404("Unknown norm table or format")
+    return HttpResponse(body, content_type=NORM_CONTENT_TYPES[fmt])
+
+
+# ----------------------
+# PROGRESS
+# ----------------------
+# Dashboards ask for many clients at once; each is one ClientProgress row, so
+# a request is a single query however long the histories are. Client
+# histories are staff-only, like the admin.
+PROGRESS_MAX_CLIENTS = 500
+PROGRESS_DEFAULT_LAST = 5
+TREND_DEFAULT_POINTS = 200
+
+
+def _int_param(request, name, default, low, high):
+    value = int(request.GET.get(name, default))
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+@staff_member_required
+@require_GET
+def progress(request):
+    """?clients=1,2,3&last=N: the last N tests and the change since baseline of each client."""
+    try:
+        ids = {int(x) for x in request.GET['clients'].split(",") if x.strip()}
+        last = _int_param(request, 'last', PROGRESS_DEFAULT_LAST, 1, 1000)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Invalid progress parameters")
+    if len(ids) > PROGRESS_MAX_CLIENTS:
+        return HttpResponseBadRequest(f"At most {PROGRESS_MAX_CLIENTS} clients per request")
+    rows = ClientProgress.objects.filter(client_id__in=ids).values_list('client_id', 'series')
+    return JsonResponse({'clients': {
+        client_id: {'last': last_tests(series, last), 'change': change_since_baseline(series)}
+        for client_id, series in rows
+    }})
+
+
+@staff_member_required
+@require_GET
+def progress_trend(request, client_id, metric):
+    """?points=N: one metric of a client as at most N [time, value] pairs for a trend chart."""
+    if metric not in PROGRESS_METRICS:
+        raise Http404("Unknown progress metric")
+    try:
+        points = _int_param(request, 'points', TREND_DEFAULT_POINTS, 2, 5000)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid number of points")
+    series = ClientProgress.objects.filter(client_id=client_id).values_list('series', flat=True).first()
+    if series is None:
+        raise Http404("No progress for this client")
+    return JsonResponse({
+        'metric': metric,
+        'tests': len(series['t']),
+        'points': downsample(series['t'], series[metric], points),
+    })
+
+
+# ----------------------
+# METRICS
+# ----------------------
+@require_GET
+def metrics(request):
+    """Stage and request histograms in Prometheus text format, for local scrapers."""
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
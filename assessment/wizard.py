@@ -0,0 +1,119 @@
+from itertools import chain
+
+from Dj_Fitness_Asmt import logics
+from Dj_Fitness_Asmt.metrics import as_report, recompute
+
+from .forms import Session1Form, Session2Form, Session4Form
+
+
+# ----------------------
+# WIZARD STATE
+# ----------------------
+# Fields entered at each step, in a fixed order. Session 3 is the ramp test,
+# posted as rpe_<load> inputs rather than through its form.
+STEP_FIELDS = {
+    1: tuple(Session1Form.base_fields),
+    2: tuple(Session2Form.base_fields),
+    3: ("ramp_test_loads", "ramp_test_rpes"),
+    4: tuple(Session4Form.base_fields),
+}
+FORMAT_VERSION = 3
+
+
+class WizardState:
+    """
+    The assessment in progress for one browser session.
+
+    Kept in the session under a single key as a flat list,
+    [FORMAT_VERSION, completed steps bitmask, thresholds fingerprint,
+    metric results, value, value, ...] with one slot per field of STEP_FIELDS,
+    instead of one cleaned_data dict per step.
+
+    The metrics are computed step by step: each update re-evaluates only the
+    ones depending on a field whose value changed (see Dj_Fitness_Asmt.metrics),
+    so by step 4 the report is already there. Results computed against other
+    norm tables are thrown away and redone.
+    """
+    SESSION_KEY = "wizard"
+    FIELDS = tuple(chain.from_iterable(STEP_FIELDS.values()))
+    _SLOTS = {name: i for i, name in enumerate(FIELDS)}
+
+    __slots__ = ("values", "completed", "fingerprint", "results")
+
+    def __init__(self, values=None, completed=0, fingerprint=None, results=None):
+        self.values = list(values) if values is not None else [None] * len(self.FIELDS)
+        self.completed = completed
+        self.fingerprint = fingerprint
+        self.results = results or {}
+
+    @classmethod
+    def from_stored(cls, stored):
+        if not stored or stored[0] != FORMAT_VERSION or len(stored) != len(cls.FIELDS) + 4:
+            return cls()  # nothing yet, or written by an older layout
+        return cls(stored[4:], stored[1], stored[2], stored[3])
+
+    def stored(self):
+        return [FORMAT_VERSION, self.completed, self.fingerprint, self.results, *self.values]
+
+    @classmethod
+    def load(cls, session):
+        return cls.from_stored(session.get(cls.SESSION_KEY))
+
+    def save(self, session):
+        session[self.SESSION_KEY] = self.stored()
+
+    @classmethod
+    def clear(cls, session):
+        session.pop(cls.SESSION_KEY, None)
+
+    @classmethod
+    async def aload(cls, session):
+        return cls.from_stored(await session.aget(cls.SESSION_KEY))
+
+    async def asave(self, session):
+        await session.aset(self.SESSION_KEY, self.stored())
+
+    @classmethod
+    async def aclear(cls, session):
+        await session.apop(cls.SESSION_KEY, None)
+
+    def get(self, name, default=None):
+        value = self.values[self._SLOTS[name]]
+        return default if value is None else value
+
+    def update(self, step, data):
+        """
+        Record one step; fields of that step missing from `data` become None.
+        Returns the names of the fields whose value changed.
+        """
+        changed = set()
+        for name in STEP_FIELDS[step]:
+            slot = self._SLOTS[name]
+            value = data.get(name)
+            if value != self.values[slot]:
+                self.values[slot] = value
+                changed.add(name)
+        self.completed |= 1 << step
+
+        if self.fingerprint != logics.THRESHOLD_INDEX.fingerprint:
+            self.fingerprint = logics.THRESHOLD_INDEX.fingerprint
+            self.results, _ = recompute(self.as_client_data(), None)
+        elif changed:
+            self.results, _ = recompute(self.as_client_data(), changed, self.results)
+        return changed
+
+    def report(self):
+        """
+        Calculations and classifications so far, shaped like score_client's;
+        None if the norm tables changed since, so the caller rescores.
+        """
+        if self.fingerprint != logics.THRESHOLD_INDEX.fingerprint:
+            return None
+        return as_report(self.results)
+
+    def has_steps(self, *steps):
+        return all(self.completed & (1 << step) for step in steps)
+
+    def as_client_data(self):
+        """Merged dict of every field, as record_assessment/score_client expect."""
+        return dict(zip(self.FIELDS, self.values))
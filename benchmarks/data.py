@@ -0,0 +1,58 @@
+"""Synthetic client records shaped like the merged wizard session data."""
+
+import random
+
+
+def make_client(rng=None, **overrides):
+    rng = rng or random.Random(0)
+    gender = rng.choice(["male", "female"])
+    male = gender == "male"
+    steps = rng.randint(5, 15)
+    client = {
+        "first_name": "Bench", "last_name": f"Client{rng.randint(0, 10**6)}",
+        "gender": gender, "age": rng.randint(15, 79),
+        "weight_kg": round(rng.uniform(45, 120), 1), "height_cm": round(rng.uniform(150, 198), 1),
+        "resting_hr": rng.randint(50, 90), "systolic_bp": rng.randint(100, 150), "diastolic_bp": rng.randint(60, 95),
+        "chest": round(rng.uniform(4, 35), 1) if male else None,
+        "abdomen": round(rng.uniform(6, 45), 1) if male else None,
+        "thigh": round(rng.uniform(6, 45), 1),
+        "triceps": None if male else round(rng.uniform(8, 35), 1),
+        "suprailiac": None if male else round(rng.uniform(6, 35), 1),
+        "arms_rigth_cm": round(rng.uniform(24, 42), 1), "arms_left_cm": round(rng.uniform(24, 42), 1),
+        "chest_cm": round(rng.uniform(80, 120), 1), "waist_cm": round(rng.uniform(60, 115), 1),
+        "hip_cm": round(rng.uniform(80, 125), 1),
+        "thigh_rigth_cm": round(rng.uniform(45, 70), 1), "thigh_left_cm": round(rng.uniform(45, 70), 1),
+        "ramp_test_loads": list(range(1, steps + 1)),
+        "ramp_test_rpes": [float(min(10, round(1 + i * 9 / (steps - 1)))) for i in range(steps)],
+        "vertical_jump_height_cm": round(rng.uniform(15, 70), 1),
+        "pushup_count": rng.randint(0, 50), "squat_count": rng.randint(5, 60),
+        "plank_hold_seconds": rng.randint(10, 240),
+        "one_leg_stance_right_eyes_open_sec": round(rng.uniform(5, 60), 1),
+        "one_leg_stance_left_eyes_open_sec": round(rng.uniform(5, 60), 1),
+        "one_leg_stance_right_eyes_closed_sec": round(rng.uniform(1, 30), 1),
+        "one_leg_stance_left_eyes_closed_sec": round(rng.uniform(1, 30), 1),
+        "toe_touch_cm": round(rng.uniform(0, 20), 1),
+    }
+    client.update(overrides)
+    return client
+
+
+def make_cohort(size, seed=0):
+    rng = random.Random(seed)
+    return [make_client(rng) for _ in range(size)]
+
+
+def wizard_posts(client):
+    """[(url path, form data)] submitting `client` through the four wizard steps."""
+    from assessment.wizard import STEP_FIELDS
+
+    def fields(step):
+        return {name: client[name] for name in STEP_FIELDS[step] if client.get(name) is not None}
+
+    ramp = {f"rpe_{load}": rpe for load, rpe in zip(client["ramp_test_loads"], client["ramp_test_rpes"])}
+    return [
+        ("/session1/", fields(1)),
+        ("/session2/", fields(2)),
+        ("/session3/", ramp),
+        ("/session4/", fields(4)),
+    ]
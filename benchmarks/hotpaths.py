@@ -0,0 +1,245 @@
+"""
+Latency and memory of the scoring and rendering hot paths.
+
+Every case is called once per client of a synthetic cohort and timed call by
+call, giving throughput and p50/p95/p99 latency. Peak memory comes from a
+second, shorter pass under tracemalloc, so tracing never skews the timings.
+Charts are rendered with the plot cache disabled; the "wizard_flow" case
+walks session1 -> summary through the Django test client on a scratch
+database, with a fresh plot cache.
+
+    python -m benchmarks.hotpaths --json before.json
+    python -m benchmarks.hotpaths --json after.json --compare before.json
+
+--compare exits with status 1 when a case's p50 grew by more than
+--tolerance (10% by default).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MEMORY_CALLS = 20
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    call: object   # callable(client)
+    calls: int     # per run at --scale 1
+    plot_cache: bool = False
+
+
+# -----------------------------
+# Cases
+# -----------------------------
+def _scoring_cases():
+    from Dj_Fitness_Asmt.logics import (
+        calculate_bmi, calculate_body_fat, calculate_power, calculate_whr, classify_metric,
+        process_client_data, score_client,
+    )
+
+    def skinfolds(c):
+        return {name: c[name] for name in ("chest", "abdomen", "thigh", "triceps", "suprailiac")}
+
+    return [
+        Case("calculate_bmi", lambda c: calculate_bmi(c["weight_kg"], c["height_cm"]), 5000),
+        Case("calculate_whr", lambda c: calculate_whr(c["waist_cm"], c["hip_cm"]), 5000),
+        Case("calculate_power", lambda c: calculate_power(c["weight_kg"], c["vertical_jump_height_cm"]), 5000),
+        Case("calculate_body_fat", lambda c: calculate_body_fat(c["gender"], c["age"], skinfolds(c)), 5000),
+        Case("classify_metric", lambda c: classify_metric("PushUp", c["gender"], c["age"], c["pushup_count"]), 5000),
+        Case("score_client", score_client, 2000),
+        Case("process_client_data", process_client_data, 50),
+    ]
+
+
+def _chart_cases():
+    from matplotlib.figure import Figure
+
+    from Dj_Fitness_Asmt.logics import (
+        _pyplot, bmi_chart_png, draw_ramp_chart, plot_bmi_curve, plot_ramp_test, ramp_chart_png,
+        save_plot_png, save_plot_to_memory, score_client,
+    )
+    from Dj_Fitness_Asmt.pdf_report import pdf_report, report_data
+    from Dj_Fitness_Asmt.svg_charts import bmi_chart_svg, ramp_chart_svg
+
+    def figure(c):
+        fig = Figure(figsize=(6, 4))
+        fig.subplots().plot(c["ramp_test_loads"], c["ramp_test_rpes"])
+        return fig
+
+    def ramp_chart_pyplot(c):
+        # ramp_chart_png before figure pooling: a new pyplot figure per chart
+        fig, ax = _pyplot().subplots(figsize=(6, 4))
+        draw_ramp_chart(ax, c["ramp_test_loads"], c["ramp_test_rpes"])
+        fig.tight_layout()
+        return save_plot_png(fig)
+
+    def report(c):
+        results = score_client(c)
+        return pdf_report(report_data(
+            "Bench Client", "2024-01-01", c, results["calculations"], results["classifications"],
+            results["circumferences"],
+        ))
+
+    return [
+        Case("plot_bmi_curve", lambda c: plot_bmi_curve(c["weight_kg"], c["height_cm"]), 50),
+        Case("plot_ramp_test", lambda c: plot_ramp_test(c["ramp_test_loads"], c["ramp_test_rpes"]), 50),
+        Case("save_plot_to_memory", lambda c: save_plot_to_memory(figure(c)), 50),
+        # Same charts without base64, PNG against the matplotlib-free SVG
+        Case("bmi_chart_png", lambda c: bmi_chart_png(c["weight_kg"], c["height_cm"]), 50),
+        Case("bmi_chart_svg", lambda c: bmi_chart_svg(c["weight_kg"], c["height_cm"]), 500),
+        Case("ramp_chart_png", lambda c: ramp_chart_png(c["ramp_test_loads"], c["ramp_test_rpes"]), 50),
+        Case("ramp_chart_svg", lambda c: ramp_chart_svg(c["ramp_test_loads"], c["ramp_test_rpes"]), 500),
+        # Pooled pyplot-free figure (ramp_chart_png) against a fresh pyplot one
+        Case("ramp_chart_pyplot", ramp_chart_pyplot, 50),
+        Case("pdf_report", report, 20),
+    ]
+
+
+def _flow_case(database):
+    """session1 -> summary with sessions written through and charts rendered inline."""
+    import logging
+
+    os.environ["SQLITE_PATH"] = database
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fitness_project.settings")
+    import django
+    django.setup()
+    logging.disable(logging.INFO)  # the project logs DEBUG to stdout
+
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import override_settings, setup_test_environment
+
+    from benchmarks.data import wizard_posts
+
+    call_command("migrate", verbosity=0)
+    setup_test_environment()
+    override_settings(SESSION_WRITE_BEHIND_DELAY=0, REPORT_WORKERS=0).enable()
+
+    browser = Client()  # one handler, as in a server; a fresh session per flow
+
+    def flow(client_data):
+        browser.cookies.clear()
+        browser.get("/session1/")
+        for path, form in wizard_posts(client_data):
+            response = browser.post(path, form)
+            if response.status_code != 302:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        if browser.get("/summary/").status_code != 200:
+            raise RuntimeError("summary did not render")
+
+    # The wizard pre-renders charts into the cache and step 4 relies on it
+    return Case("wizard_flow", flow, 30, plot_cache=True)
+
+
+# -----------------------------
+# Measuring
+# -----------------------------
+def _percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def measure(case, cohort, scale):
+    calls = max(2, int(case.calls * scale))
+    clients = [cohort[i % len(cohort)] for i in range(calls)]
+    case.call(clients[0])  # warm up imports and lazily built state
+
+    timings = []
+    for client in clients:
+        start = time.perf_counter()
+        case.call(client)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for client in clients[:MEMORY_CALLS]:
+        case.call(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": calls,
+        "ops_per_s": calls / sum(timings),
+        "p50_us": _percentile(timings, 50) * 1e6,
+        "p95_us": _percentile(timings, 95) * 1e6,
+        "p99_us": _percentile(timings, 99) * 1e6,
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print p50 changes against `baseline`; returns the names of regressed cases."""
+    regressed = []
+    for name, case in results["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        change = case["p50_us"] / before["p50_us"] - 1
+        flag = "REGRESSION" if change > tolerance else ""
+        if flag:
+            regressed.append(name)
+        print(f"{name:<22} {before['p50_us']:12.1f} -> {case['p50_us']:12.1f} us {change:+8.1%} {flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cohort", type=int, default=500, help="synthetic clients to cycle through")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every case's call count")
+    parser.add_argument("--only", nargs="*", help="run just these cases")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="results file of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p50 growth with --compare")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(BASE_DIR))
+    from benchmarks.data import make_cohort
+    from Dj_Fitness_Asmt.plot_cache import LRUPlotCache, set_plot_cache
+
+    cohort = make_cohort(args.cohort, seed=args.seed)
+    import matplotlib
+    import numpy
+
+    results = {
+        "meta": {
+            "python": platform.python_version(), "numpy": numpy.__version__,
+            "matplotlib": matplotlib.__version__, "machine": platform.machine(), "cpus": os.cpu_count(),
+            "cohort": args.cohort, "seed": args.seed, "scale": args.scale,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = _scoring_cases() + _chart_cases()
+        if not args.only or "wizard_flow" in args.only:
+            cases.append(_flow_case(str(Path(tmp) / "bench.sqlite3")))
+        print(f"{'case':<22} {'ops/s':>10} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'peak KB':>9}")
+        for case in cases:
+            if args.only and case.name not in args.only:
+                continue
+            set_plot_cache(LRUPlotCache() if case.plot_cache else None)
+            row = results["cases"][case.name] = measure(case, cohort, args.scale)
+            print(f"{case.name:<22} {row['ops_per_s']:10.1f} {row['p50_us']:10.1f} "
+                  f"{row['p95_us']:10.1f} {row['p99_us']:10.1f} {row['peak_kb']:9.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        print()
+        regressed = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
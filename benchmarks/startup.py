@@ -0,0 +1,78 @@
+"""
+Startup cost of the scoring package and the Django project.
+
+Each scenario runs in a fresh interpreter, so module caches never carry over,
+and reports the median wall time of the scenario body plus the process's peak
+RSS. Compare runs with --json before/after a change:
+
+    python -m benchmarks.startup --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "import package": "import Dj_Fitness_Asmt",
+    "score one client": (
+        "from Dj_Fitness_Asmt.logics import score_client\n"
+        "from benchmarks.data import make_client\n"
+        "score_client(make_client())"
+    ),
+    "django setup + urls": (
+        "import django\n"
+        "django.setup()\n"
+        "from django.urls import resolve\n"
+        "resolve('/')"
+    ),
+    "first BMI chart": (
+        "from Dj_Fitness_Asmt.logics import bmi_chart_png\n"
+        "bmi_chart_png.uncached(70, 175)"
+    ),
+}
+
+_CHILD = """
+import resource, time, json
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def run_scenario(body):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "fitness_project.settings", "PYTHONPATH": str(BASE_DIR)}
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(body=body)],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, body in SCENARIOS.items():
+        runs = [run_scenario(body) for _ in range(args.repeat)]
+        results[name] = {
+            "median_ms": statistics.median(r["seconds"] for r in runs) * 1000,
+            "peak_rss_mb": statistics.median(r["peak_rss_kb"] for r in runs) / 1024,
+        }
+        print(f"{name:<22} {results[name]['median_ms']:9.1f} ms {results[name]['peak_rss_mb']:8.1f} MB")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
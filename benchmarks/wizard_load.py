@@ -0,0 +1,200 @@
+"""
+Concurrent wizard sessions against a live server.
+
+Every virtual coach walks the whole wizard with its own cookies and CSRF
+token: GET session1, POST steps 1-4, then GET the summary, polling
+summary/status/ while the charts are pre-rendered. Requests are plain
+HTTP/1.1 over asyncio streams, so thousands of coaches fit in one process.
+
+Run against a server you started yourself:
+
+    python -m benchmarks.wizard_load --url http://127.0.0.1:8000 --coaches 500 --concurrency 200
+
+or let the harness start one on a scratch database (SQLITE_PATH) and compare:
+
+    python -m benchmarks.wizard_load --serve gunicorn --workers 1 --threads 4 --json sync.json
+    python -m benchmarks.wizard_load --serve uvicorn --workers 1 --json async.json
+
+--serve gunicorn runs the WSGI app (sync views); --serve uvicorn runs
+fitness_project.asgi, which enables the async views.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CSRF_TOKEN = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class Browser:
+    """One coach's cookie jar; a new connection per request (Connection: close)."""
+
+    def __init__(self, host, port, timings):
+        self.host, self.port = host, port
+        self.cookies = {}
+        self.timings = timings
+
+    async def request(self, method, path, form=None):
+        body = urlencode(form).encode() if form is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: close"]
+        if self.cookies:
+            lines.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        if form is not None:
+            lines += ["Content-Type: application/x-www-form-urlencoded", f"Content-Length: {len(body)}"]
+
+        start = time.perf_counter()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        self.timings.append(time.perf_counter() - start)
+
+        head, _, content = raw.partition(b"\r\n\r\n")
+        status_line, *headers = head.decode("latin-1").split("\r\n")
+        for header in headers:
+            name, _, value = header.partition(":")
+            if name.lower() == "set-cookie":
+                key, _, rest = value.strip().partition("=")
+                self.cookies[key] = rest.split(";", 1)[0]
+        return int(status_line.split()[1]), content
+
+
+async def walk_wizard(browser, posts):
+    status, page = await browser.request("GET", "/session1/")
+    token = CSRF_TOKEN.search(page)
+    if status != 200 or token is None:
+        raise RuntimeError(f"session1 returned {status}")
+    for path, form in posts:
+        status, _ = await browser.request("POST", path, {**form, "csrfmiddlewaretoken": token.group(1).decode()})
+        if status != 302:
+            raise RuntimeError(f"{path} returned {status}")
+    status, page = await browser.request("GET", "/summary/")
+    if b"Preparing the report charts" in page:
+        # What the pending page's script does: poll, then reload
+        while json.loads((await browser.request("GET", "/summary/status/"))[1])["status"] != "ready":
+            await asyncio.sleep(0.5)
+        status, page = await browser.request("GET", "/summary/")
+    if status != 200:
+        raise RuntimeError(f"summary returned {status}")
+
+
+async def run_load(url, coaches, concurrency, seed=0):
+    from benchmarks.data import make_client, wizard_posts
+
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    timings, flows, errors = [], [], []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def coach():
+        posts = wizard_posts(make_client(rng))
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await walk_wizard(Browser(parts.hostname, parts.port or 80, timings), posts)
+                flows.append(time.perf_counter() - start)
+            except Exception as exc:
+                errors.append(repr(exc))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(coach() for _ in range(coaches)))
+    elapsed = time.perf_counter() - start
+
+    def pct(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else float("nan")
+
+    return {
+        "coaches": coaches, "concurrency": concurrency, "errors": len(errors),
+        "seconds": elapsed, "wizards_per_s": len(flows) / elapsed, "requests_per_s": len(timings) / elapsed,
+        "request_p50_ms": pct(timings, 50), "request_p95_ms": pct(timings, 95), "request_p99_ms": pct(timings, 99),
+        "wizard_p50_ms": pct(flows, 50), "wizard_p99_ms": pct(flows, 99),
+        "first_errors": errors[:3],
+    }
+
+
+# -----------------------------
+# Server under test
+# -----------------------------
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, workers, threads, database):
+    port = _free_port()
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "fitness_project.settings", "SQLITE_PATH": database}
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v0"], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if kind == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "fitness_project.asgi:application",
+                   "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    else:
+        command = [sys.executable, "-m", "gunicorn", "fitness_project.wsgi:application",
+                   "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--threads", str(threads),
+                   "--log-level", "warning"]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{kind} did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="server to load; omit with --serve")
+    parser.add_argument("--serve", choices=["uvicorn", "gunicorn"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument("--coaches", type=int, default=300, help="wizard runs in total")
+    parser.add_argument("--concurrency", type=int, default=100, help="wizard runs in flight at once")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+    if not args.url and not args.serve:
+        parser.error("pass --url or --serve")
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "fitness_project.settings")
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url
+        if args.serve:
+            server, url = start_server(args.serve, args.workers, args.threads, str(Path(tmp) / "load.sqlite3"))
+        try:
+            results = asyncio.run(run_load(url, args.coaches, args.concurrency))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    results["server"] = args.serve or url
+    for name, value in results.items():
+        print(f"{name:<16} {value:.1f}" if isinstance(value, float) else f"{name:<16} {value}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_project.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# Build the cohort percentile index while the worker waits for requests
+from assessment.percentiles import start_percentile_index  # noqa: E402
+
+start_percentile_index()
@@ -6,7 +6,6 @@ Adapted for deployment on Render.com
 import sys
 import os
 from pathlib import Path
-import matplotlib
 
 import logging
 
@@ -16,9 +15,6 @@ logging.basicConfig(
     format='%(levelname)s:%(name)s:%(message)s'
 )
 
-# Use Agg backend for matplotlib (no GUI)
-matplotlib.use('Agg')
-
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))  # <-- project root
 
@@ -40,6 +36,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'assessment.middleware.TimingMiddleware',  # per-view and per-stage histograms, see /metrics
+    'assessment.profiling.ProfilingMiddleware',  # off unless PROFILE_SAMPLE_RATE > 0
+    'assessment.middleware.NormReloadMiddleware',  # follows NORM_TABLES without restarts
     'whitenoise.middleware.WhiteNoiseMiddleware',  # serve static files efficiently
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -73,7 +72,15 @@ WSGI_APPLICATION = 'fitness_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        # Concurrent workers: WAL lets readers run during a write, and
+        # IMMEDIATE transactions take the write lock up front (waiting up to
+        # `timeout`) instead of failing with "database is locked" on upgrade.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        },
     }
 }
 
@@ -96,6 +103,62 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'  # required for collectstatic
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# CACHES
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# SESSIONS
+# Cache-first sessions. With the default delay of 0 every save writes through
+# to the database like cached_db; a positive SESSION_WRITE_BEHIND_DELAY batches
+# the database writes every that many seconds, which needs SESSION_CACHE_ALIAS
+# to name a cache shared by all workers (checked at startup).
+SESSION_ENGINE = 'assessment.sessions'
+SESSION_CACHE_ALIAS = os.environ.get('SESSION_CACHE_ALIAS', 'default')
+SESSION_WRITE_BEHIND_DELAY = float(os.environ.get('SESSION_WRITE_BEHIND_DELAY', '0'))
+
+# Rendered chart cache. None keeps charts in a per-worker LRU; set it to a
+# CACHES alias backed by a shared store (Redis, Memcached, FileBasedCache) so
+# all gunicorn workers reuse each other's renders.
+PLOT_CACHE_ALIAS = os.environ.get('PLOT_CACHE_ALIAS') or None
+
+# Serve the async wizard/summary/chart views (assessment/async_views.py).
+# asgi.py turns this on; WSGI servers keep the sync views.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
+# Processes pre-rendering report charts while the wizard runs, per server
+# process (0 renders inline). Needs a shared PLOT_CACHE_ALIAS, checked at
+# startup: see assessment/reports.py.
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', '0'))
+
+# Report chart format: 'png' (matplotlib) or 'svg' (lightweight renderer).
+# A single report can override it with ?chart_format=svg.
+CHART_FORMAT = os.environ.get('CHART_FORMAT', 'png')
+
+# Per-stage timing (Dj_Fitness_Asmt/timing.py). /metrics serves the histograms
+# in Prometheus text format to these addresses only; SERVER_TIMING adds the
+# per-request breakdown as a Server-Timing header.
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'
+
+# Profiling of slow requests (assessment/profiling.py). PROFILE_SAMPLE_RATE of
+# the requests to PROFILE_VIEWS run under a profiler; those taking at least
+# PROFILE_THRESHOLD_MS leave a .prof and a .folded (flame graph) file in
+# PROFILE_DIR. 0 removes the middleware entirely.
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_THRESHOLD_MS = float(os.environ.get('PROFILE_THRESHOLD_MS', '500'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles')
+PROFILE_VIEWS = ['session1', 'session2', 'session3', 'session4', 'summary', 'session_form']
+
+# Norm tables used for classification (assessment/norms.py): unset for the
+# built-in ones, "db" for the active NormTableVersion, or the path of a JSON/
+# YAML norm file. Each worker checks for changes every NORM_RELOAD_INTERVAL
+# seconds and scores new results with them; existing results keep theirs.
+NORM_TABLES = os.environ.get('NORM_TABLES') or None
+NORM_RELOAD_INTERVAL = float(os.environ.get('NORM_RELOAD_INTERVAL', '30'))
+
 # DEFAULT PRIMARY KEY FIELD
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -113,4 +176,11 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'WARNING',
     },
+    'loggers': {
+        'assessment.profiling': {  # one warning per saved slow-request profile
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
 }
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitness_project.settings')
 
 application = get_wsgi_application()
+
+# Build the cohort percentile index while the worker waits for requests
+from assessment.percentiles import start_percentile_index  # noqa: E402
+
+start_percentile_index()